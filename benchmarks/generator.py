@@ -0,0 +1,190 @@
+import json
+import random
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple, Union
+
+# (column name, type)
+Schema = List[Tuple[str, str]]
+
+WORDS = ["claim", "benefit", "payment", "region", "status", "rate", "days", "age",
+         "income", "household", "period", "amount", "score", "weight", "count"]
+
+class TraceGenerator:
+    """
+    Synthetic SpecGen Traces: Seeded, so a size + seed names the same trace on every machine.
+    Each block mimics one SPSS job (see tests/fixtures/raw_trace.yaml):
+    1. A lookup file is loaded, SORTed and saved.
+    2. The main file is loaded and runs through long compute chains wrapped in
+       DO/END, FORMATS, IF and EXECUTE noise, with SELECT IF / SORT generics.
+    3. Some blocks fan out into a side extract; the rest join the lookup, except
+       islands, whose join (as SPSS traces often do) names only one input.
+    4. An AGGREGATE is saved and LISTed.
+
+    Records are yielded one at a time, so even 1M-op traces are written in bounded memory.
+    """
+
+    METADATA = {"generator": "SpecGen v0.1 (synthetic)", "source_type": "SPSS"}
+
+    def __init__(self, n_ops: int, seed: int = 0, island_rate: float = 0.1, fan_out_rate: float = 0.3,
+                 max_columns: int = 30):
+        if n_ops < 1:
+            raise ValueError(f"n_ops must be positive, got {n_ops}")
+        self.n_ops = n_ops
+        self.seed = seed
+        self.island_rate = island_rate
+        self.fan_out_rate = fan_out_rate
+        self.max_columns = max_columns
+
+    # --- Output ---
+
+    def write(self, path: Union[str, Path]) -> Path:
+        """Writes the trace as YAML, one flow mapping per record (libyaml parses it like block style)."""
+        path = Path(path)
+        with open(path, "w") as f:
+            f.write(f"metadata: {json.dumps(self.METADATA)}\n")
+            for section in ("datasets", "operations"):
+                f.write(f"{section}:\n")
+                for kind, record in self.records(): # Same seed: the second pass replays the first
+                    if kind == section:
+                        f.write(f"- {json.dumps(record)}\n")
+        return path
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {"metadata": dict(self.METADATA), "datasets": [], "operations": []}
+        for kind, record in self.records():
+            data[kind].append(record)
+        return data
+
+    def records(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """("datasets" | "operations", record) in trace order."""
+        self._rng = random.Random(self.seed)
+        self._ops = 0
+        self._datasets = 0
+        block = 0
+        while True:
+            block += 1
+            for kind, record in self._block(block):
+                yield kind, record
+                if kind == "operations" and self._ops >= self.n_ops:
+                    return # Mid-block is fine: every emitted op is complete
+
+    # --- One SPSS job ---
+
+    def _block(self, b: int) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        rng = self._rng
+        key = f"key_{b}"
+
+        # 1. Lookup file
+        lookup: Schema = [(key, "integer")] + [(f"rate_{b}_{i}", "integer") for i in range(rng.randint(1, 3))]
+        lookup_ds = yield from self._load(f"lookup_{b}", lookup)
+        lookup_ds = yield from self._op("generic", [lookup_ds], lookup, {"command": "SORT", "args": key})
+        lookup_sav = f"file_lookup_{b}.sav"
+        yield from self._op("save", [lookup_ds], lookup, {"filename": f"lookup_{b}.sav"}, output=lookup_sav)
+
+        # 2. Main file through compute chains
+        schema: Schema = [(key, "integer"), (f"group_{b}", "string")]
+        for i in range(rng.randint(2, 8)):
+            schema.append((f"{rng.choice(WORDS)}_{b}_{i}", rng.choice(["integer", "integer", "string"])))
+        tip = yield from self._load(f"main_{b}", schema)
+        for _ in range(rng.randint(1, 4)):
+            tip, schema = yield from self._chain(tip, schema)
+
+        # 3. Fan-out or join
+        if rng.random() < self.fan_out_rate:
+            side, side_schema = tip, schema
+            side = yield from self._op("filter", [side], side_schema, {"condition": f"{key} > 0"})
+            side, side_schema = yield from self._chain(side, side_schema)
+            yield from self._op("save", [side], side_schema, {"filename": f"extract_{b}.sav"}, output=f"file_extract_{b}.sav")
+        tip = yield from self._op("generic", [tip], schema, {"command": "SORT", "args": key})
+        inputs = [tip] if rng.random() < self.island_rate else [tip, lookup_sav]
+        schema = schema + lookup[1:]
+        tip = yield from self._op("join", inputs, schema, {"by": key})
+        tip, schema = yield from self._chain(tip, schema)
+
+        # 4. Summary
+        measure = self._pick(schema, "integer")
+        total = f"TOTAL_{b}"
+        summary: Schema = [(f"group_{b}", "string"), (total, "integer")]
+        tip = yield from self._op("aggregate", [tip], summary, {
+            "outfile": "*", "break": [f"group_{b}"], "aggregations": [f"{total} = SUM ( {measure} )"]
+        })
+        yield from self._op("save", [tip], summary, {"filename": f"summary_{b}.csv"}, output=f"file_summary_{b}.csv")
+        yield from self._op("generic", [tip], summary, {"command": "LIST"})
+
+    def _chain(self, tip: str, schema: Schema):
+        """3-15 computes, interleaved with the noise SPSS leaves around them."""
+        rng = self._rng
+        for _ in range(rng.randint(3, 15)):
+            roll = rng.random()
+            if roll < 0.15:
+                tip = yield from self._op("generic", [tip], schema, {"command": "DO"})
+            elif roll < 0.2:
+                tip = yield from self._op("generic", [tip], schema, {"command": "FORMATS"})
+            elif roll < 0.25:
+                condition = f"{self._pick(schema, 'integer')} > 0"
+                tip = yield from self._op("generic", [tip], schema, {"command": "SELECT IF", "args": condition})
+
+            target = f"{rng.choice(WORDS)}_{self._datasets}"
+            if len(schema) >= self.max_columns:
+                # Overwrite instead of growing: keeps dataset records bounded
+                target = rng.choice([name for name, _ in schema[2:]] or [target])
+            schema = [col for col in schema if col[0] != target] + [(target, "integer")]
+            tip = yield from self._op("compute", [tip], schema, {"target": target, "expression": self._expression(schema[:-1])})
+
+            if roll < 0.15:
+                tip = yield from self._op("generic", [tip], schema, {"command": "END"})
+        if rng.random() < 0.5:
+            tip = yield from self._op("exec", [tip], schema, {})
+        return tip, schema
+
+    def _expression(self, schema: Schema) -> str:
+        rng = self._rng
+        a, b = self._pick(schema, "integer"), self._pick(schema, "integer")
+        text = self._pick(schema, "string")
+        return rng.choice([
+            f"{a} + {b}",
+            f"{a} * {b}",
+            f"TRUNC ( {a} / 100 )",
+            f"( {a} - {b} ) * 2",
+            f"NUMBER ( {text} , F8.0 )",
+            "$SYSMIS",
+            "1",
+        ])
+
+    def _pick(self, schema: Schema, type_: str) -> str:
+        names = [name for name, t in schema if t == type_]
+        return self._rng.choice(names) if names else ""
+
+    # --- Records ---
+
+    OP_TYPES = {
+        "load": "load_csv", "compute": "compute_columns", "generic": "generic_transform",
+        "filter": "filter_rows", "join": "join", "aggregate": "aggregate",
+        "exec": "materialize", "save": "save_binary",
+    }
+    SUFFIXES = {"load": "source", "compute": "derived", "generic": "generic", "filter": "filtered",
+                "join": "joined", "aggregate": "agg", "exec": "materialized"}
+
+    def _load(self, name: str, schema: Schema):
+        output = f"source_{name}.csv"
+        return (yield from self._op("load", [], schema, {"filename": f"{name}.csv", "format": "TXT"}, output=output))
+
+    def _op(self, kind: str, inputs: List[str], schema: Schema, parameters: Dict[str, Any], output: str = None):
+        self._ops += 1
+        if output is None:
+            self._datasets += 1
+            output = f"ds_{self._datasets:07d}_{self.SUFFIXES[kind]}"
+        yield "datasets", {
+            "id": output,
+            "source": "file" if kind in ("load", "save") else "derived",
+            "columns": [{"name": name, "type": t} for name, t in schema],
+        }
+        yield "operations", {
+            "id": f"op_{self._ops:07d}_{kind}", "type": self.OP_TYPES[kind],
+            "inputs": inputs, "outputs": [output], "parameters": parameters,
+        }
+        return output
+
+
+def write_trace(path: Union[str, Path], n_ops: int, seed: int = 0) -> Path:
+    return TraceGenerator(n_ops, seed).write(path)
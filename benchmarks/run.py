@@ -0,0 +1,143 @@
+"""
+Times the optimizer stages on synthetic traces and writes machine-readable results.
+
+    python -m benchmarks.run --sizes 1000 10000 100000 --output bench.json
+    python -m benchmarks.run --sizes 1000 10000 --compare baseline.json
+
+Results from two commits (same sizes and seed) compare stage by stage with --compare.
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+sys.path.append('src')
+
+from etl_optimizer.collapser import VerticalCollapser
+from etl_optimizer.loader import StreamingTraceLoader
+from etl_optimizer.promoter import SemanticPromoter
+from etl_optimizer.validator import SecurityValidator
+from exporters.mermaid import MermaidExporter
+from benchmarks.generator import TraceGenerator
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+STAGES = ["load", "promote", "collapse", "validate_topology", "validate_logic", "mermaid"]
+FORMAT_VERSION = 1
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="ETL Optimizer benchmarks")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Raw op counts to generate (1000000 works, given time and RAM)")
+    parser.add_argument("--seed", type=int, default=0, help="Generator seed; keep it fixed when comparing commits")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per size; the fastest time per stage is kept")
+    parser.add_argument("--output", "-o", type=str, default=None, help="Write results as JSON to this path")
+    parser.add_argument("--compare", type=str, default=None, help="Earlier results JSON to compare against")
+    parser.add_argument("--trace-dir", type=str, default=None, help="Keep the generated traces here (default: a temp dir)")
+    return parser
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    results = run_benchmarks(args.sizes, seed=args.seed, repeat=args.repeat, trace_dir=args.trace_dir)
+    print(results_table(results))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"💾 Results saved to {args.output}")
+    if args.compare:
+        with open(args.compare) as f:
+            print(compare_table(json.load(f), results))
+    return 0
+
+def run_benchmarks(sizes: List[int], seed: int = 0, repeat: int = 1, trace_dir: Optional[str] = None,
+                   log: Callable[..., None] = print) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory() as tmp:
+        out_dir = Path(trace_dir or tmp)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        runs = []
+        for size in sizes:
+            path = out_dir / f"synthetic_{size}_{seed}.yaml"
+            log(f"🏗️  Generating {size} ops (seed {seed})...")
+            TraceGenerator(size, seed).write(path)
+            runs.append(bench_trace(path, size, repeat, log))
+    return {"format": FORMAT_VERSION, "meta": environment(seed), "runs": runs}
+
+def bench_trace(path: Path, size: int, repeat: int = 1, log: Callable[..., None] = print) -> Dict[str, Any]:
+    """Best-of-`repeat` seconds per stage, each stage fed the previous stage's output."""
+    best: Dict[str, float] = {}
+    for _ in range(max(1, repeat)):
+        timings = {}
+        raw = _timed(timings, "load", lambda: StreamingTraceLoader(path).load())
+        promoted = _timed(timings, "promote", lambda: SemanticPromoter(raw).run())
+        optimized = _timed(timings, "collapse", lambda: VerticalCollapser(promoted, mode="dag").run())
+        # Graph construction is part of what a topology check costs
+        _timed(timings, "validate_topology", lambda: SecurityValidator(optimized).validate_topology())
+        validator = SecurityValidator(optimized)
+        _timed(timings, "validate_logic", validator.run)
+        _timed(timings, "mermaid", lambda: MermaidExporter(optimized).generate())
+        for stage, seconds in timings.items():
+            best[stage] = min(seconds, best.get(stage, seconds))
+    log(f"   {size} ops: " + ", ".join(f"{stage} {best[stage]:.3f}s" for stage in STAGES))
+    return {
+        "size": size,
+        "trace_bytes": path.stat().st_size,
+        "ops_raw": len(raw.operations),
+        "ops_optimized": len(optimized.operations),
+        "datasets": len(raw.datasets),
+        "seconds": {stage: round(best[stage], 6) for stage in STAGES},
+    }
+
+def _timed(timings: Dict[str, float], stage: str, fn: Callable[[], Any]) -> Any:
+    started = time.perf_counter()
+    result = fn()
+    timings[stage] = time.perf_counter() - started
+    return result
+
+def environment(seed: int) -> Dict[str, Any]:
+    return {
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": seed,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+# --- Reports ---
+
+def results_table(results: Dict[str, Any]) -> str:
+    lines = [f"{'ops':>9}  " + "  ".join(f"{stage:>17}" for stage in STAGES)]
+    for run in results["runs"]:
+        lines.append(f"{run['size']:>9}  " + "  ".join(f"{run['seconds'][stage]:>16.3f}s" for stage in STAGES))
+    return "\n".join(lines)
+
+def compare_table(baseline: Dict[str, Any], current: Dict[str, Any]) -> str:
+    """current / baseline per stage, for the sizes both runs share (<1.00 is faster)."""
+    before = {run["size"]: run for run in baseline["runs"]}
+    lines = [f"📈 vs {baseline['meta'].get('commit') or 'baseline'} (seed {baseline['meta'].get('seed')}):",
+             f"{'ops':>9}  " + "  ".join(f"{stage:>17}" for stage in STAGES)]
+    if baseline["meta"].get("seed") != current["meta"].get("seed"):
+        lines.insert(1, "⚠️  Different seeds: the traces differ, ratios are only indicative")
+    for run in current["runs"]:
+        old = before.get(run["size"])
+        if old is None:
+            continue
+        cells = []
+        for stage in STAGES:
+            then, now = old["seconds"].get(stage), run["seconds"][stage]
+            cells.append(f"{now / then:>16.2f}x" if then else f"{'-':>17}")
+        lines.append(f"{run['size']:>9}  " + "  ".join(cells))
+    return "\n".join(lines)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,89 +1,276 @@
 import argparse
-import yaml
+import glob
+import os
+import time
 import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 
 # Ensure src is in python path
 sys.path.append('src')
 
-from etl_ir.model import Pipeline
-from src.optimizer.promoter import SemanticPromoter
-from src.optimizer.collapser import VerticalCollapser
-from src.optimizer.validator import SecurityValidator
-from src.exporters.mermaid import MermaidExporter
+from etl_optimizer.cache import IRCache
+from etl_optimizer.incremental import IncrementalOptimizer
+from etl_optimizer.index import PipelineIndex
+from etl_optimizer.loader import StreamingTraceLoader
+from etl_optimizer.collapser import VerticalCollapser
+from etl_optimizer.coordinator import DEFAULT_PASSES
+from etl_optimizer.pass_manager import PassManager
+from etl_optimizer.promoter import SemanticPromoter
+from etl_optimizer.rules import PromotionRules
+from etl_optimizer.serializer import write_pipeline
+from etl_optimizer.validator import SecurityValidator
+from exporters.mermaid import MermaidExporter
 
-def main():
+TRACE_SUFFIXES = {".yaml", ".yml"}
+
+def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="ETL Optimizer & Visualizer")
-    parser.add_argument("input_file", type=str, help="Path to raw SpecGen YAML")
+    parser.add_argument("input_file", type=str, help="Path to raw SpecGen YAML, or a directory/glob of traces (batch mode)")
     # Separate the visual output from the data output
-    parser.add_argument("--visualize", "-v", type=str, help="Output path for Mermaid .md file", default=None)
-    parser.add_argument("--dump-yaml", "-y", type=str, help="Output path for Optimized IR (YAML)", default=None)
-    parser.add_argument("--patch-islands", action="store_true", help="Apply fix for disconnected SPSS joins (Demo Only)")
-    
+    parser.add_argument("--visualize", "-v", type=str, help="Output path for Mermaid .md file (a directory in batch mode)", default=None)
+    parser.add_argument("--cluster-by", choices=["component", "barrier"], default=None, help="Group the diagram into subgraphs per connected component or per stage between barriers")
+    parser.add_argument("--collapse-datasets", action="store_true", help="Draw intermediate datasets as edge labels instead of nodes")
+    parser.add_argument("--dump-yaml", "-y", type=str, help="Output path for Optimized IR (YAML, or JSON for .json) (a directory in batch mode)", default=None)
+    parser.add_argument("--patch-islands", action="store_true", help="Apply fix for disconnected SPSS joins (Demo Only; single trace, ignored in batch mode)")
+    parser.add_argument("--collapse-mode", choices=["linear", "dag"], default="dag", help="Fuse compute chains by list order or by dataflow graph")
+    parser.add_argument("--cache-dir", type=str, help="Directory for the binary IR cache (default: ~/.cache/etl_optimizer)", default=None)
+    parser.add_argument("--no-cache", action="store_true", help="Always re-parse the trace, bypassing the IR cache")
+    parser.add_argument("--trusted", action="store_true", help="Skip schema validation on load (traces from our own SpecGen build only)")
+    parser.add_argument("--promotion-rules", type=str, default=None, help="YAML/JSON file of noise and promotion rules for generic ops (default: built-in SORT/FILTER rules)")
+    parser.add_argument("--max-iterations", type=int, default=4, help="Cap on optimization rounds before giving up on a fixed point")
+    parser.add_argument("--profile", action="store_true", help="Print per-pass timing, memory and op/dataset counts")
+    parser.add_argument("--incremental", type=str, default=None, metavar="STATE", help="Fast edit-rerun path: promote + DAG collapse + validate only, reusing the run stored in STATE (single trace; honours --promotion-rules)")
+    # Batch mode
+    parser.add_argument("--jobs", "-j", type=int, default=os.cpu_count() or 1, help="Worker processes in batch mode")
+    parser.add_argument("--max-tasks-per-child", type=int, default=50, help="Recycle a batch worker after this many traces (caps memory growth)")
+    parser.add_argument("--worker-memory-mb", type=int, default=None, help="Address-space limit per batch worker (Unix only)")
+    return parser
+
+def main():
+    parser = build_parser()
     args = parser.parse_args()
-    
+    if args.incremental and args.collapse_mode != "dag":
+        # Linear mode fuses by list order, which a spliced re-run cannot reproduce
+        parser.error("--incremental only supports --collapse-mode dag")
+
+    inputs = batch_inputs(args.input_file)
+    if inputs is not None:
+        sys.exit(run_batch(inputs, args))
+
     # 1. Load
     input_path = Path(args.input_file)
     if not input_path.exists():
         print(f"❌ Error: File not found: {input_path}")
         sys.exit(1)
-        
-    print(f"🔄 Loading {input_path}...")
-    with open(input_path, "r") as f:
-        data = yaml.safe_load(f)
-    
-    pipeline = Pipeline(**data)
+    optimize_file(input_path, args, args.dump_yaml, args.visualize)
+
+def optimize_file(input_path: Path, args, dump_yaml=None, visualize=None, log=print) -> dict:
+    """Loads, optimizes and exports one trace. Returns its summary row."""
+    started = time.perf_counter()
+    log(f"🔄 Loading {input_path}...")
+    if args.no_cache:
+        # Streams records through libyaml; never holds the raw document tree
+        pipeline = StreamingTraceLoader(input_path, trusted=args.trusted).load()
+    else:
+        cache = IRCache(args.cache_dir, trusted=args.trusted)
+        pipeline = cache.load(input_path)
+        log(f"   (IR cache {'hit' if cache.hits else 'miss'})")
     initial_count = len(pipeline.operations)
-    
+
+    index = PipelineIndex(pipeline)
+
     # 🩹 Optional Patch
     if args.patch_islands:
-        print("🩹 Applying 'Island Patch' for implicit SPSS joins...")
-        join_op_1 = next((op for op in pipeline.operations if op.id == "op_029_join"), None)
-        if join_op_1 and "file_control_values.sav" not in join_op_1.inputs:
-            join_op_1.inputs.append("file_control_values.sav")
-            
-        join_op_2 = next((op for op in pipeline.operations if op.id == "op_053_join"), None)
-        if join_op_2 and "file_benefit_rates.sav" not in join_op_2.inputs:
-            join_op_2.inputs.append("file_benefit_rates.sav")
-
-    # 2. Optimize
-    print("🧠 Running Semantic Promotion...")
-    promoter = SemanticPromoter(pipeline)
-    pipeline = promoter.run()
-    
-    print("📉 Running Vertical Collapse...")
-    collapser = VerticalCollapser(pipeline)
-    pipeline = collapser.run()
-    
-    final_count = len(pipeline.operations)
-    reduction = ((initial_count - final_count) / initial_count) * 100
-    print(f"✅ Optimization Complete: {initial_count} ops -> {final_count} ops (-{reduction:.1f}%)")
+        log("🩹 Applying 'Island Patch' for implicit SPSS joins...")
+        if index.op("op_029_join"):
+            index.add_input("op_029_join", "file_control_values.sav")
+        if index.op("op_053_join"):
+            index.add_input("op_053_join", "file_benefit_rates.sav")
 
+    # 2. Optimize (to a fixed point; see etl_optimizer.coordinator.DEFAULT_PASSES)
+    rules = PromotionRules.from_file(args.promotion_rules) if args.promotion_rules else None
+    if args.incremental:
+        # Promote + collapse only: no pushdown, ordering, fusion, CSE or DCE
+        log(f"⚡ Incremental run (promote + collapse) against {args.incremental}...")
+        optimizer = IncrementalOptimizer(args.incremental, rules=rules)
+        pipeline = optimizer.optimize(pipeline)
+        log(f"   ({optimizer.mode} run, {len(optimizer.last_affected)} ops re-optimized)")
+        return _export(pipeline, input_path, initial_count, started, args, dump_yaml, visualize, log)
 
-# 3. Export Data
-    if args.dump_yaml:
-        print(f"💾 Saving Optimized IR to {args.dump_yaml}...")
-        
-        # 🔴 THE BUG: This keeps Enums as Python Objects
-        # data_dict = pipeline.model_dump(exclude_none=True) 
+    log(f"🧠 Running Optimization Passes (up to {args.max_iterations} rounds)...")
+    manager = PassManager(max_iterations=args.max_iterations, track_memory=args.profile)
+    for name, factory in DEFAULT_PASSES:
+        if name == "promote" and rules:
+            factory = lambda p, i: SemanticPromoter(p, i, rules=rules)
+        if name == "collapse":
+            factory = lambda p, i: VerticalCollapser(p, i, mode=args.collapse_mode)
+        manager.register(name, factory)
+    pipeline = manager.run(pipeline, index)
+    log(f"   ({manager.iterations} rounds, {'converged' if manager.converged else 'iteration cap hit'})")
 
-        # 🟢 THE FIX: Add mode='json' to convert Enums -> Strings
-        data_dict = pipeline.model_dump(mode='json', exclude_none=True)
-        
-        with open(args.dump_yaml, "w") as f:
-            yaml.dump(data_dict, f, sort_keys=False)
+    runs = manager.instances
+    for pushdown in runs.get("pushdown", []):
+        for filter_id, passed in pushdown.pushed.items():
+            log(f"   ⏫ {filter_id} moved above {len(passed)} ops")
+    if "ordering" in runs:
+        dropped_sorts = sum(len(ordering.dropped_sorts) for ordering in runs["ordering"])
+        log(f"   🔢 dropped {dropped_sorts} sorts; joins: {runs['ordering'][-1].join_strategies}")
+    if "cse" in runs:
+        saved = sum(cse.saved_evaluations for cse in runs["cse"])
+        log(f"   ♻️  saved {saved} evaluations per row")
+    if "dce" in runs:
+        dropped = sum(len(targets) for dce in runs["dce"] for targets in dce.dropped_computes.values())
+        narrowed = len({ds_id for dce in runs["dce"] for ds_id in dce.dropped_columns})
+        log(f"   ✂️  dropped {dropped} dead computes, narrowed {narrowed} datasets")
+    if args.profile:
+        log(manager.report())
+    return _export(pipeline, input_path, initial_count, started, args, dump_yaml, visualize, log)
+
+def _export(pipeline, input_path: Path, initial_count: int, started: float, args, dump_yaml, visualize, log) -> dict:
+    """Writes the optimized IR and diagram. Returns the trace's summary row."""
+    final_count = len(pipeline.operations)
+    reduction = ((initial_count - final_count) / initial_count) * 100 if initial_count else 0.0
+    log(f"✅ Optimization Complete: {initial_count} ops -> {final_count} ops (-{reduction:.1f}%)")
 
 
+# 3. Export Data
+    if dump_yaml:
+        log(f"💾 Saving Optimized IR to {dump_yaml}...")
+        # Streams record by record; .json writes JSON, anything else YAML through libyaml
+        # (the same document as yaml.dump; see PipelineSerializer for where the bytes differ)
+        write_pipeline(pipeline, dump_yaml)
 
     # 4. Export Visualization
-    if args.visualize:
-        print(f"📊 Saving Visualization to {args.visualize}...")
+    if visualize:
+        log(f"📊 Saving Visualization to {visualize}...")
         exporter = MermaidExporter(pipeline)
-        diagram = exporter.generate()
-        with open(args.visualize, "w") as f:
+        with open(visualize, "w") as f:
             f.write("```mermaid\n")
-            f.write(diagram)
-            f.write("\n```")
+            exporter.write(f, cluster_by=args.cluster_by, collapse_datasets=args.collapse_datasets)
+            f.write("```")
+
+    return {
+        "file": str(input_path),
+        "ops_before": initial_count,
+        "ops_after": final_count,
+        "reduction": reduction,
+        "seconds": time.perf_counter() - started,
+        "error": None,
+    }
+
+# --- Batch Mode ---
+
+def batch_inputs(spec: str):
+    """Trace files for a directory or glob argument; None for a single file."""
+    path = Path(spec)
+    if path.is_dir():
+        return sorted(p for p in path.iterdir() if p.suffix.lower() in TRACE_SUFFIXES)
+    if not path.exists() and glob.has_magic(spec):
+        return sorted(Path(p) for p in glob.glob(spec, recursive=True) if Path(p).is_file())
+    return None
+
+def run_batch(inputs, args) -> int:
+    """Optimizes every trace across a process pool. Returns the exit code."""
+    if not inputs:
+        print(f"❌ Error: No traces match {args.input_file}")
+        return 1
+    names = batch_output_names(inputs)
+    clashes = _clashing_names(names)
+    if clashes and (args.dump_yaml or args.visualize):
+        print(f"❌ Error: Traces would overwrite each other's outputs: {', '.join(clashes)}")
+        return 1
+    if args.patch_islands:
+        # The island patch names ops of one specific trace; it means nothing for the others
+        print("⚠️  --patch-islands only applies to a single trace; ignored in batch mode")
+        args = argparse.Namespace(**{**vars(args), "patch_islands": False})
+    if args.incremental:
+        # One state file holds one trace's last run
+        print("⚠️  --incremental only applies to a single trace; ignored in batch mode")
+        args = argparse.Namespace(**{**vars(args), "incremental": None})
+    for out_dir in (args.dump_yaml, args.visualize):
+        if out_dir:
+            Path(out_dir).mkdir(parents=True, exist_ok=True)
+
+    jobs = max(1, min(args.jobs, len(inputs)))
+    print(f"📦 Batch: {len(inputs)} traces on {jobs} workers...")
+    started = time.perf_counter()
+    rows = []
+    pool_options = {"initializer": _limit_worker_memory, "initargs": (args.worker_memory_mb,)}
+    if sys.version_info >= (3, 11):
+        # Recycling workers bounds how much memory a worker can pile up
+        pool_options["max_tasks_per_child"] = args.max_tasks_per_child
+    with ProcessPoolExecutor(max_workers=jobs, **pool_options) as pool:
+        futures = {pool.submit(_optimize_batch_item, path, names[path], args): path for path in inputs}
+        for future in as_completed(futures):
+            try:
+                rows.append(future.result())
+            except Exception as e: # A dead worker (e.g. MemoryError past the limit) fails only its file
+                rows.append({"file": str(futures[future]), "error": _describe(e)})
+
+    rows.sort(key=lambda row: row["file"])
+    print(summary_table(rows, time.perf_counter() - started))
+    return 1 if any(row["error"] for row in rows) else 0
+
+def batch_output_names(inputs):
+    """
+    Output name per trace: its path below the inputs' common directory, minus
+    the suffix, so traces in different subdirectories never share a name.
+    """
+    root = Path(os.path.commonpath([p.parent.resolve() for p in inputs])) if inputs else None
+    return {p: p.resolve().relative_to(root).with_suffix("") for p in inputs}
+
+def _clashing_names(names):
+    """Output names claimed by more than one trace (e.g. a.yaml and a.yml side by side)."""
+    seen = {}
+    for path, name in names.items():
+        seen.setdefault(name, []).append(path)
+    return sorted(" / ".join(str(p) for p in paths) for paths in seen.values() if len(paths) > 1)
+
+def _optimize_batch_item(path: Path, name: Path, args) -> dict:
+    dump_yaml = _output_path(args.dump_yaml, name, ".yaml")
+    visualize = _output_path(args.visualize, name, ".md")
+    try:
+        return optimize_file(path, args, dump_yaml, visualize, log=lambda *_: None)
+    except Exception as e:
+        return {"file": str(path), "error": _describe(e)}
+
+def _output_path(out_dir, name: Path, suffix: str):
+    if not out_dir:
+        return None
+    path = Path(out_dir) / name.with_name(name.name + suffix)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return path
+
+def _describe(error: Exception) -> str:
+    first_line = (str(error).splitlines() or [""])[0]
+    return f"{type(error).__name__}: {first_line}"
+
+def _limit_worker_memory(megabytes):
+    if not megabytes:
+        return
+    try:
+        import resource
+    except ImportError: # Not available on Windows
+        return
+    limit = megabytes * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+def summary_table(rows, wall_time: float) -> str:
+    width = max([len("file")] + [len(row["file"]) for row in rows])
+    lines = [f"{'file':<{width}}  {'ops':>15}  {'reduction':>9}  {'time (s)':>8}"]
+    for row in rows:
+        if row["error"]:
+            lines.append(f"{row['file']:<{width}}  ❌ {row['error']}")
+            continue
+        ops = f"{row['ops_before']} -> {row['ops_after']}"
+        reduction = f"-{row['reduction']:.1f}%"
+        lines.append(f"{row['file']:<{width}}  {ops:>15}  {reduction:>9}  {row['seconds']:>8.2f}")
+    done = [row for row in rows if not row["error"]]
+    failed = len(rows) - len(done)
+    cpu_time = sum(row["seconds"] for row in done)
+    lines.append(f"✅ {len(done)} optimized, {failed} failed in {wall_time:.2f}s wall ({cpu_time:.2f}s in workers)")
+    return "\n".join(lines)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
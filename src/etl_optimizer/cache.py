@@ -0,0 +1,109 @@
+import hashlib
+import json
+import mmap
+import os
+import pickle
+import tempfile
+from functools import lru_cache
+from importlib import metadata
+from pathlib import Path
+from typing import Optional, Union
+import pydantic
+from etl_ir.model import Pipeline
+from .loader import StreamingTraceLoader
+
+def _default_cache_dir() -> Path:
+    if os.environ.get("ETL_OPTIMIZER_CACHE"):
+        return Path(os.environ["ETL_OPTIMIZER_CACHE"])
+    xdg = os.environ.get("XDG_CACHE_HOME")
+    base = Path(xdg) if xdg else Path.home() / ".cache"
+    return base / "etl_optimizer"
+
+@lru_cache(maxsize=None)
+def _model_fingerprint() -> str:
+    """etl-ir-core's version plus a hash of the Pipeline schema: either changes when the model does."""
+    try:
+        version = metadata.version("etl-ir-core")
+    except metadata.PackageNotFoundError: # Run from a source checkout
+        version = "unknown"
+    schema = json.dumps(Pipeline.model_json_schema(), sort_keys=True).encode()
+    return f"etl-ir-core={version}|schema={hashlib.sha256(schema).hexdigest()[:16]}"
+
+class IRCache:
+    """
+    Binary IR Cache: Skips YAML parsing + Pydantic validation on repeat runs.
+    1. Keys each trace by the SHA-256 of its bytes (plus format/library versions
+       and the IR model's schema).
+    2. Stores the validated Pipeline as a pickle (protocol 5).
+    3. A hit is one mmap'd read and an unpickle - no validation is re-run.
+
+    Entries are trusted: the cache directory must only be writable by its owner.
+    trusted=True parses misses without validation (see StreamingTraceLoader);
+    those entries are keyed apart, so a validating run never reads them.
+    """
+
+    FORMAT_VERSION = 1
+
+    def __init__(self, cache_dir: Optional[Union[str, Path]] = None, trusted: bool = False):
+        self.cache_dir = Path(cache_dir) if cache_dir else _default_cache_dir()
+        self.trusted = trusted
+        self.hits = 0
+        self.misses = 0
+
+    def load(self, path: Union[str, Path]) -> Pipeline:
+        """Returns the validated Pipeline for a trace file, parsing it only on a miss."""
+        entry = self._entry_path(self.key(path))
+
+        pipeline = self._read(entry)
+        if pipeline is not None:
+            self.hits += 1
+            return pipeline
+
+        self.misses += 1
+        pipeline = StreamingTraceLoader(path, trusted=self.trusted).load()
+        self._write(entry, pipeline)
+        return pipeline
+
+    def key(self, path: Union[str, Path]) -> str:
+        digest = hashlib.sha256(self._salt())
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return digest.hexdigest() # mmap refuses empty files
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                digest.update(mm)
+        return digest.hexdigest()
+
+    def _salt(self) -> bytes:
+        # A model or library upgrade must never resurrect stale pickles
+        mode = "|trusted" if self.trusted else ""
+        return f"v{self.FORMAT_VERSION}|pydantic={pydantic.VERSION}|{_model_fingerprint()}{mode}".encode()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.pkl"
+
+    def _read(self, entry: Path) -> Optional[Pipeline]:
+        try:
+            with open(entry, "rb") as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    pipeline = pickle.loads(mm)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            # Corrupt or incompatible entry: drop it and fall back to parsing
+            entry.unlink(missing_ok=True)
+            return None
+
+        return pipeline if isinstance(pipeline, Pipeline) else None
+
+    def _write(self, entry: Path, pipeline: Pipeline):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        # Write-then-rename, so concurrent runs never read a half-written entry
+        fd, tmp_name = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(pipeline, f, protocol=5)
+            os.replace(tmp_name, entry)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
@@ -1,46 +1,121 @@
-from typing import List, Set
+from typing import Dict, List, Set, Iterable, Iterator, Optional
 from etl_ir.model import Pipeline, Operation, Dataset
 from etl_ir.types import OpType
+from .construct import make_op, make_pipeline
+from .index import PipelineIndex
+from .rewriter import PipelineRewriter
 
 class VerticalCollapser:
     """
     Optimization Pass: 
     1. Merges consecutive COMPUTE operations *if they are connected*.
     2. Performs Garbage Collection on orphaned datasets.
+
+    Modes:
+    - "linear": merges an op with the one right before it in list order (streamable).
+    - "dag": walks the dataflow graph and fuses every single-producer/single-consumer
+      COMPUTE chain, however the trace interleaves its branches.
     """
+
+    MODES = {"linear", "dag"}
     
-    def __init__(self, pipeline: Pipeline):
+    def __init__(self, pipeline: Pipeline, index: Optional[PipelineIndex] = None, mode: str = "linear"):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown collapse mode '{mode}'. Expected one of {sorted(self.MODES)}")
         self.pipeline = pipeline
+        self.index = index # Kept in sync when shared by the coordinator
+        self.mode = mode
         self.buffer: List[Operation] = []
         self.new_ops: List[Operation] = []
+        self.provenance: Dict[str, List[str]] = {} # batch op_id -> ids of the ops it replaced
 
     def run(self) -> Pipeline:
-        self.new_ops = []
+        if self.mode == "dag":
+            result = self._collapse_dag()
+            self.new_ops = result.operations
+            return result
+
+        self.new_ops = list(self.stream(self.pipeline.operations))
+        
+        clean_datasets = self._gc_datasets(self.new_ops, self.pipeline.datasets)
+
+        return make_pipeline(
+            metadata=self.pipeline.metadata,
+            datasets=clean_datasets,
+            operations=self.new_ops
+        )
+
+    def stream(self, operations: Iterable[Operation]) -> Iterator[Operation]:
+        """
+        Collapses an operation stream lazily. Only the current compute chain
+        is buffered; dataset GC is left to run(), which sees the whole pipeline.
+        """
         self.buffer = []
 
-        for op in self.pipeline.operations:
+        for op in operations:
             # 1. Check basic type
             if op.type == OpType.COMPUTE_COLUMNS:
                 # 2. Check Lineage Continuity
-                if self._is_connected_to_buffer(op):
-                    self.buffer.append(op)
-                else:
+                if not self._is_connected_to_buffer(op):
                     # Not connected (different branch) or buffer empty
-                    self._flush_buffer()
-                    self.buffer.append(op)
+                    yield from self._flush_buffer()
+                self.buffer.append(op)
             else:
-                self._flush_buffer()
-                self.new_ops.append(op)
-        
-        self._flush_buffer() 
+                yield from self._flush_buffer()
+                yield op
         
-        clean_datasets = self._gc_datasets(self.new_ops, self.pipeline.datasets)
+        yield from self._flush_buffer() 
 
-        return Pipeline(
-            metadata=self.pipeline.metadata,
-            datasets=clean_datasets,
-            operations=self.new_ops
-        )
+    def _collapse_dag(self) -> Pipeline:
+        """
+        Fuses maximal compute chains found via producer/consumer links, editing
+        the pipeline in place: ops outside a chain are never copied.
+        Each batch takes the list slot of its last member, which keeps the
+        operation list topologically ordered.
+        """
+        index = self.index or PipelineIndex(self.pipeline)
+        operations = self.pipeline.operations
+
+        # 1. Link every compute op to its unique compute successor
+        next_of = {}
+        has_prev: Set[str] = set()
+        for op in operations:
+            if op.type == OpType.COMPUTE_COLUMNS:
+                successor = self._chain_successor(op, index)
+                if successor:
+                    next_of[op.id] = successor
+                    has_prev.add(successor.id)
+
+        # 2. Walk each chain from its head (ops inside a cycle have no head)
+        heads = [op for op in operations if op.id in next_of and op.id not in has_prev]
+        rewriter = PipelineRewriter(self.pipeline, index)
+        for op in heads:
+            chain = [op]
+            while chain[-1].id in next_of:
+                chain.append(next_of[chain[-1].id])
+            rewriter.splice([member.id for member in chain], self._create_batch_op(chain))
+
+        # 3. GC datasets the fused chains no longer touch
+        rewriter.gc_datasets()
+        return rewriter.snapshot()
+
+    def _chain_successor(self, op: Operation, index: PipelineIndex) -> Optional[Operation]:
+        """
+        Returns the compute op that can be fused after `op`: its output must be
+        written only by `op` and read only by that successor (otherwise the
+        intermediate dataset has to materialize anyway).
+        """
+        if len(op.outputs) != 1:
+            return None
+        link = op.outputs[0]
+        consumers = index.consumers_of(link)
+        if index.producers_of(link) != [op.id] or len(consumers) != 1:
+            return None
+
+        successor = index.op(consumers[0])
+        if successor.type != OpType.COMPUTE_COLUMNS or successor.inputs != [link]:
+            return None
+        return successor
 
     def _is_connected_to_buffer(self, current_op: Operation) -> bool:
         """
@@ -60,34 +135,50 @@ class VerticalCollapser:
         
         return not last_outputs.isdisjoint(current_inputs)
 
-    def _flush_buffer(self):
+    def _flush_buffer(self) -> Iterator[Operation]:
         if not self.buffer:
             return
 
         if len(self.buffer) == 1:
-            self.new_ops.append(self.buffer[0])
+            yield self.buffer[0]
         else:
-            self.new_ops.append(self._create_batch_op())
+            batch_op = self._create_batch_op(self.buffer)
+            if self.index:
+                for op in self.buffer:
+                    self.index.remove_op(op.id)
+                self.index.add_op(batch_op)
+            yield batch_op
         
-        self.buffer.clear()
+        self.buffer = []
 
-    def _create_batch_op(self) -> Operation:
-        first_op = self.buffer[0]
-        last_op = self.buffer[-1]
+    def _create_batch_op(self, chain: List[Operation]) -> Operation:
+        first_op = chain[0]
+        last_op = chain[-1]
+        self.provenance[f"batch_{first_op.id}"] = [op.id for op in chain]
         
-        return Operation(
+        return make_op(
             id=f"batch_{first_op.id}",
             type=OpType.BATCH_COMPUTE,
             inputs=first_op.inputs,
             outputs=last_op.outputs,
             parameters={
-                'computes': [op.parameters for op in self.buffer]
+                'computes': [op.parameters for op in chain]
             }
         )
     
     def _gc_datasets(self, ops: List[Operation], datasets: List[Dataset]) -> List[Dataset]:
+        if self.index:
+            # The index already knows every live edge; no need to rescan ops
+            clean = []
+            for ds in datasets:
+                if self.index.is_active(ds.id):
+                    clean.append(ds)
+                else:
+                    self.index.drop_dataset(ds.id)
+            return clean
+
         active_ids: Set[str] = set()
         for op in ops:
             active_ids.update(op.inputs)
             active_ids.update(op.outputs)
-        return [ds for ds in datasets if ds.id in active_ids]
\ No newline at end of file
+        return [ds for ds in datasets if ds.id in active_ids]
@@ -0,0 +1,83 @@
+from typing import Any, Callable, Dict, Tuple, Type, TypeVar
+from pydantic import BaseModel
+from etl_ir.model import Pipeline, Operation, Dataset, Column
+from etl_ir.types import OpType, DataType
+
+# Validation happens at the boundary: loading a trace, or a Pipeline(...) built by
+# user code. Inside the passes every op/dataset is assembled from parts that are
+# already valid, so these builders skip Pydantic and re-validate nothing.
+
+Model = TypeVar("Model", bound=BaseModel)
+
+def _builder(cls: Type[Model]) -> Callable[..., Model]:
+    """
+    model_construct, the supported way to skip validation. A model that
+    declares validators is validated instead: model_construct would skip them
+    silently, and they may normalize or reject what the passes build.
+    """
+    decorators = getattr(cls, "__pydantic_decorators__", None)
+    if decorators is None or decorators.model_validators or decorators.field_validators:
+        return cls
+    return cls.model_construct
+
+def _op_builder() -> Callable[..., Operation]:
+    construct = _builder(Operation)
+
+    def make_op(**values: Any) -> Operation:
+        # Own lists: ops built from an old op must not share its inputs/outputs
+        # (PipelineIndex.add_input appends in place)
+        for name in ("inputs", "outputs"):
+            if name in values:
+                values[name] = list(values[name])
+        return construct(**values)
+
+    return make_op
+
+# Drop-ins for Operation(...), Dataset(...), Pipeline(...) when every field is already valid
+make_op = _op_builder()
+make_dataset = _builder(Dataset)
+make_pipeline = _builder(Pipeline)
+_make_column = _builder(Column)
+
+# --- Trusted ingest ---
+
+class TrustedBuilder:
+    """
+    Builds records from a trusted source (our own SpecGen build) as parsed,
+    without validation; only enum fields are converted so the passes can compare them.
+    Anything the schema would have rejected goes through unnoticed.
+
+    Validating a dict is already fast in pydantic-core, so what this saves is
+    the columns: a trace repeats the same (name, type) in every derived dataset,
+    and all of them share one Column instance here.
+    """
+
+    OP_TYPES = {t.value: t for t in OpType}
+    DATA_TYPES = {t.value: t for t in DataType}
+
+    def __init__(self):
+        self.columns: Dict[Tuple[str, str], Column] = {}
+
+    def operation(self, data: Dict[str, Any]) -> Operation:
+        return make_op(**{
+            **data,
+            "type": self.OP_TYPES.get(data["type"]) or OpType(data["type"]),
+            "inputs": data.get("inputs") or [],
+            "outputs": data.get("outputs") or [],
+            "parameters": data.get("parameters") or {},
+        })
+
+    def dataset(self, data: Dict[str, Any]) -> Dataset:
+        return make_dataset(**{**data, "columns": [self._column(col) for col in data.get("columns") or []]})
+
+    def _column(self, data: Dict[str, Any]) -> Column:
+        if len(data) != 2:
+            return self._new_column(data) # Extra keys: not worth sharing
+        key = (data.get("name"), data.get("type"))
+        column = self.columns.get(key)
+        if column is None:
+            column = self.columns[key] = self._new_column(data)
+        return column
+
+    def _new_column(self, data: Dict[str, Any]) -> Column:
+        return _make_column(**{**data, "type": self.DATA_TYPES.get(data["type"]) or DataType(data["type"])})
@@ -1,32 +1,81 @@
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
+from etl_ir.model import Pipeline
+from .cache import IRCache
 from .collapser import VerticalCollapser
+from .cse import SubexpressionEliminator
+from .fusion import HorizontalFuser
+from .index import PipelineIndex
+from .liveness import DeadColumnEliminator
+from .ordering import OrderingOptimizer
+from .pass_manager import PassFactory, PassManager
 from .promoter import SemanticPromoter 
+from .pushdown import PredicatePushdown
+from .taint import TaintPolicy
 from .validator import SecurityValidator
 
+# The default schedule. Every factory takes (pipeline, shared index).
+DEFAULT_PASSES: List[Tuple[str, PassFactory]] = [
+    ("promote", SemanticPromoter),                                   # 1. Promote Metadata
+    ("pushdown", PredicatePushdown),                                 # 2. Push Filters upstream
+    ("ordering", OrderingOptimizer),                                 # 3. Drop Redundant Sorts & Plan Joins
+    ("collapse", lambda p, index: VerticalCollapser(p, index, mode="dag")), # 4. Collapse Vertical Logic
+    ("fuse", HorizontalFuser),                                       # 5. Fuse Sibling Scans
+    ("cse", SubexpressionEliminator),                                # 6. Share Repeated Sub-expressions
+    ("dce", DeadColumnEliminator),                                   # 7. Drop Dead Columns
+]
+
 class OptimizationCoordinator:
-    def optimize(self, pipeline):
+    def __init__(self, cache: Optional[IRCache] = None, passes: Optional[List[Tuple[str, PassFactory]]] = None,
+                 max_iterations: int = 4, track_memory: bool = False, validation_workers: int = 1,
+                 taint_policy: Optional[TaintPolicy] = None):
+        self.cache = cache or IRCache()
+        self.taint_policy = taint_policy
+        self.validation_workers = validation_workers # > 1: validate connected components in parallel
+        self.manager = PassManager(max_iterations=max_iterations, track_memory=track_memory)
+        for name, factory in (DEFAULT_PASSES if passes is None else passes):
+            self.manager.register(name, factory)
+
+    @property
+    def stats(self):
+        """Per-pass statistics of the last optimize() call."""
+        return self.manager.stats
+
+    def optimize(self, pipeline: Union[Pipeline, str, Path]):
         """
         Orchestrates the optimization passes.
+        Accepts a Pipeline or a path to a raw trace (loaded through the IR cache).
         """
-        # 1. Promote Metadata
-        promoter = SemanticPromoter(pipeline)
-        pipeline = promoter.run()
-        
-        # 2. Collapse Vertical Logic
-        collapser = VerticalCollapser(pipeline)
-        pipeline = collapser.run()  
+        if isinstance(pipeline, (str, Path)):
+            pipeline = self.cache.load(pipeline)
+
+        # Built once; every pass keeps it in sync incrementally
+        index = PipelineIndex(pipeline)
+
+        # Run the schedule until nothing changes (e.g. promoter DCE reconnecting chains)
+        pipeline = self.manager.run(pipeline, index)
         
-        # 3. Validate Security & Topology
-        validator = SecurityValidator(pipeline)
+        # Validate Security & Topology
+        validator = SecurityValidator(pipeline, index, policy=self.taint_policy)
         
         # Check A: Structure (Cycles, Islands)
-        topo_errors = validator.validate_topology()
+        if self.validation_workers > 1:
+            topo_errors, logic_errors = validator.validate_partitioned(self.validation_workers)
+        else:
+            topo_errors, logic_errors = validator.validate_topology(), None
         if topo_errors:
             raise ValueError(f"CRITICAL: Topology Violation: {topo_errors}")
 
         # Check B: Logic (Ghost Columns)
         # 🟢 FIX: Call .run() instead of .validate()
-        logic_errors = validator.run()
+        if logic_errors is None:
+            logic_errors = validator.run()
         if logic_errors:
             raise ValueError(f"CRITICAL: Validation Failed: {logic_errors}")
+
+        # Check C: PII Leakage (only with a policy)
+        pii_errors = validator.validate_pii()
+        if pii_errors:
+            raise ValueError(f"CRITICAL: PII Leakage: {pii_errors}")
         
-        return pipeline
\ No newline at end of file
+        return pipeline
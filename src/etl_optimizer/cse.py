@@ -0,0 +1,276 @@
+from typing import Dict, List, Optional, Tuple
+from etl_ir.model import Pipeline, Operation
+from etl_ir.types import OpType
+from .construct import make_op, make_pipeline
+from .expressions import (
+    Expr, Variable, UnaryOp, BinaryOp, Call, parse_expression, to_source, walk
+)
+from .index import PipelineIndex
+
+class SubexpressionEliminator:
+    """
+    Optimization Pass (runs after VerticalCollapser / HorizontalFuser):
+    1. Value-numbers every subtree of a BATCH_COMPUTE's computes, keyed by the
+       *version* of each column it reads (a reassigned column is a new value).
+    2. Reuses a compute's own target when a later expression repeats it.
+    3. Hoists other repeated subtrees into temporary columns ('__cse_N'),
+       defined right before their first use and flagged 'temporary' so they
+       never leak into the output datasets.
+    4. In a horizontally fused batch, a target is only reused by entries with
+       the same 'output' tag (or by any entry when it is untagged): each output
+       keeps its own entries, so another branch's target may be dropped (DCE).
+       Temps are untagged and shared by every branch.
+
+    Filters of fused batches are left untouched.
+    """
+
+    TEMP_PREFIX = "__cse_"
+
+    # Never share these: each call must produce fresh values
+    VOLATILE_FUNCTIONS = {"UNIFORM", "NORMAL"}
+
+    def __init__(self, pipeline: Pipeline, index: Optional[PipelineIndex] = None):
+        self.pipeline = pipeline
+        self.index = index # Kept in sync when shared by the coordinator
+        self.new_ops: List[Operation] = []
+        self.report: Dict[str, int] = {} # batch op_id -> evaluations saved per row
+
+    @property
+    def saved_evaluations(self) -> int:
+        """Operator/function evaluations saved per row, across all batches."""
+        return sum(self.report.values())
+
+    def run(self) -> Pipeline:
+        self.new_ops = []
+        self.report = {}
+        for op in self.pipeline.operations:
+            if op.type == OpType.BATCH_COMPUTE:
+                op = self._eliminate(op)
+            self.new_ops.append(op)
+
+        return make_pipeline(
+            metadata=self.pipeline.metadata,
+            datasets=self.pipeline.datasets,
+            operations=self.new_ops
+        )
+
+    def _eliminate(self, op: Operation) -> Operation:
+        computes = op.parameters.get("computes", [])
+        parsed = [self._parse(entry) for entry in computes]
+        if sum(expr is not None for expr in parsed) < 2:
+            return op
+
+        keys = self._number_values(computes, parsed)
+        rewritten = _Rewriter(self, keys, op.outputs).rewrite(computes, parsed)
+
+        saved = _cost(parsed) - _cost(expr for _, expr in rewritten)
+        if saved <= 0:
+            return op
+        self.report[op.id] = saved
+
+        new_computes = []
+        for entry, expr in rewritten:
+            if expr is not None:
+                entry = {**entry, "expression": to_source(expr)}
+            new_computes.append(entry)
+
+        new_op = make_op(
+            id=op.id,
+            type=op.type,
+            inputs=op.inputs,
+            outputs=op.outputs,
+            parameters={**op.parameters, "computes": new_computes}
+        )
+        if self.index:
+            self.index.replace_op(new_op)
+        return new_op
+
+    def _parse(self, entry: dict) -> Optional[Expr]:
+        expression = entry.get("expression")
+        if not entry.get("target") or not isinstance(expression, str):
+            return None
+        try:
+            return parse_expression(expression)
+        except ValueError:
+            return None # Opaque entry: kept verbatim, only its target is tracked
+
+    def _number_values(self, computes: List[dict], parsed: List[Optional[Expr]]) -> List[Dict[int, tuple]]:
+        """
+        Returns, per compute, a map id(subtree) -> value key. Two subtrees with
+        equal keys compute the same value at their positions in the batch.
+        """
+        versions: Dict[str, int] = {}
+        keys = []
+        for entry, expr in zip(computes, parsed):
+            entry_keys: Dict[int, tuple] = {}
+            if expr is not None:
+                self._key(expr, versions, entry_keys)
+            keys.append(entry_keys)
+            target = entry.get("target")
+            if target:
+                versions[target.upper()] = versions.get(target.upper(), 0) + 1
+        return keys
+
+    def _key(self, expr: Expr, versions: Dict[str, int], keys: Dict[int, tuple]) -> Optional[tuple]:
+        if isinstance(expr, Variable):
+            name = expr.name.upper()
+            key = ("var", name, versions.get(name, 0))
+        elif isinstance(expr, UnaryOp):
+            key = ("unary", expr.op, self._key(expr.operand, versions, keys))
+        elif isinstance(expr, BinaryOp):
+            key = ("binary", expr.op, self._key(expr.left, versions, keys), self._key(expr.right, versions, keys))
+        elif isinstance(expr, Call):
+            args = tuple(self._key(arg, versions, keys) for arg in expr.args)
+            volatile = expr.name in self.VOLATILE_FUNCTIONS or expr.name.startswith("RV.")
+            key = None if volatile or None in args else ("call", expr.name, args)
+        else:
+            key = ("const", expr) # Literals are frozen dataclasses, hashable as-is
+
+        if key is not None and isinstance(expr, (UnaryOp, BinaryOp)) and None in key[2:]:
+            key = None # Anything built on a volatile value is volatile too
+        if key is not None:
+            keys[id(expr)] = key
+        return key
+
+
+class _Rewriter:
+    """Replaces repeated subtrees with column references, then inlines single-use temps."""
+
+    def __init__(self, owner: SubexpressionEliminator, keys: List[Dict[int, tuple]], outputs: List[str]):
+        self.owner = owner
+        self.keys = keys
+        self.outputs = set(outputs)
+        self.counts: Dict[tuple, int] = {}
+        for entry_keys in keys:
+            for key in entry_keys.values():
+                if _is_operation(key):
+                    self.counts[key] = self.counts.get(key, 0) + 1
+
+    def rewrite(self, computes: List[dict], parsed: List[Optional[Expr]]) -> List[Tuple[dict, Optional[Expr]]]:
+        taken = {entry["target"].upper() for entry in computes if entry.get("target")}
+        versions: Dict[str, int] = {}
+        available: Dict[tuple, Tuple[str, int, Optional[str]]] = {} # value key -> (column, version it holds, output tag)
+        temps: Dict[str, Expr] = {}
+        result: List[Tuple[dict, Optional[Expr]]] = []
+        next_temp = 0
+
+        for position, (entry, expr) in enumerate(zip(computes, parsed)):
+            entry_keys = self.keys[position]
+            target = entry.get("target")
+
+            if expr is not None:
+                hoisted: List[Tuple[str, Expr]] = []
+
+                def replace(node: Expr, top: bool, tag: Optional[str]) -> Expr:
+                    # tag: the output of the entry being rewritten (None inside a temp)
+                    nonlocal next_temp
+                    key = entry_keys.get(id(node))
+                    if key is not None and _is_operation(key) and self.counts.get(key, 0) > 1:
+                        if key in available and available[key][2] in (None, tag):
+                            column, version, _ = available[key]
+                            if versions.get(column.upper(), 0) == version:
+                                return Variable(column)
+                        elif not top:
+                            # First sighting inside a larger tree (or only another branch has it): give it a temp column
+                            inner = _map_children(node, lambda child: replace(child, False, None))
+                            while f"{self.owner.TEMP_PREFIX}{next_temp}".upper() in taken:
+                                next_temp += 1
+                            name = f"{self.owner.TEMP_PREFIX}{next_temp}"
+                            taken.add(name.upper())
+                            versions[name.upper()] = 1
+                            available[key] = (name, 1, None)
+                            hoisted.append((name, inner))
+                            return Variable(name)
+                    return _map_children(node, lambda child: replace(child, False, tag))
+
+                new_expr = replace(expr, True, self._tag(entry))
+                for name, definition in hoisted:
+                    temps[name] = definition
+                    result.append(({"target": name, "expression": "", "temporary": True}, definition))
+                result.append((entry, new_expr))
+
+                # The whole expression now lives in the target column
+                key = entry_keys.get(id(expr))
+                if target and key is not None and _is_operation(key) and key not in available:
+                    available[key] = (target, versions.get(target.upper(), 0) + 1, self._tag(entry))
+            else:
+                result.append((entry, expr))
+
+            if target:
+                versions[target.upper()] = versions.get(target.upper(), 0) + 1
+
+        result = self._inline_single_use(result, temps)
+        return self._renumber(result, temps, {entry["target"].upper() for entry in computes if entry.get("target")})
+
+    def _tag(self, entry: dict) -> Optional[str]:
+        """The output a fused entry is written to; None when it goes to every output."""
+        tag = entry.get("output")
+        return tag if tag in self.outputs else None
+
+    def _inline_single_use(self, result: List[Tuple[dict, Optional[Expr]]], temps: Dict[str, Expr]) -> List[Tuple[dict, Optional[Expr]]]:
+        # A temp whose repeats all sat inside another hoisted tree is used once:
+        # put it back. Walking backwards lets chains of such temps collapse.
+        uses: Dict[str, int] = {name.upper(): 0 for name in temps}
+        for _, expr in result:
+            if expr is not None:
+                for node in walk(expr):
+                    if isinstance(node, Variable) and node.name.upper() in uses:
+                        uses[node.name.upper()] += 1
+
+        inline = {name: temps[name] for name in temps if uses[name.upper()] == 1}
+        if not inline:
+            return result
+
+        def substitute(node: Expr) -> Expr:
+            if isinstance(node, Variable) and node.name in inline:
+                return substitute(inline[node.name])
+            return _map_children(node, substitute)
+
+        return [
+            (entry, substitute(expr) if expr is not None else None)
+            for entry, expr in result
+            if entry.get("target") not in inline
+        ]
+
+    def _renumber(self, result: List[Tuple[dict, Optional[Expr]]], temps: Dict[str, Expr], targets: set) -> List[Tuple[dict, Optional[Expr]]]:
+        """Names the surviving temps __cse_0, __cse_1, ... in definition order."""
+        renames: Dict[str, str] = {}
+        counter = 0
+        for entry, _ in result:
+            if entry.get("target") in temps:
+                while f"{self.owner.TEMP_PREFIX}{counter}".upper() in targets:
+                    counter += 1
+                renames[entry["target"]] = f"{self.owner.TEMP_PREFIX}{counter}"
+                counter += 1
+
+        def rename(node: Expr) -> Expr:
+            if isinstance(node, Variable) and node.name in renames:
+                return Variable(renames[node.name])
+            return _map_children(node, rename)
+
+        return [
+            ({**entry, "target": renames[entry["target"]]} if entry.get("target") in renames else entry,
+             rename(expr) if expr is not None else None)
+            for entry, expr in result
+        ]
+
+
+def _is_operation(key: tuple) -> bool:
+    return key[0] in ("unary", "binary", "call")
+
+def _map_children(node: Expr, fn) -> Expr:
+    if isinstance(node, UnaryOp):
+        return UnaryOp(node.op, fn(node.operand))
+    if isinstance(node, BinaryOp):
+        return BinaryOp(node.op, fn(node.left), fn(node.right))
+    if isinstance(node, Call):
+        return Call(node.name, tuple(fn(arg) for arg in node.args))
+    return node
+
+def _cost(exprs) -> int:
+    """Operator and function evaluations per row."""
+    return sum(
+        isinstance(node, (UnaryOp, BinaryOp, Call))
+        for expr in exprs if expr is not None
+        for node in walk(expr)
+    )
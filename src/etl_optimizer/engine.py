@@ -0,0 +1,539 @@
+import re
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import numpy as np
+from etl_ir.model import Pipeline, Operation
+from etl_ir.types import OpType
+from .expressions import (
+    Expr, Number, String, Variable, Sysmis, FormatSpec, UnaryOp, BinaryOp, Call,
+    RELATIONAL_OPS, parse_expression
+)
+from .ordering import OrderingOptimizer
+
+Table = Dict[str, np.ndarray]
+
+# SPSS stores dates as seconds since the start of the Gregorian calendar
+_SPSS_EPOCH_DAYS = int((np.datetime64("1582-10-14") - np.datetime64("1970-01-01")).astype(np.int64))
+_SECONDS_PER_DAY = 86400.0
+_FORMAT_SPEC = re.compile(r'^[A-Z]+(\d+)(?:\.(\d+))?$')
+
+
+class _Namespace:
+    """Case-insensitive column namespace (SPSS variable names ignore case)."""
+
+    def __init__(self, table: Table):
+        self.names: Dict[str, str] = {}
+        self.values: Dict[str, Any] = {}
+        self.rows = _row_count(table)
+        for name, values in table.items():
+            self.assign(name, values)
+
+    def get(self, name: str):
+        if name not in self.values:
+            raise ValueError(f"Unknown column '{name}' in expression")
+        return self.values[name]
+
+    def assign(self, name: str, values):
+        key = name.upper()
+        self.names.setdefault(key, name)
+        self.values[key] = values
+
+
+# --- Vectorized SPSS semantics (NaN == system-missing) ---
+
+def _is_string(value) -> bool:
+    if isinstance(value, str):
+        return True
+    return isinstance(value, np.ndarray) and value.dtype.kind in "USO"
+
+def _numeric(value) -> np.ndarray:
+    if _is_string(value):
+        raise ValueError("String value used where a number is expected")
+    return np.asarray(value, dtype=np.float64)
+
+def _truth(value) -> Tuple[np.ndarray, np.ndarray]:
+    values = _numeric(value)
+    missing = np.isnan(values)
+    return (values != 0) & ~missing, missing
+
+def _compare(op: str, left, right):
+    if _is_string(left) or _is_string(right):
+        # SPSS ignores trailing blanks in string comparisons
+        left = np.char.rstrip(np.asarray(left, dtype=str))
+        right = np.char.rstrip(np.asarray(right, dtype=str))
+        missing = np.zeros(np.broadcast(left, right).shape, dtype=bool)
+    else:
+        left, right = _numeric(left), _numeric(right)
+        missing = np.isnan(left) | np.isnan(right)
+
+    with np.errstate(invalid="ignore"):
+        result = {
+            "EQ": np.equal, "NE": np.not_equal, "LT": np.less,
+            "GT": np.greater, "LE": np.less_equal, "GE": np.greater_equal,
+        }[op](left, right)
+    return np.where(missing, np.nan, result.astype(np.float64))
+
+def _binary(op: str, left, right):
+    if op in ("AND", "OR"):
+        left_true, left_missing = _truth(left)
+        right_true, right_missing = _truth(right)
+        if op == "AND":
+            left_false = ~left_true & ~left_missing
+            right_false = ~right_true & ~right_missing
+            return np.where(left_false | right_false, 0.0, np.where(left_missing | right_missing, np.nan, 1.0))
+        return np.where(left_true | right_true, 1.0, np.where(left_missing | right_missing, np.nan, 0.0))
+    if op in RELATIONAL_OPS:
+        return _compare(op, left, right)
+
+    left, right = _numeric(left), _numeric(right)
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        if op == "+":
+            return left + right
+        if op == "-":
+            return left - right
+        if op == "*":
+            return left * right
+        if op == "/":
+            return np.where(right == 0, np.nan, left / np.where(right == 0, 1.0, right))
+        return np.power(left, right) # "**"
+
+def _number(values, spec: Optional[str] = None):
+    """NUMBER(string, Fw.d): vectorized string -> float, invalid -> SYSMIS."""
+    if not _is_string(values):
+        return _numeric(values)
+    text = np.char.strip(np.asarray(values, dtype=str))
+    result = _parse_digits(text)
+    if result is None:
+        blank = text == ""
+        try:
+            result = np.where(blank, "nan", text).astype(np.float64)
+        except ValueError:
+            # Dirty extract: fall back to element-wise conversion for this column only
+            result = np.array([_to_float(v) for v in np.atleast_1d(text)], dtype=np.float64).reshape(text.shape)
+
+    match = _FORMAT_SPEC.match(spec or "")
+    decimals = int(match.group(2) or 0) if match else 0
+    if decimals:
+        # Fw.d implies d decimals when the field has no explicit point
+        implied = np.char.find(text, ".") < 0
+        result = np.where(implied, result / 10 ** decimals, result)
+    return result
+
+def _parse_digits(text: np.ndarray) -> Optional[np.ndarray]:
+    """
+    Fast path for unsigned integer strings (YYYYMMDD dates, codes): reads the
+    UCS-4 code points directly, one vectorized step per character position.
+    Returns None when any value needs the general float parser.
+    """
+    if text.ndim != 1 or text.dtype.itemsize == 0:
+        return None
+    codes = np.ascontiguousarray(text).view(np.uint32).reshape(len(text), -1)
+    digit = (codes >= 48) & (codes <= 57)
+    if not (digit | (codes == 0)).all():
+        return None
+
+    result = np.zeros(len(text), dtype=np.float64)
+    for position in range(codes.shape[1]):
+        column = digit[:, position]
+        np.multiply(result, 10, out=result, where=column)
+        np.add(result, codes[:, position] - 48.0, out=result, where=column)
+    result[~digit[:, 0]] = np.nan # Blank -> SYSMIS
+    return result
+
+def _to_float(text: str) -> float:
+    try:
+        return float(text)
+    except ValueError:
+        return np.nan
+
+def _date(month, day, year):
+    """Builds SPSS date values (seconds since 1582-10-14). Month 13 = January next year."""
+    month, day, year = np.trunc(_numeric(month)), np.trunc(_numeric(day)), np.trunc(_numeric(year))
+    month, day, year = np.broadcast_arrays(month, day, year)
+    valid = np.isfinite(month) & np.isfinite(day) & np.isfinite(year)
+    valid &= (month >= 1) & (month <= 13) & (day >= 0) & (day <= 31)
+
+    year = np.where(valid, year + (month == 13), 1970)
+    month = np.where(valid, np.where(month == 13, 1, month), 1)
+    months = ((year - 1970) * 12 + (month - 1)).astype(np.int64)
+    days = months.astype("datetime64[M]").astype("datetime64[D]").astype(np.int64)
+    days = days + np.where(valid, day, 1).astype(np.int64) - 1
+    return np.where(valid, (days - _SPSS_EPOCH_DAYS) * _SECONDS_PER_DAY, np.nan)
+
+def _xdate(part: str, values):
+    seconds = _numeric(values)
+    valid = np.isfinite(seconds)
+    days = np.floor(np.where(valid, seconds, 0) / _SECONDS_PER_DAY).astype(np.int64) + _SPSS_EPOCH_DAYS
+    dates = days.astype("datetime64[D]")
+    if part == "YEAR":
+        result = dates.astype("datetime64[Y]").astype(np.int64) + 1970
+    elif part == "MONTH":
+        result = dates.astype("datetime64[M]").astype(np.int64) % 12 + 1
+    else: # MDAY
+        result = (dates - dates.astype("datetime64[M]").astype("datetime64[D]")).astype(np.int64) + 1
+    return np.where(valid, result.astype(np.float64), np.nan)
+
+def _row_stat(name: str, args, rows: int):
+    stacked = np.vstack([np.broadcast_to(_numeric(a), (rows,)) for a in args])
+    with np.errstate(invalid="ignore"):
+        if name == "MAX":
+            return np.fmax.reduce(stacked, axis=0)
+        if name == "MIN":
+            return np.fmin.reduce(stacked, axis=0)
+        valid = (~np.isnan(stacked)).sum(axis=0)
+        total = np.nansum(stacked, axis=0)
+        if name == "SUM":
+            return np.where(valid > 0, total, np.nan)
+        return np.where(valid > 0, total / np.maximum(valid, 1), np.nan) # MEAN
+
+def _missing(values):
+    if _is_string(values):
+        # Blank strings are the only "missing" strings without user-missing definitions
+        return (np.char.strip(np.asarray(values, dtype=str)) == "").astype(np.float64)
+    return np.isnan(_numeric(values)).astype(np.float64)
+
+def _guarded(fn, domain):
+    def apply(x):
+        x = _numeric(x)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(domain(x), fn(np.where(domain(x), x, 1.0)), np.nan)
+    return apply
+
+_UNARY_FUNCTIONS: Dict[str, Callable] = {
+    "TRUNC": lambda x: np.trunc(_numeric(x)),
+    "RND": lambda x: np.sign(_numeric(x)) * np.floor(np.abs(_numeric(x)) + 0.5),
+    "ABS": lambda x: np.abs(_numeric(x)),
+    "EXP": lambda x: np.exp(_numeric(x)),
+    "SQRT": _guarded(np.sqrt, lambda x: x >= 0),
+    "LN": _guarded(np.log, lambda x: x > 0),
+    "LG10": _guarded(np.log10, lambda x: x > 0),
+    "SYSMIS": lambda x: np.isnan(_numeric(x)).astype(np.float64),
+    "MISSING": _missing,
+    "VALUE": lambda x: x,
+    "XDATE.YEAR": lambda x: _xdate("YEAR", x),
+    "XDATE.MONTH": lambda x: _xdate("MONTH", x),
+    "XDATE.MDAY": lambda x: _xdate("MDAY", x),
+}
+
+
+def _compile(node: Expr) -> Callable[[_Namespace], Any]:
+    if isinstance(node, (Number, String)):
+        value = node.value
+        return lambda ns: value
+    if isinstance(node, Sysmis):
+        return lambda ns: np.nan
+    if isinstance(node, Variable):
+        name = node.name.upper()
+        return lambda ns: ns.get(name)
+    if isinstance(node, UnaryOp):
+        operand = _compile(node.operand)
+        if node.op == "-":
+            return lambda ns: -_numeric(operand(ns))
+        def negate(ns):
+            value, missing = _truth(operand(ns))
+            return np.where(missing, np.nan, (~value).astype(np.float64))
+        return negate
+    if isinstance(node, BinaryOp):
+        op, left, right = node.op, _compile(node.left), _compile(node.right)
+        return lambda ns: _binary(op, left(ns), right(ns))
+    if isinstance(node, Call):
+        return _compile_call(node.name, node.args)
+    raise ValueError(f"Format spec '{node.spec}' used outside of a conversion function")
+
+def _compile_call(name: str, arg_nodes: tuple) -> Callable[[_Namespace], Any]:
+    if name == "NUMBER":
+        if not 1 <= len(arg_nodes) <= 2:
+            raise ValueError(f"NUMBER expects 1 or 2 arguments, got {len(arg_nodes)}")
+        spec = arg_nodes[1].spec if len(arg_nodes) > 1 and isinstance(arg_nodes[1], FormatSpec) else None
+        value = _compile(arg_nodes[0])
+        return lambda ns: _number(value(ns), spec)
+
+    args = [_compile(a) for a in arg_nodes]
+    if name in _UNARY_FUNCTIONS:
+        if len(args) != 1:
+            raise ValueError(f"{name} expects 1 argument, got {len(args)}")
+        fn, arg = _UNARY_FUNCTIONS[name], args[0]
+        return lambda ns: fn(arg(ns))
+    if name == "MOD":
+        if len(args) != 2:
+            raise ValueError(f"MOD expects 2 arguments, got {len(args)}")
+        def mod(ns):
+            a, b = _numeric(args[0](ns)), _numeric(args[1](ns))
+            with np.errstate(invalid="ignore", divide="ignore"):
+                return np.fmod(a, b) # x MOD 0 is NaN, i.e. SYSMIS
+        return mod
+    if name in ("DATE.MDY", "DATE.DMY"):
+        if len(args) != 3:
+            raise ValueError(f"{name} expects 3 arguments, got {len(args)}")
+        if name == "DATE.MDY":
+            return lambda ns: _date(args[0](ns), args[1](ns), args[2](ns))
+        return lambda ns: _date(args[1](ns), args[0](ns), args[2](ns))
+    if name in ("SUM", "MEAN", "MAX", "MIN"):
+        if not args:
+            raise ValueError(f"{name} expects at least 1 argument")
+        return lambda ns: _row_stat(name, [a(ns) for a in args], ns.rows)
+    raise ValueError(f"Unsupported function '{name}' in expression")
+
+@lru_cache(maxsize=4096)
+def compile_expression(text: str) -> Callable[[_Namespace], Any]:
+    """Compiles SPSS expression text into a vectorized function (cached per text)."""
+    return _compile(parse_expression(str(text)))
+
+def _row_count(table: Table) -> int:
+    for values in table.values():
+        return len(values)
+    return 0
+
+def _broadcast(value, rows: int) -> np.ndarray:
+    if isinstance(value, np.ndarray) and value.shape == (rows,):
+        return value
+    if _is_string(value):
+        return np.full(rows, value, dtype=np.asarray(value).dtype)
+    return np.full(rows, value, dtype=np.float64)
+
+
+# --- Relational helpers (sort keys, join keys, break groups) ---
+
+_GROUP_FUNCTIONS = {"SUM", "MEAN", "MIN", "MAX", "N"}
+
+def _rank_codes(values: np.ndarray, descending: bool = False) -> np.ndarray:
+    """Dense integer ranks; system-missing ranks lowest, as in SPSS."""
+    if values.dtype.kind == "f":
+        missing = np.isnan(values)
+        _, codes = np.unique(np.where(missing, 0.0, values), return_inverse=True)
+        codes = np.where(missing, -1, codes.reshape(-1))
+    else:
+        _, codes = np.unique(np.char.rstrip(values.astype(str)), return_inverse=True) # SPSS ignores trailing blanks
+        codes = codes.reshape(-1)
+    return -codes if descending else codes
+
+def _key_codes(left: list, right: list) -> Tuple[np.ndarray, np.ndarray]:
+    """One int64 code per row for a (multi-column) key, comparable across both sides."""
+    n_left = len(left[0]) if left else 0
+    left_codes = np.zeros(n_left, dtype=np.int64)
+    right_codes = np.zeros(len(right[0]) if right else 0, dtype=np.int64)
+    for i, column in enumerate(left):
+        both = np.concatenate([column, right[i]]) if right else column
+        if both.dtype.kind in "USO":
+            both = np.char.rstrip(both.astype(str))
+        _, codes = np.unique(both, return_inverse=True)
+        codes = codes.reshape(-1).astype(np.int64)
+        width = int(codes.max()) + 1 if len(codes) else 1
+        left_codes = left_codes * width + codes[:n_left]
+        right_codes = right_codes * width + codes[n_left:]
+    return left_codes, right_codes
+
+def _fill_missing(values: np.ndarray, missing: np.ndarray) -> np.ndarray:
+    if not missing.any():
+        return values
+    if values.dtype.kind in "USO":
+        return np.where(missing, "", values)
+    return np.where(missing, np.nan, values.astype(np.float64))
+
+def _empty_like(values: np.ndarray, rows: int) -> np.ndarray:
+    if values.dtype.kind in "USO":
+        return np.full(rows, "", dtype=values.dtype)
+    return np.full(rows, np.nan)
+
+def _group_stat(fn: str, values: Optional[np.ndarray], group_of: np.ndarray, groups: int) -> np.ndarray:
+    if values is None:
+        return np.bincount(group_of, minlength=groups).astype(np.float64)
+    valid = ~np.isnan(values)
+    counts = np.bincount(group_of[valid], minlength=groups).astype(np.float64)
+    if fn == "N":
+        return counts
+    if fn in ("MIN", "MAX"):
+        result = np.full(groups, np.nan)
+        (np.fmin if fn == "MIN" else np.fmax).at(result, group_of[valid], values[valid])
+        return result
+    sums = np.bincount(group_of[valid], weights=values[valid], minlength=groups)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        result = sums if fn == "SUM" else sums / counts
+    return np.where(counts > 0, result, np.nan) # No valid case: system-missing
+
+
+class ExecutionEngine:
+    """
+    Execution Engine: Runs optimized pipelines on sample extracts (columnar NumPy tables).
+    1. Compiles each BATCH_COMPUTE 'computes' list into vectorized NumPy functions.
+    2. Evaluates a whole batch in one pass over the data (no per-row Python loop).
+    3. Honours horizontally fused batches ('output' tags and 'filters').
+    4. Sorts, hash-joins (MATCH FILES on 'by') and aggregates (SUM/MEAN/MIN/MAX/N
+       per break group) with NumPy, so whole optimized pipelines run.
+    """
+
+    ROW_LOCAL_TYPES = {OpType.COMPUTE_COLUMNS, OpType.BATCH_COMPUTE, OpType.FILTER_ROWS}
+    PASSTHROUGH_TYPES = {OpType.MATERIALIZE, OpType.SAVE_BINARY}
+
+    def run_batch(self, op: Operation, table: Table) -> Dict[str, Table]:
+        """Runs one compute/batch/filter op. Returns a table per output dataset."""
+        if op.type == OpType.FILTER_ROWS:
+            computes, filters = [], [{"condition": op.parameters.get("condition", "")}]
+        elif op.type == OpType.BATCH_COMPUTE:
+            computes, filters = op.parameters.get("computes", []), op.parameters.get("filters", [])
+        else:
+            computes, filters = [op.parameters], []
+
+        ns = _Namespace(table)
+        outputs = {out: dict(table) for out in op.outputs}
+
+        for entry in computes:
+            if not entry.get("target"):
+                continue
+            values = _broadcast(compile_expression(entry.get("expression", ""))(ns), ns.rows)
+            ns.assign(entry["target"], values)
+            if entry.get("temporary"):
+                continue # CSE temps live only inside the batch
+            for out in ([entry["output"]] if entry.get("output") else op.outputs):
+                self._assign(outputs[out], entry["target"], values)
+
+        for entry in filters:
+            condition = _numeric(_broadcast(compile_expression(entry["condition"])(ns), ns.rows))
+            keep = (condition != 0) & ~np.isnan(condition) # SELECT IF keeps only true rows
+            for out in ([entry["output"]] if entry.get("output") else op.outputs):
+                outputs[out] = {name: values[keep] for name, values in outputs[out].items()}
+
+        return outputs
+
+    def run_pipeline(self, pipeline: Pipeline, sources: Dict[str, Table]) -> Dict[str, Table]:
+        """
+        Executes a pipeline in list order. `sources` supplies the table for
+        each LOAD_CSV output (and any external input, e.g. a saved lookup
+        file). Returns every dataset that was produced.
+        """
+        data = dict(sources)
+        for op in pipeline.operations:
+            if op.type == OpType.LOAD_CSV or (op.type == OpType.GENERIC_TRANSFORM and not op.inputs):
+                missing = [out for out in op.outputs if out not in data]
+                if missing:
+                    raise ValueError(f"No sample data supplied for {missing} (operation '{op.id}')")
+            elif op.type in self.ROW_LOCAL_TYPES:
+                data.update(self.run_batch(op, self._single_input(op, data)))
+            elif op.type in self.PASSTHROUGH_TYPES:
+                table = self._single_input(op, data)
+                for out in op.outputs:
+                    data[out] = table
+            else:
+                result = self._run_relational(op, data)
+                for out in op.outputs:
+                    data[out] = result
+        return data
+
+    # --- Sort / Join / Aggregate ---
+
+    def _run_relational(self, op: Operation, data: Dict[str, Table]) -> Table:
+        if op.type == OpType.SORT_ROWS:
+            return self.run_sort(op, self._single_input(op, data))
+        if op.type == OpType.JOIN:
+            return self.run_join(op, [self._input(op, ds_id, data) for ds_id in op.inputs])
+        if op.type == OpType.AGGREGATE:
+            return self.run_aggregate(op, self._single_input(op, data))
+        # GENERIC_TRANSFORM left after promotion (FREQUENCIES, DISPLAY...): reports, rows unchanged
+        return self._single_input(op, data)
+
+    def run_sort(self, op: Operation, table: Table) -> Table:
+        """Stable sort on the 'keys' (SORT CASES BY a b (D)). System-missing sorts lowest."""
+        order = OrderingOptimizer.parse_keys(op.parameters.get("keys"))
+        if order is None:
+            raise ValueError(f"Sort keys of operation '{op.id}' are unknown: {op.parameters.get('keys')!r}")
+        # lexsort sorts by its last key first
+        ranks = [_rank_codes(self._column(table, name, op), descending=not ascending) for name, ascending in reversed(order)]
+        permutation = np.lexsort(ranks)
+        return {name: values[permutation] for name, values in table.items()}
+
+    def run_join(self, op: Operation, tables: List[Table]) -> Table:
+        """
+        MATCH FILES as a hash join on 'by': the first input drives, every other
+        one is a lookup table (first row per key). Unmatched rows get system-missing
+        (blank strings), or are dropped when parameters['how'] == 'inner'.
+        """
+        by = op.parameters.get("by") or []
+        keys = by.split() if isinstance(by, str) else list(by)
+        if not keys:
+            raise ValueError(f"Join '{op.id}' has no 'by' keys")
+        result = dict(tables[0])
+        inner = str(op.parameters.get("how", "")).lower() == "inner"
+        for lookup in tables[1:]:
+            left = [self._column(result, key, op) for key in keys]
+            right = [self._column(lookup, key, op) for key in keys]
+            left_codes, right_codes = _key_codes(left, right)
+
+            # Hash side: each distinct key -> its first row (stable sort + leftmost search)
+            rows = None
+            matched = np.zeros(len(left_codes), dtype=bool)
+            if len(right_codes):
+                by_key = np.argsort(right_codes, kind="stable")
+                sorted_codes = right_codes[by_key]
+                slot = np.minimum(np.searchsorted(sorted_codes, left_codes), len(sorted_codes) - 1)
+                matched = sorted_codes[slot] == left_codes
+                rows = by_key[slot]
+
+            present = {name.upper() for name in result}
+            for name, values in lookup.items():
+                if name.upper() not in present:
+                    values = np.asarray(values)
+                    column = values[rows] if rows is not None else _empty_like(values, len(left_codes))
+                    result[name] = _fill_missing(column, ~matched)
+            if inner:
+                result = {name: values[matched] for name, values in result.items()}
+        return result
+
+    def run_aggregate(self, op: Operation, table: Table) -> Table:
+        """
+        AGGREGATE /BREAK=... /target = FN(expression): one row per break group,
+        in break order. FN is SUM, MEAN, MIN, MAX or N; missing values are skipped.
+        """
+        rows = _row_count(table)
+        breaks = [self._column(table, name, op) for name in op.parameters.get("break") or []]
+        if breaks:
+            codes, _ = _key_codes(breaks, [])
+            groups, first_row, group_of = np.unique(codes, return_index=True, return_inverse=True)
+        else:
+            groups, first_row, group_of = np.arange(1 if rows else 0), np.zeros(1 if rows else 0, dtype=np.intp), np.zeros(rows, dtype=np.intp)
+
+        result: Table = {name: table[self._key(table, name, op)][first_row] for name in op.parameters.get("break") or []}
+        ns = _Namespace(table)
+        for spec in op.parameters.get("aggregations", []):
+            target, _, expression = str(spec).partition("=")
+            fn, values = self._aggregate_argument(expression, ns, op)
+            result[target.strip()] = _group_stat(fn, values, group_of.reshape(-1), len(groups))
+        return result
+
+    def _aggregate_argument(self, expression: str, ns: _Namespace, op: Operation):
+        node = parse_expression(expression.strip())
+        if isinstance(node, Variable) and node.name.upper() == "N":
+            return "N", None # Plain N: cases per group
+        if not isinstance(node, Call) or node.name not in _GROUP_FUNCTIONS or len(node.args) > 1:
+            raise ValueError(f"Unsupported aggregation '{expression.strip()}' in operation '{op.id}'")
+        if not node.args:
+            if node.name != "N":
+                raise ValueError(f"{node.name} expects 1 argument in operation '{op.id}'")
+            return "N", None
+        return node.name, _numeric(_broadcast(_compile(node.args[0])(ns), ns.rows))
+
+    def _input(self, op: Operation, ds_id: str, data: Dict[str, Table]) -> Table:
+        if ds_id not in data:
+            raise ValueError(f"Input dataset '{ds_id}' for operation '{op.id}' was never produced")
+        return data[ds_id]
+
+    def _key(self, table: Table, name: str, op: Operation) -> str:
+        for existing in table:
+            if existing.upper() == name.upper():
+                return existing
+        raise ValueError(f"Unknown column '{name}' in operation '{op.id}'")
+
+    def _column(self, table: Table, name: str, op: Operation) -> np.ndarray:
+        return np.asarray(table[self._key(table, name, op)])
+
+    def _single_input(self, op: Operation, data: Dict[str, Table]) -> Table:
+        if len(op.inputs) != 1:
+            raise ValueError(f"Operation '{op.id}' must have exactly one input, got {op.inputs}")
+        return self._input(op, op.inputs[0], data)
+
+    def _assign(self, table: Table, name: str, values: np.ndarray):
+        # Replace an existing column regardless of case, keeping its position
+        for existing in table:
+            if existing.upper() == name.upper():
+                table[existing] = values
+                return
+        table[name] = values
@@ -0,0 +1,291 @@
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Iterator, List, Optional, Tuple, Union
+
+# --- Typed AST (frozen, so parsed trees can be cached and shared freely) ---
+
+@dataclass(frozen=True)
+class Number:
+    value: float
+
+@dataclass(frozen=True)
+class String:
+    value: str
+
+@dataclass(frozen=True)
+class Variable:
+    name: str # As written in the trace; SPSS compares names case-insensitively
+
+@dataclass(frozen=True)
+class Sysmis:
+    pass
+
+@dataclass(frozen=True)
+class FormatSpec:
+    spec: str # e.g. F8.0 in NUMBER(dob, F8.0) - a format, never a column
+
+@dataclass(frozen=True)
+class UnaryOp:
+    op: str # "-" or "NOT"
+    operand: "Expr"
+
+@dataclass(frozen=True)
+class BinaryOp:
+    op: str # + - * / ** AND OR EQ NE LT GT LE GE
+    left: "Expr"
+    right: "Expr"
+
+@dataclass(frozen=True)
+class Call:
+    name: str # Upper-case, e.g. DATE.MDY
+    args: Tuple["Expr", ...]
+
+Expr = Union[Number, String, Variable, Sysmis, FormatSpec, UnaryOp, BinaryOp, Call]
+
+RELATIONAL_OPS = {"EQ", "NE", "LT", "GT", "LE", "GE"}
+
+# Functions whose second argument is a format spec
+FORMAT_FUNCTIONS = {"NUMBER", "STRING"}
+
+_FORMAT_SPEC = re.compile(r'^[A-Z]+\d+(?:\.\d+)?$', re.IGNORECASE)
+
+_TOKEN = re.compile(r"""
+    \s*(?:
+      (?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+    | (?P<string>'(?:[^']|'')*'|"(?:[^"]|"")*")
+    | (?P<name>[A-Za-z_$#@][A-Za-z0-9_.$#@]*)
+    | (?P<op>\*\*|<=|>=|<>|~=|[-+*/=<>(),&|~])
+    )""", re.VERBOSE)
+
+_RELATIONAL = {"=": "EQ", "<>": "NE", "~=": "NE", "<": "LT", ">": "GT", "<=": "LE", ">=": "GE",
+               "EQ": "EQ", "NE": "NE", "LT": "LT", "GT": "GT", "LE": "LE", "GE": "GE"}
+
+
+class _Parser:
+    """
+    Recursive-descent parser for SPSS COMPUTE/SELECT IF expressions.
+    Precedence (loosest first): OR, AND, NOT, relational, + -, * /, unary -, **.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self.tokens = self._tokenize(text)
+        self.pos = 0
+
+    def _tokenize(self, text: str) -> List[Tuple[str, str]]:
+        tokens = []
+        pos = 0
+        text = text.rstrip()
+        while pos < len(text):
+            match = _TOKEN.match(text, pos)
+            if not match or match.end() == pos:
+                raise ValueError(f"Cannot parse expression '{text}': unexpected character at {pos}")
+            kind = match.lastgroup
+            tokens.append((kind, match.group(kind)))
+            pos = match.end()
+        return tokens
+
+    def parse(self) -> Expr:
+        if not self.tokens:
+            raise ValueError("Cannot parse expression '': empty expression")
+        node = self._or()
+        if self.pos != len(self.tokens):
+            raise ValueError(f"Cannot parse expression '{self.text}': unexpected '{self.tokens[self.pos][1]}'")
+        return node
+
+    def _peek(self) -> Optional[str]:
+        if self.pos >= len(self.tokens):
+            return None
+        kind, value = self.tokens[self.pos]
+        return value.upper() if kind in ("name", "op") else None
+
+    def _take(self) -> Tuple[str, str]:
+        if self.pos >= len(self.tokens):
+            raise ValueError(f"Cannot parse expression '{self.text}': unexpected end")
+        token = self.tokens[self.pos]
+        self.pos += 1
+        return token
+
+    def _expect(self, value: str):
+        if self._peek() != value:
+            raise ValueError(f"Cannot parse expression '{self.text}': expected '{value}'")
+        self.pos += 1
+
+    def _or(self) -> Expr:
+        node = self._and()
+        while self._peek() in ("OR", "|"):
+            self.pos += 1
+            node = BinaryOp("OR", node, self._and())
+        return node
+
+    def _and(self) -> Expr:
+        node = self._not()
+        while self._peek() in ("AND", "&"):
+            self.pos += 1
+            node = BinaryOp("AND", node, self._not())
+        return node
+
+    def _not(self) -> Expr:
+        if self._peek() in ("NOT", "~"):
+            self.pos += 1
+            return UnaryOp("NOT", self._not())
+        return self._relational()
+
+    def _relational(self) -> Expr:
+        node = self._additive()
+        if self._peek() in _RELATIONAL:
+            op = _RELATIONAL[self._take()[1].upper()]
+            node = BinaryOp(op, node, self._additive())
+        return node
+
+    def _additive(self) -> Expr:
+        node = self._multiplicative()
+        while self._peek() in ("+", "-"):
+            op = self._take()[1]
+            node = BinaryOp(op, node, self._multiplicative())
+        return node
+
+    def _multiplicative(self) -> Expr:
+        node = self._unary()
+        while self._peek() in ("*", "/"):
+            op = self._take()[1]
+            node = BinaryOp(op, node, self._unary())
+        return node
+
+    def _unary(self) -> Expr:
+        if self._peek() in ("-", "+"):
+            op = self._take()[1]
+            operand = self._unary()
+            return operand if op == "+" else UnaryOp("-", operand)
+        return self._power()
+
+    def _power(self) -> Expr:
+        node = self._primary()
+        if self._peek() == "**":
+            self.pos += 1
+            node = BinaryOp("**", node, self._unary())
+        return node
+
+    def _primary(self) -> Expr:
+        kind, value = self._take()
+        if kind == "number":
+            return Number(float(value))
+        if kind == "string":
+            quote = value[0]
+            return String(value[1:-1].replace(quote * 2, quote))
+        if kind == "op" and value == "(":
+            node = self._or()
+            self._expect(")")
+            return node
+        if kind == "name":
+            name = value.upper()
+            if name == "$SYSMIS":
+                return Sysmis()
+            if self._peek() == "(":
+                self.pos += 1
+                return Call(name, self._arguments(name))
+            return Variable(value)
+        raise ValueError(f"Cannot parse expression '{self.text}': unexpected '{value}'")
+
+    def _arguments(self, name: str) -> Tuple[Expr, ...]:
+        args = []
+        while self._peek() != ")":
+            if args:
+                self._expect(",")
+            args.append(self._argument(name, len(args)))
+        self._expect(")")
+        return tuple(args)
+
+    def _argument(self, name: str, position: int) -> Expr:
+        if name in FORMAT_FUNCTIONS and position == 1 and self.pos < len(self.tokens):
+            kind, value = self.tokens[self.pos]
+            if kind == "name" and _FORMAT_SPEC.match(value):
+                self.pos += 1
+                return FormatSpec(value.upper())
+        return self._or()
+
+
+@lru_cache(maxsize=8192)
+def parse_expression(text: str) -> Expr:
+    """
+    Parses SPSS expression text into a typed AST. Cached per text, so the
+    thousands of repeated expressions in a trace are parsed once per process.
+    Raises ValueError on malformed input.
+    """
+    return _Parser(str(text)).parse()
+
+def walk(expr: Expr) -> Iterator[Expr]:
+    """Yields every node of the tree, parents before children (iterative)."""
+    stack = [expr]
+    while stack:
+        node = stack.pop()
+        yield node
+        if isinstance(node, UnaryOp):
+            stack.append(node.operand)
+        elif isinstance(node, BinaryOp):
+            stack.extend((node.right, node.left))
+        elif isinstance(node, Call):
+            stack.extend(reversed(node.args))
+
+def referenced_columns(expr: Expr) -> List[str]:
+    """
+    Column names read by the expression, in order of first appearance
+    (deduplicated case-insensitively). Function names, string literals and
+    format specs are never columns.
+    """
+    seen = set()
+    columns = []
+    for node in walk(expr):
+        if isinstance(node, Variable) and node.name.upper() not in seen:
+            seen.add(node.name.upper())
+            columns.append(node.name)
+    return columns
+
+# --- Unparsing (rewritten trees go back into the IR as text) ---
+
+_PRECEDENCE = {"OR": 1, "AND": 2, "NOT": 3, "+": 5, "-": 5, "*": 6, "/": 6, "**": 8}
+_RELATIONAL_SYMBOLS = {"EQ": "=", "NE": "<>", "LT": "<", "GT": ">", "LE": "<=", "GE": ">="}
+_ATOM = 9
+
+def _precedence(expr: Expr) -> int:
+    if isinstance(expr, BinaryOp):
+        return 4 if expr.op in RELATIONAL_OPS else _PRECEDENCE[expr.op]
+    if isinstance(expr, UnaryOp):
+        return 7 if expr.op == "-" else _PRECEDENCE["NOT"]
+    return _ATOM
+
+def to_source(expr: Expr) -> str:
+    """Renders an AST as SPSS text, with only the parentheses it needs."""
+    if isinstance(expr, Number):
+        value = expr.value
+        return str(int(value)) if value.is_integer() and abs(value) < 1e15 else repr(value)
+    if isinstance(expr, String):
+        return "'" + expr.value.replace("'", "''") + "'"
+    if isinstance(expr, Variable):
+        return expr.name
+    if isinstance(expr, Sysmis):
+        return "$SYSMIS"
+    if isinstance(expr, FormatSpec):
+        return expr.spec
+    if isinstance(expr, Call):
+        return f"{expr.name}({', '.join(to_source(a) for a in expr.args)})"
+    if isinstance(expr, UnaryOp):
+        operand = _wrap(expr.operand, _precedence(expr.operand) < _precedence(expr))
+        return f"-{operand}" if expr.op == "-" else f"NOT {operand}"
+
+    level = _precedence(expr)
+    if expr.op == "**":
+        # The base of ** is a primary: -a ** 2 means -(a ** 2)
+        left = _wrap(expr.left, _precedence(expr.left) < _ATOM)
+        right = _wrap(expr.right, _precedence(expr.right) < 7)
+    else:
+        # Left-associative, and relational operators do not chain
+        left = _wrap(expr.left, _precedence(expr.left) < level or (level == 4 and _precedence(expr.left) == 4))
+        right = _wrap(expr.right, _precedence(expr.right) <= level)
+    symbol = _RELATIONAL_SYMBOLS.get(expr.op, expr.op)
+    return f"{left} {symbol} {right}"
+
+def _wrap(expr: Expr, parenthesize: bool) -> str:
+    text = to_source(expr)
+    return f"({text})" if parenthesize else text
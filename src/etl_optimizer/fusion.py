@@ -0,0 +1,131 @@
+import re
+from typing import Dict, List, Optional, Set
+from etl_ir.model import Pipeline, Operation
+from etl_ir.types import OpType
+from .construct import make_op, make_pipeline
+from .expressions import parse_expression, referenced_columns
+from .index import PipelineIndex
+
+class HorizontalFuser:
+    """
+    Optimization Pass (runs after VerticalCollapser):
+    1. Finds sibling COMPUTE/FILTER/BATCH ops that all read the same dataset.
+    2. Fuses independent siblings into ONE multi-output BATCH_COMPUTE (a single scan).
+    3. Tags every expression with the output dataset it belongs to.
+
+    Siblings are only fused when no sibling assigns a column another sibling
+    assigns or reads, so the branches can share one evaluation namespace.
+    """
+
+    FUSIBLE_TYPES = {OpType.COMPUTE_COLUMNS, OpType.FILTER_ROWS, OpType.BATCH_COMPUTE}
+
+    def __init__(self, pipeline: Pipeline, index: Optional[PipelineIndex] = None):
+        self.pipeline = pipeline
+        self.index = index # Kept in sync when shared by the coordinator
+        self.new_ops: List[Operation] = []
+
+    def run(self) -> Pipeline:
+        # 1. Group fusible siblings per input dataset, in list order
+        groups_by_ds: Dict[str, List[List[Operation]]] = {}
+        for op in self.pipeline.operations:
+            if not self._is_fusible(op):
+                continue
+            groups = groups_by_ds.setdefault(op.inputs[0], [])
+            for group in groups:
+                if self._is_independent(op, group):
+                    group.append(op)
+                    break
+            else:
+                groups.append([op])
+
+        # 2. Build one fused op per group of 2+, placed in its first member's slot
+        fused_at: Dict[str, Operation] = {}
+        fused: Set[str] = set()
+        for groups in groups_by_ds.values():
+            for group in groups:
+                if len(group) < 2:
+                    continue
+                fused_op = self._create_fused_op(group)
+                if self.index:
+                    for member in group:
+                        self.index.remove_op(member.id)
+                    self.index.add_op(fused_op)
+                fused_at[group[0].id] = fused_op
+                fused.update(member.id for member in group)
+
+        self.new_ops = []
+        for op in self.pipeline.operations:
+            if op.id in fused_at:
+                self.new_ops.append(fused_at[op.id])
+            elif op.id not in fused:
+                self.new_ops.append(op)
+
+        return make_pipeline(
+            metadata=self.pipeline.metadata,
+            datasets=self.pipeline.datasets,
+            operations=self.new_ops
+        )
+
+    def _is_fusible(self, op: Operation) -> bool:
+        if op.type not in self.FUSIBLE_TYPES:
+            return False
+        # Multi-output batches are fusion results, not siblings
+        return len(op.inputs) == 1 and len(op.outputs) == 1
+
+    def _is_independent(self, op: Operation, group: List[Operation]) -> bool:
+        targets = self._targets(op)
+        reads = self._reads(op)
+        for member in group:
+            member_targets = self._targets(member)
+            if targets & member_targets:
+                return False
+            if reads & member_targets or self._reads(member) & targets:
+                return False
+        return True
+
+    def _entries(self, op: Operation) -> List[dict]:
+        if op.type == OpType.BATCH_COMPUTE:
+            return op.parameters.get("computes", [])
+        return [op.parameters]
+
+    def _targets(self, op: Operation) -> Set[str]:
+        if op.type == OpType.FILTER_ROWS:
+            return set()
+        return {e["target"].upper() for e in self._entries(op) if e.get("target")}
+
+    def _reads(self, op: Operation) -> Set[str]:
+        if op.type == OpType.FILTER_ROWS:
+            texts = [op.parameters.get("condition", "")]
+        else:
+            texts = [e.get("expression", "") for e in self._entries(op)]
+        reads = set()
+        for text in texts:
+            try:
+                reads.update(c.upper() for c in referenced_columns(parse_expression(str(text))))
+            except ValueError:
+                # Unparseable: every identifier-like token counts as a read
+                reads.update(t.upper() for t in re.findall(r'[a-zA-Z_][a-zA-Z0-9_]*', str(text)))
+        return reads
+
+    def _create_fused_op(self, group: List[Operation]) -> Operation:
+        computes = []
+        filters = []
+        for member in group:
+            output = member.outputs[0]
+            if member.type == OpType.FILTER_ROWS:
+                filters.append({"condition": member.parameters.get("condition", ""), "output": output})
+            else:
+                computes.extend({**entry, "output": output} for entry in self._entries(member))
+
+        parameters = {"computes": computes}
+        if filters:
+            parameters["filters"] = filters
+        parameters["fused_ops"] = [member.id for member in group]
+
+        return make_op(
+            id=f"hfuse_{group[0].id}",
+            type=OpType.BATCH_COMPUTE,
+            inputs=list(group[0].inputs),
+            outputs=[member.outputs[0] for member in group],
+            parameters=parameters
+        )
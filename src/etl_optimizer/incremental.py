@@ -0,0 +1,230 @@
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple, Union
+import pydantic
+from etl_ir.model import Pipeline, Operation, Dataset
+from .cache import _model_fingerprint
+from .collapser import VerticalCollapser
+from .construct import make_pipeline
+from .index import PipelineIndex
+from .promoter import SemanticPromoter
+from .rules import PromotionRules
+from .validator import SecurityValidator
+
+@dataclass
+class IncrementalState:
+    """What a run leaves behind for the next one (pickled next to the trace)."""
+    salt: str = ""
+    op_hashes: Dict[str, str] = field(default_factory=dict)       # raw op_id -> content hash
+    op_io: Dict[str, Tuple[List[str], List[str]]] = field(default_factory=dict) # raw op_id -> (inputs, outputs)
+    dataset_hashes: Dict[str, str] = field(default_factory=dict)  # ds_id -> content hash
+    pipeline: Optional[Pipeline] = None                           # optimized IR
+    provenance: Dict[str, List[str]] = field(default_factory=dict) # optimized op_id -> raw op_ids
+    dropped: Dict[str, Optional[Tuple[str, str]]] = field(default_factory=dict) # dropped raw op_id -> healed (target, source)
+    errors: Dict[str, List[str]] = field(default_factory=dict)    # optimized op_id -> logic errors
+
+
+class IncrementalOptimizer:
+    """
+    Incremental Re-optimization: Promote + Collapse (dag) + Validate, reusing the last run.
+    1. Diffs the raw pipeline against the stored run by op id and content hash.
+    2. Re-runs SemanticPromoter, VerticalCollapser and the validator's logic checks
+       only on the affected ops: changed/new ops, their downstream cone, the
+       producers a change can re-fuse with, and any batch one of them belonged to.
+       The promoter heals over the graph (as run() does), with the noise ops
+       the last run dropped put back, so order in the trace does not matter.
+    3. Splices the new ops into the stored optimized IR (raw order is kept) and
+       stores the new state. The result equals a full promote + dag collapse
+       + validate run on the same trace.
+
+    A fast path for edit-rerun loops (cli.py --incremental), not a substitute for
+    OptimizationCoordinator: pushdown, ordering, horizontal fusion, CSE and DCE
+    move ops across or reason over the whole graph, so they are not run here.
+    Falls back to a full run without usable state, or when most of the trace is affected.
+    Topology checks stay global (cycles and islands are whole-graph properties).
+    """
+
+    FORMAT_VERSION = 1
+    # Above this share of affected ops, a full run is cheaper than the bookkeeping
+    FULL_RUN_RATIO = 0.5
+
+    def __init__(self, state_path: Union[str, Path], rules: Optional[PromotionRules] = None):
+        self.state_path = Path(state_path)
+        self.rules = rules or PromotionRules.default()
+        self.mode: Optional[str] = None # "full" | "incremental"
+        self.last_affected: Set[str] = set()
+
+    def optimize(self, pipeline: Pipeline) -> Pipeline:
+        previous = self._read()
+        op_hashes = {op.id: _hash_op(op) for op in pipeline.operations}
+        dataset_hashes = {ds.id: _hash_dataset(ds) for ds in pipeline.datasets}
+
+        affected = None
+        if previous is not None:
+            affected = self._affected(pipeline, previous, op_hashes, dataset_hashes)
+            if len(affected) > self.FULL_RUN_RATIO * len(pipeline.operations):
+                affected = None
+        if affected is None:
+            previous = IncrementalState()
+            affected = set(op_hashes)
+        self.mode = "incremental" if previous.pipeline is not None else "full"
+        self.last_affected = affected
+
+        state = self._reoptimize(pipeline, previous, affected)
+        state.op_hashes = op_hashes
+        state.op_io = {op.id: (list(op.inputs), list(op.outputs)) for op in pipeline.operations}
+        state.dataset_hashes = dataset_hashes
+        self._write(state)
+
+        topo_errors = SecurityValidator(state.pipeline).validate_topology()
+        if topo_errors:
+            raise ValueError(f"CRITICAL: Topology Violation: {topo_errors}")
+        logic_errors = [e for op in state.pipeline.operations for e in state.errors.get(op.id, [])]
+        if logic_errors:
+            raise ValueError(f"CRITICAL: Validation Failed: {logic_errors}")
+        return state.pipeline
+
+    # --- 1. Diff ---
+
+    def _affected(self, pipeline: Pipeline, previous: IncrementalState,
+                  op_hashes: Dict[str, str], dataset_hashes: Dict[str, str]) -> Set[str]:
+        index = PipelineIndex(pipeline)
+        changed = {op_id for op_id, h in op_hashes.items() if previous.op_hashes.get(op_id) != h}
+        removed = set(previous.op_hashes) - set(op_hashes)
+
+        # Datasets whose schema changed, or whose writers/readers came or went
+        touched = {ds_id for ds_id in set(dataset_hashes) | set(previous.dataset_hashes)
+                   if dataset_hashes.get(ds_id) != previous.dataset_hashes.get(ds_id)}
+        for op_id in changed | removed:
+            old_inputs, old_outputs = previous.op_io.get(op_id, ([], []))
+            touched.update(old_inputs, old_outputs)
+            if op_id in index.ops:
+                touched.update(index.ops[op_id].inputs, index.ops[op_id].outputs)
+
+        seeds = changed | {c for ds_id in touched for c in index.consumers_of(ds_id)}
+        # A producer may now fuse with (or lose) a neighbour: re-collapse the ops one
+        # hop upstream (through ops the promoter dropped). Their outputs keep their
+        # ids and schemas, so their own cone is not affected.
+        upstream: Set[str] = set()
+        queue = deque(touched)
+        seen_ds: Set[str] = set(touched)
+        while queue:
+            for producer in index.producers_of(queue.popleft()):
+                upstream.add(producer)
+                if producer in previous.dropped:
+                    for inp in index.ops[producer].inputs:
+                        if inp not in seen_ds:
+                            seen_ds.add(inp)
+                            queue.append(inp)
+
+        group_of = {raw_id: opt_id for opt_id, members in previous.provenance.items() for raw_id in members}
+        def group(op_id: str) -> List[str]:
+            return previous.provenance[group_of[op_id]] if op_id in group_of else [op_id]
+
+        affected: Set[str] = set()
+        pending = list(seeds) + [m for op_id in removed for m in group(op_id) if m != op_id]
+        while pending:
+            op_id = pending.pop()
+            if op_id in affected or op_id not in index.ops:
+                continue
+            affected.add(op_id)
+            pending.extend(index.successors(op_id)) # Downstream cone
+            pending.extend(group(op_id))            # Its whole batch
+        for op_id in upstream - affected:
+            affected.update(m for m in group(op_id) if m in index.ops)
+        return affected
+
+    # --- 2./3. Re-optimize & splice ---
+
+    def _reoptimize(self, pipeline: Pipeline, previous: IncrementalState, affected: Set[str]) -> IncrementalState:
+        stale = affected | (set(previous.op_hashes) - {op.id for op in pipeline.operations})
+        kept = [op for op in (previous.pipeline.operations if previous.pipeline else [])
+                if stale.isdisjoint(previous.provenance[op.id])]
+
+        # Promote over the graph: the affected ops plus the noise the last run dropped
+        # (dropped again, so its links heal exactly as in a full run)
+        sub_ops = [op for op in pipeline.operations if op.id in affected or (op.id in previous.dropped and op.id not in stale)]
+        promoter = SemanticPromoter(make_pipeline(metadata=pipeline.metadata, datasets=[], operations=sub_ops), rules=self.rules)
+        promoted = promoter.run().operations
+
+        dropped = {}
+        promoted_ids = {op.id for op in promoted}
+        for op in sub_ops:
+            if op.id not in promoted_ids:
+                target = op.outputs[0] if op.inputs and op.outputs else None
+                dropped[op.id] = (target, promoter.alias_map[target]) if target in promoter.alias_map else None
+
+        # Collapse against the spliced graph, so fusion sees every consumer
+        context = PipelineIndex(make_pipeline(metadata=pipeline.metadata, datasets=pipeline.datasets, operations=kept + promoted))
+        collapser = VerticalCollapser(make_pipeline(metadata=pipeline.metadata, datasets=[], operations=promoted), context, mode="dag")
+        collapsed = collapser.run().operations
+
+        provenance = {op.id: previous.provenance[op.id] for op in kept}
+        for op in collapsed:
+            provenance[op.id] = collapser.provenance.get(op.id, [op.id])
+
+        # Splice: every op (or batch) sits at the raw position of its last member
+        position = {op.id: i for i, op in enumerate(pipeline.operations)}
+        operations = sorted(kept + collapsed, key=lambda op: max(position[m] for m in provenance[op.id]))
+        active: Set[str] = set()
+        for op in operations:
+            active.update(op.inputs)
+            active.update(op.outputs)
+        optimized = make_pipeline(
+            metadata=pipeline.metadata,
+            datasets=[ds for ds in pipeline.datasets if ds.id in active],
+            operations=operations
+        )
+
+        errors = {op.id: previous.errors[op.id] for op in kept if op.id in previous.errors}
+        errors.update(SecurityValidator(optimized).run_by_op({op.id for op in collapsed}))
+        return IncrementalState(
+            salt=self._salt(), pipeline=optimized, provenance=provenance, dropped=dropped, errors=errors
+        )
+
+    # --- State I/O ---
+
+    def _salt(self) -> str:
+        # Same model fingerprint as IRCache; other promotion rules promote differently
+        rules = hashlib.sha256(repr((self.rules.noise, self.rules.rules)).encode()).hexdigest()[:16]
+        return f"v{self.FORMAT_VERSION}|pydantic={pydantic.VERSION}|{_model_fingerprint()}|rules={rules}"
+
+    def _read(self) -> Optional[IncrementalState]:
+        try:
+            with open(self.state_path, "rb") as f:
+                state = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            return None # Corrupt or incompatible: a full run overwrites it
+        if not isinstance(state, IncrementalState) or state.salt != self._salt() or state.pipeline is None:
+            return None
+        return state
+
+    def _write(self, state: IncrementalState):
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Write-then-rename, as in IRCache
+        fd, tmp_name = tempfile.mkstemp(dir=self.state_path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(state, f, protocol=5)
+            os.replace(tmp_name, self.state_path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+
+
+def _hash_op(op: Operation) -> str:
+    content = [str(op.type), op.inputs, op.outputs, op.parameters]
+    return hashlib.sha256(json.dumps(content, sort_keys=True, default=str).encode()).hexdigest()
+
+def _hash_dataset(ds: Dataset) -> str:
+    content = [ds.source, [(col.name, col.type) for col in ds.columns]]
+    return hashlib.sha256(json.dumps(content, sort_keys=True, default=str).encode()).hexdigest()
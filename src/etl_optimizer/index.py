@@ -0,0 +1,98 @@
+from collections import defaultdict
+from typing import Dict, List, Optional
+from etl_ir.model import Pipeline, Operation, Dataset
+
+class PipelineIndex:
+    """
+    Shared Graph Index: Built once per optimization, then handed from pass to pass.
+    1. id -> Operation and id -> Dataset lookups (no linear scans).
+    2. Producer/Consumer adjacency lists per dataset.
+    3. Incremental updates, so no pass has to rescan the whole pipeline.
+    """
+
+    def __init__(self, pipeline: Pipeline):
+        self.ops: Dict[str, Operation] = {}
+        self.datasets: Dict[str, Dataset] = {ds.id: ds for ds in pipeline.datasets}
+        self.producers: Dict[str, List[str]] = defaultdict(list) # ds_id -> [op_id]
+        self.consumers: Dict[str, List[str]] = defaultdict(list) # ds_id -> [op_id]
+
+        for op in pipeline.operations:
+            self.add_op(op)
+
+    # --- Queries ---
+
+    def op(self, op_id: str) -> Optional[Operation]:
+        return self.ops.get(op_id)
+
+    def dataset(self, ds_id: str) -> Optional[Dataset]:
+        return self.datasets.get(ds_id)
+
+    def producers_of(self, ds_id: str) -> List[str]:
+        return self.producers.get(ds_id, [])
+
+    def consumers_of(self, ds_id: str) -> List[str]:
+        return self.consumers.get(ds_id, [])
+
+    def successors(self, op_id: str) -> List[str]:
+        """Operations that read any output of op_id."""
+        return [c for out in self.ops[op_id].outputs for c in self.consumers_of(out)]
+
+    def predecessors(self, op_id: str) -> List[str]:
+        """Operations that write any input of op_id."""
+        return [p for inp in self.ops[op_id].inputs for p in self.producers_of(inp)]
+
+    def is_active(self, ds_id: str) -> bool:
+        """A dataset is active while any operation reads or writes it."""
+        return bool(self.producers.get(ds_id) or self.consumers.get(ds_id))
+
+    # --- Incremental Updates ---
+
+    def add_op(self, op: Operation):
+        self.ops[op.id] = op
+        for inp in op.inputs:
+            self.consumers[inp].append(op.id)
+        for out in op.outputs:
+            self.producers[out].append(op.id)
+
+    def remove_op(self, op_id: str) -> Optional[Operation]:
+        op = self.ops.pop(op_id, None)
+        if op is None:
+            return None
+        for inp in op.inputs:
+            self._unlink(self.consumers, inp, op_id)
+        for out in op.outputs:
+            self._unlink(self.producers, out, op_id)
+        return op
+
+    def replace_op(self, op: Operation, old_id: Optional[str] = None):
+        """
+        Swaps in a rewritten operation. Edges are only touched when the
+        wiring actually changed.
+        """
+        old = self.ops.get(old_id or op.id)
+        if old is not None and old.id == op.id and old.inputs == op.inputs and old.outputs == op.outputs:
+            self.ops[op.id] = op
+            return
+        if old is not None:
+            self.remove_op(old.id)
+        self.add_op(op)
+
+    def add_input(self, op_id: str, ds_id: str):
+        """Appends an input to an operation in place (e.g. island patching)."""
+        op = self.ops[op_id]
+        if ds_id not in op.inputs:
+            op.inputs.append(ds_id)
+            self.consumers[ds_id].append(op_id)
+
+    def put_dataset(self, ds: Dataset):
+        self.datasets[ds.id] = ds
+
+    def drop_dataset(self, ds_id: str):
+        self.datasets.pop(ds_id, None)
+
+    def _unlink(self, edges: Dict[str, List[str]], ds_id: str, op_id: str):
+        linked = edges.get(ds_id)
+        if linked and op_id in linked:
+            linked.remove(op_id)
+            if not linked:
+                del edges[ds_id]
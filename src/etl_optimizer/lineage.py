@@ -0,0 +1,225 @@
+from typing import Dict, Iterable, List, Tuple
+from etl_ir.model import Pipeline, Operation
+from etl_ir.types import OpType
+from .expressions import parse_expression, referenced_columns
+
+# (dataset id, COLUMN NAME) - names are stored upper-case
+ColumnRef = Tuple[str, str]
+
+class LineageIndex:
+    """
+    Column Lineage: Built once per pipeline, then answers queries without re-walking ops.
+    1. Every column definition gets a compact integer id; one forward sweep (op
+       order is assumed topological) links it to the columns it is derived from:
+       compute/batch expressions, join keys merged across inputs and aggregate
+       sources. A column carried through unchanged keeps its id, so long
+       chains of filters, sorts and computes add no ids.
+    2. Transitive ancestors and descendants are kept as int bitsets, so origin
+       and impact queries are one lookup (plus decoding the answer), and
+       "does X derive from Y" is a single bit test.
+
+    Source columns are those nothing feeds: LOAD_CSV and external inputs, and
+    columns computed from literals. A column we cannot explain (opaque op,
+    unparseable expression) depends on every input column.
+    """
+
+    PASS_THROUGH_TYPES = {OpType.FILTER_ROWS, OpType.SORT_ROWS, OpType.MATERIALIZE, OpType.SAVE_BINARY, OpType.JOIN}
+
+    def __init__(self, pipeline: Pipeline):
+        self.pipeline = pipeline
+        self.refs: List[ColumnRef] = []             # column id -> where it is defined
+        self.columns: Dict[str, Dict[str, int]] = {} # ds_id -> {COLUMN: column id}, copies included
+        self.parents: List[List[int]] = []          # column id -> direct source column ids
+        self.ancestors: List[int] = []              # column id -> bitset of every upstream column
+        self.descendants: List[int] = []            # column id -> bitset of every downstream column
+        self.source_mask = 0
+        self._schemas = {ds.id: [col.name.upper() for col in ds.columns] for ds in pipeline.datasets}
+        self._pending_merges: Dict[str, List[int]] = {}
+
+        for op in pipeline.operations:
+            self._visit(op)
+        self._propagate_descendants()
+
+    # --- Queries ---
+
+    def column_id(self, ds_id: str, column: str) -> int:
+        cid = self.columns.get(ds_id, {}).get(column.upper())
+        if cid is None:
+            raise ValueError(f"Unknown column '{column}' in dataset '{ds_id}'")
+        return cid
+
+    def origins(self, ds_id: str, column: str) -> List[ColumnRef]:
+        """Source columns the value is computed from (itself, if it is a source)."""
+        cid = self.column_id(ds_id, column)
+        bits = self.ancestors[cid] & self.source_mask
+        return self.decode(bits or (1 << cid))
+
+    def upstream(self, ds_id: str, column: str) -> List[ColumnRef]:
+        return self.decode(self.ancestors[self.column_id(ds_id, column)])
+
+    def impact(self, ds_id: str, column: str) -> List[ColumnRef]:
+        """Every column definition downstream that depends on this one."""
+        return self.decode(self.descendants[self.column_id(ds_id, column)])
+
+    def derives_from(self, ds_id: str, column: str, source_ds: str, source_column: str) -> bool:
+        return bool(self.ancestors[self.column_id(ds_id, column)] >> self.column_id(source_ds, source_column) & 1)
+
+    def datasets_with(self, column: str) -> List[str]:
+        name = column.upper()
+        return [ds_id for ds_id, cols in self.columns.items() if name in cols]
+
+    def decode(self, bits: int) -> List[ColumnRef]:
+        refs = []
+        while bits:
+            low = bits & -bits
+            refs.append(self.refs[low.bit_length() - 1])
+            bits ^= low
+        return refs
+
+    # --- Forward sweep ---
+
+    def _visit(self, op: Operation):
+        inputs = [self._columns_of(ds_id) for ds_id in op.inputs]
+
+        if op.type == OpType.LOAD_CSV:
+            columns: Dict[str, int] = {} # Declared schema only: sources
+        elif op.type in self.PASS_THROUGH_TYPES:
+            columns = self._merge(inputs)
+        elif op.type in (OpType.COMPUTE_COLUMNS, OpType.BATCH_COMPUTE):
+            columns = dict(self._merge(inputs))
+            entries = op.parameters.get("computes", []) if op.type == OpType.BATCH_COMPUTE else [op.parameters]
+            pending: Dict[str, List[int]] = {} # Targets of this op -> parents
+            written: Dict[str, Dict[str, List[int]]] = {ds_id: {} for ds_id in op.outputs}
+            for entry in entries:
+                target = entry.get("target")
+                if target:
+                    # Reads of an earlier target in the batch resolve to what it read
+                    pending[target.upper()] = self._reads(entry.get("expression"), columns, pending, inputs)
+                    if entry.get("temporary"):
+                        continue # CSE temps stay inside the batch
+                    # A fused batch only writes an entry into its tagged output
+                    for ds_id in ([entry["output"]] if entry.get("output") in written else op.outputs):
+                        written[ds_id][target.upper()] = pending[target.upper()]
+            for ds_id in op.outputs:
+                out = dict(columns) if len(op.outputs) > 1 else columns
+                for name, parents in written[ds_id].items():
+                    out[name] = self._new(ds_id, name, parents)
+                self._define(ds_id, out)
+            return
+        elif op.type == OpType.AGGREGATE:
+            source = self._merge(inputs)
+            columns = {name: source[name] for name in self._names(op.parameters.get("break")) if name in source}
+            derived = {}
+            for spec in op.parameters.get("aggregations", []):
+                target, _, expression = str(spec).partition("=")
+                if target.strip():
+                    derived[target.strip().upper()] = self._reads(expression, source, {}, inputs)
+            for ds_id in op.outputs:
+                out = dict(columns)
+                for name, parents in derived.items():
+                    out[name] = self._new(ds_id, name, parents)
+                self._define(ds_id, out)
+            return
+        else:
+            # Opaque (GENERIC_TRANSFORM, ...): names pass through, declared extras depend on everything
+            columns = self._merge(inputs)
+            for ds_id in op.outputs:
+                extras = [name for name in self._schemas.get(ds_id, []) if name not in columns]
+                out = dict(columns) if extras else columns
+                everything = self._all(inputs)
+                for name in extras:
+                    out[name] = self._new(ds_id, name, everything)
+                self._define(ds_id, out)
+            return
+
+        for ds_id in op.outputs:
+            self._define(ds_id, columns)
+
+    def _merge(self, inputs: List[Dict[str, int]]) -> Dict[str, int]:
+        """Columns of several inputs; a name on more than one side merges (join keys)."""
+        if len(inputs) == 1:
+            return inputs[0] # Shared, never mutated
+        merged: Dict[str, int] = {}
+        clashes: Dict[str, List[int]] = {}
+        for cols in inputs:
+            for name, cid in cols.items():
+                if name in merged and merged[name] != cid:
+                    clashes.setdefault(name, [merged[name]]).append(cid)
+                merged.setdefault(name, cid)
+        if clashes:
+            self._pending_merges = clashes
+        return merged
+
+    def _define(self, ds_id: str, columns: Dict[str, int]):
+        clashes, self._pending_merges = self._pending_merges, {}
+        declared = [name for name in self._schemas.get(ds_id, []) if name not in columns]
+        if clashes or declared or ds_id in self.columns:
+            columns = dict(columns) # About to differ from what it was built from
+            for name, parents in clashes.items():
+                columns[name] = self._new(ds_id, name, parents)
+            for name in declared:
+                columns[name] = self._new(ds_id, name, []) # Declared, but nothing we saw produces it
+        if ds_id in self.columns:
+            # A second writer: merge with what the first one wrote
+            for name, cid in self.columns[ds_id].items():
+                if name in columns and columns[name] != cid:
+                    columns[name] = self._new(ds_id, name, [cid, columns[name]])
+                else:
+                    columns.setdefault(name, cid)
+        self.columns[ds_id] = columns
+
+    def _columns_of(self, ds_id: str) -> Dict[str, int]:
+        if ds_id not in self.columns:
+            # Never produced: an external input, its declared columns are sources
+            self.columns[ds_id] = {name: self._new(ds_id, name, []) for name in self._schemas.get(ds_id, [])}
+        return self.columns[ds_id]
+
+    def _new(self, ds_id: str, name: str, parents: Iterable[int]) -> int:
+        cid = len(self.refs)
+        self.refs.append((ds_id, name))
+        unique = list(dict.fromkeys(parents))
+        ancestors = 0
+        for parent in unique:
+            ancestors |= self.ancestors[parent] | (1 << parent)
+        self.parents.append(unique)
+        self.ancestors.append(ancestors)
+        return cid
+
+    def _all(self, inputs: List[Dict[str, int]]) -> List[int]:
+        return [cid for cols in inputs for cid in cols.values()]
+
+    def _reads(self, text, columns: Dict[str, int], pending: Dict[str, List[int]], inputs) -> List[int]:
+        if text is None:
+            return self._all(inputs) # No expression (e.g. a promoted RECODE): it may read anything
+        if str(text).strip() == "":
+            return []
+        try:
+            names = referenced_columns(parse_expression(str(text)))
+        except ValueError:
+            return self._all(inputs) # Cannot tell what it reads: everything
+        parents = []
+        for name in names:
+            name = name.upper()
+            if name in pending:
+                parents.extend(pending[name])
+            elif name in columns:
+                parents.append(columns[name])
+        return parents
+
+    def _names(self, value) -> List[str]:
+        if not value:
+            return []
+        if isinstance(value, str):
+            value = value.split()
+        return [str(v).upper() for v in value]
+
+    # --- Backward sweep (and source columns) ---
+
+    def _propagate_descendants(self):
+        # Ids are handed out parents-first, so one reverse pass sees every child before its parents
+        self.descendants = [0] * len(self.refs)
+        self.source_mask = sum(1 << cid for cid, parents in enumerate(self.parents) if not parents)
+        for cid in range(len(self.refs) - 1, -1, -1):
+            below = self.descendants[cid] | (1 << cid)
+            for parent in self.parents[cid]:
+                self.descendants[parent] |= below
@@ -0,0 +1,236 @@
+from typing import Dict, Iterable, List, Optional, Set
+from etl_ir.model import Pipeline, Operation, Dataset
+from etl_ir.types import OpType
+from .construct import make_dataset, make_op, make_pipeline
+from .expressions import parse_expression, referenced_columns
+from .index import PipelineIndex
+from .ordering import OrderingOptimizer
+
+# None == "every column" (an opaque consumer or an unknown schema)
+Live = Optional[Set[str]]
+
+class DeadColumnEliminator:
+    """
+    Optimization Pass (Projection Pushdown):
+    1. Backward liveness sweep: which columns of each dataset are ever read
+       by a downstream compute, filter, join key, aggregate, save or sink.
+    2. Drops BATCH_COMPUTE entries whose target is never read.
+    3. Narrows LOAD_CSV and JOIN ops to the live columns ('columns' parameter)
+       and removes the dropped columns from Dataset.columns downstream.
+
+    Saves, GENERIC_TRANSFORMs, computes without an expression (e.g. a promoted
+    RECODE) and unconsumed datasets keep every column live.
+    Operation order is assumed topological (as emitted by the trace).
+    """
+
+    # SPSS aggregate functions written without an argument ('n = N'): they read no column
+    NO_ARGUMENT_AGGREGATES = {"N", "NU"}
+
+    def __init__(self, pipeline: Pipeline, index: Optional[PipelineIndex] = None):
+        self.pipeline = pipeline
+        self.index = index or PipelineIndex(pipeline)
+        self.live: Dict[str, Live] = {}
+        self.dropped_computes: Dict[str, List[str]] = {} # op_id -> dropped targets
+        self.dropped_columns: Dict[str, List[str]] = {}  # ds_id -> dropped columns
+        self._dropped_entries: Dict[str, List[dict]] = {} # op_id -> dropped compute entries
+
+    def run(self) -> Pipeline:
+        self._compute_liveness()
+
+        new_ops = [self._rewrite(op) for op in self.pipeline.operations]
+        new_datasets = self._narrow_datasets(new_ops)
+
+        return make_pipeline(
+            metadata=self.pipeline.metadata,
+            datasets=new_datasets,
+            operations=new_ops
+        )
+
+    # --- 1. Backward liveness ---
+
+    def _compute_liveness(self):
+        self.live = {}
+        for op in reversed(self.pipeline.operations):
+            for ds_id, live_in in self._live_in(op).items():
+                if ds_id in self.live:
+                    self.live[ds_id] = self._union([self.live[ds_id], live_in])
+                else:
+                    self.live[ds_id] = live_in
+
+    def _live_out(self, ds_id: str) -> Live:
+        if not self.index.consumers_of(ds_id):
+            return None # Pipeline output: everything in it is a result
+        return self.live.get(ds_id)
+
+    def _live_in(self, op: Operation) -> Dict[str, Live]:
+        if op.type == OpType.BATCH_COMPUTE:
+            live, _ = self._sweep_batch(op) # Per output: a fused batch's branches don't mix
+            return {ds_id: (set(live) if live is not None else None) for ds_id in op.inputs}
+
+        needed = self._union(self._live_out(ds_id) for ds_id in op.outputs)
+        if op.type == OpType.COMPUTE_COLUMNS:
+            target = op.parameters.get("target")
+            live = self._union([self._minus(needed, target), self._reads(op.parameters.get("expression"))])
+        elif op.type == OpType.FILTER_ROWS:
+            live = self._union([needed, self._reads(op.parameters.get("condition"))])
+        elif op.type == OpType.SORT_ROWS:
+            live = self._union([needed, self._sort_keys(op.parameters.get("keys"))])
+        elif op.type == OpType.MATERIALIZE:
+            live = needed
+        elif op.type == OpType.JOIN:
+            live = self._union([needed, self._names(op.parameters.get("by"))])
+        elif op.type == OpType.AGGREGATE:
+            live = self._aggregate_reads(op)
+        else:
+            live = None # SAVE_BINARY, GENERIC_TRANSFORM, ...: opaque sinks
+
+        return {ds_id: (set(live) if live is not None else None) for ds_id in op.inputs}
+
+    def _sweep_batch(self, op: Operation):
+        """
+        Walks a batch's computes backwards, once per output: a horizontally fused
+        batch only writes an entry into the output it is tagged with (untagged
+        entries go to every output). Returns (live inputs, kept flags); an entry
+        is kept while any output needs it.
+        """
+        computes = op.parameters.get("computes", [])
+        keep = [False] * len(computes)
+        live_ins = []
+        for out in op.outputs or [None]:
+            live = self._live_out(out) if out is not None else set()
+            for entry in op.parameters.get("filters", []):
+                if self._writes_to(op, entry, out):
+                    live = self._union([live, self._reads(entry.get("condition"))])
+
+            for i in range(len(computes) - 1, -1, -1):
+                if not self._writes_to(op, computes[i], out):
+                    continue # Another branch's entry: it neither defines nor reads anything here
+                target = computes[i].get("target")
+                if live is not None and target and target.upper() not in live:
+                    continue # Nobody downstream of this output (or later in the batch) reads it
+                keep[i] = True
+                live = self._union([self._minus(live, target), self._reads(computes[i].get("expression"))])
+            live_ins.append(live)
+        return self._union(live_ins), keep
+
+    def _writes_to(self, op: Operation, entry: dict, out: Optional[str]) -> bool:
+        tag = entry.get("output")
+        return not tag or tag == out or tag not in op.outputs
+
+    def _aggregate_reads(self, op: Operation) -> Live:
+        live = self._names(op.parameters.get("break"))
+        for spec in op.parameters.get("aggregations", []):
+            _, _, source = str(spec).partition("=")
+            if source.strip().upper() in self.NO_ARGUMENT_AGGREGATES:
+                continue # Counts cases
+            live = self._union([live, self._reads(source)])
+        return live
+
+    # --- 2./3. Rewrites ---
+
+    def _rewrite(self, op: Operation) -> Operation:
+        parameters = None
+        if op.type == OpType.BATCH_COMPUTE:
+            _, keep = self._sweep_batch(op)
+            computes = op.parameters.get("computes", [])
+            if not all(keep):
+                self.dropped_computes[op.id] = [c.get("target") for c, k in zip(computes, keep) if not k]
+                self._dropped_entries[op.id] = [c for c, k in zip(computes, keep) if not k]
+                parameters = {**op.parameters, "computes": [c for c, k in zip(computes, keep) if k]}
+        elif op.type in (OpType.LOAD_CSV, OpType.JOIN) and len(op.outputs) == 1:
+            columns = self._projection(op.outputs[0])
+            if columns is not None:
+                parameters = {**op.parameters, "columns": columns}
+
+        if parameters is None:
+            return op
+        new_op = make_op(id=op.id, type=op.type, inputs=op.inputs, outputs=op.outputs, parameters=parameters)
+        self.index.replace_op(new_op)
+        return new_op
+
+    def _projection(self, ds_id: str) -> Optional[List[str]]:
+        """Live columns of a source/join output, in schema order (None = keep all)."""
+        live = self._live_out(ds_id)
+        ds = self.index.dataset(ds_id)
+        if live is None or ds is None or not ds.columns:
+            return None
+        schema = {col.name.upper() for col in ds.columns}
+        if not live <= schema:
+            return None # Schema misses a live column: it is incomplete, don't trust it
+        columns = [col.name for col in ds.columns if col.name.upper() in live]
+        return columns if len(columns) < len(ds.columns) else None
+
+    def _narrow_datasets(self, ops: List[Operation]) -> List[Dataset]:
+        """
+        Forward sweep: a column disappears where it is projected away (LOAD/JOIN)
+        or where its compute was dropped, and stays gone until re-created.
+        """
+        removed: Dict[str, Set[str]] = {}
+        for op in ops:
+            gone = set().union(*(removed.get(ds_id, set()) for ds_id in op.inputs))
+            if op.type in (OpType.LOAD_CSV, OpType.JOIN) and "columns" in op.parameters:
+                kept = {c.upper() for c in op.parameters["columns"]}
+                ds = self.index.dataset(op.outputs[0])
+                gone = {col.name.upper() for col in ds.columns} - kept
+            elif op.type == OpType.AGGREGATE:
+                gone = set() # Fresh schema
+            elif op.type == OpType.COMPUTE_COLUMNS:
+                if op.parameters.get("target"):
+                    gone = gone - {op.parameters["target"].upper()}
+            elif op.type == OpType.BATCH_COMPUTE:
+                # Per output: only the entries a fused batch writes there (re)create columns in it
+                dropped = self._dropped_entries.get(op.id, [])
+                for ds_id in op.outputs:
+                    created = {e["target"].upper() for e in op.parameters.get("computes", [])
+                               if e.get("target") and self._writes_to(op, e, ds_id)}
+                    lost = {e["target"].upper() for e in dropped if e.get("target") and self._writes_to(op, e, ds_id)}
+                    removed[ds_id] = (gone - created) | lost
+                continue
+            for ds_id in op.outputs:
+                removed[ds_id] = gone
+
+        new_datasets = []
+        for ds in self.pipeline.datasets:
+            gone = removed.get(ds.id)
+            if gone and any(col.name.upper() in gone for col in ds.columns):
+                self.dropped_columns[ds.id] = [col.name for col in ds.columns if col.name.upper() in gone]
+                ds = make_dataset(id=ds.id, source=ds.source, columns=[col for col in ds.columns if col.name.upper() not in gone])
+                self.index.put_dataset(ds)
+            new_datasets.append(ds)
+        return new_datasets
+
+    # --- Helpers ---
+
+    def _reads(self, text) -> Live:
+        if text is None:
+            return None # No expression (e.g. a promoted RECODE): it may read anything
+        if text == "":
+            return set()
+        try:
+            return {c.upper() for c in referenced_columns(parse_expression(str(text)))}
+        except ValueError:
+            return None # Cannot tell what it reads: keep everything
+
+    def _sort_keys(self, keys) -> Live:
+        order = OrderingOptimizer.parse_keys(keys)
+        return None if order is None else {name for name, _ in order}
+
+    def _names(self, value) -> Set[str]:
+        if not value:
+            return set()
+        if isinstance(value, str):
+            value = value.split()
+        return {str(v).upper() for v in value}
+
+    def _union(self, sets: Iterable[Live]) -> Live:
+        result: Set[str] = set()
+        for s in sets:
+            if s is None:
+                return None
+            result |= s
+        return result
+
+    def _minus(self, live: Live, target: Optional[str]) -> Live:
+        if live is None or not target:
+            return live
+        return live - {target.upper()}
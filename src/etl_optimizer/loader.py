@@ -0,0 +1,147 @@
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Union
+import yaml
+from yaml.events import (
+    AliasEvent, ScalarEvent, SequenceStartEvent, SequenceEndEvent,
+    MappingStartEvent, MappingEndEvent, StreamEndEvent
+)
+from yaml.nodes import Node, ScalarNode, SequenceNode, MappingNode
+from etl_ir.model import Pipeline, Operation, Dataset
+from .construct import TrustedBuilder, make_pipeline
+
+try:
+    from yaml import CSafeLoader as _Loader
+except ImportError: # PyYAML built without libyaml
+    from yaml import SafeLoader as _Loader
+
+Record = Union[Dataset, Operation]
+
+class StreamingTraceLoader:
+    """
+    Ingestion: Streams a SpecGen trace one record at a time.
+    1. Walks the libyaml event stream instead of building the whole document.
+    2. Composes and validates ONE dataset/operation at a time.
+    3. Yields Pydantic models, so peak memory is bounded by the consumer.
+
+    trusted=True (traces from our own SpecGen build) skips validation; see
+    construct.TrustedBuilder.
+    """
+
+    RECORD_TYPES = {
+        "datasets": Dataset,
+        "operations": Operation,
+    }
+
+    def __init__(self, path: Union[str, Path], trusted: bool = False):
+        self.path = Path(path)
+        self.trusted = trusted
+        self.metadata: Dict[str, Any] = {}
+        self._anchors: Dict[str, Node] = {}
+
+    def __iter__(self) -> Iterator[Record]:
+        """Yields every Dataset and Operation in file order."""
+        return self._stream(set(self.RECORD_TYPES))
+
+    def operations(self) -> Iterator[Operation]:
+        """Yields only Operations. Dataset records are skipped at the event level."""
+        return self._stream({"operations"})
+
+    def load(self) -> Pipeline:
+        """Materializes the stream into a Pipeline (drop-in for safe_load + Pipeline(**data))."""
+        datasets: List[Dataset] = []
+        operations: List[Operation] = []
+        for record in self:
+            if isinstance(record, Operation):
+                operations.append(record)
+            else:
+                datasets.append(record)
+
+        build = make_pipeline if self.trusted else Pipeline
+        return build(
+            metadata=self.metadata,
+            datasets=datasets,
+            operations=operations
+        )
+
+    def _stream(self, sections: set) -> Iterator[Record]:
+        self._anchors = {}
+        with open(self.path, "rb") as f:
+            loader = _Loader(f)
+            try:
+                yield from self._walk_document(loader, sections)
+            finally:
+                loader.dispose()
+
+    def _walk_document(self, loader, sections: set) -> Iterator[Record]:
+        loader.get_event() # StreamStart
+        if loader.check_event(StreamEndEvent):
+            return # Empty file
+        loader.get_event() # DocumentStart
+
+        if not loader.check_event(MappingStartEvent):
+            raise ValueError(f"Trace '{self.path}' must be a mapping at the top level")
+        loader.get_event()
+
+        if self.trusted:
+            trusted = TrustedBuilder() # One per document: its column cache dies with the stream
+            builders = {"datasets": trusted.dataset, "operations": trusted.operation}
+        else:
+            builders = {key: model.model_validate for key, model in self.RECORD_TYPES.items()}
+
+        while not loader.check_event(MappingEndEvent):
+            key = loader.construct_document(self._compose(loader))
+
+            if key in self.RECORD_TYPES and loader.check_event(SequenceStartEvent):
+                build = builders[key]
+                loader.get_event()
+                while not loader.check_event(SequenceEndEvent):
+                    node = self._compose(loader)
+                    if key in sections:
+                        yield build(loader.construct_document(node))
+                loader.get_event()
+            else:
+                value = loader.construct_document(self._compose(loader))
+                if key == "metadata":
+                    self.metadata = value or {}
+
+    def _compose(self, loader) -> Node:
+        """
+        Builds the node tree for a single value from events.
+        Mirrors yaml.composer.Composer, which the C loader does not expose.
+        """
+        event = loader.get_event()
+
+        if isinstance(event, AliasEvent):
+            if event.anchor not in self._anchors:
+                raise ValueError(f"Undefined YAML alias '{event.anchor}' in '{self.path}'")
+            return self._anchors[event.anchor]
+
+        if isinstance(event, ScalarEvent):
+            tag = event.tag
+            if tag is None or tag == "!":
+                tag = loader.resolve(ScalarNode, event.value, event.implicit)
+            node = ScalarNode(tag, event.value, event.start_mark, event.end_mark, style=event.style)
+
+        elif isinstance(event, SequenceStartEvent):
+            tag = event.tag
+            if tag is None or tag == "!":
+                tag = loader.resolve(SequenceNode, None, event.implicit)
+            node = SequenceNode(tag, [], event.start_mark, None, flow_style=event.flow_style)
+            while not loader.check_event(SequenceEndEvent):
+                node.value.append(self._compose(loader))
+            node.end_mark = loader.get_event().end_mark
+
+        else: # MappingStartEvent
+            tag = event.tag
+            if tag is None or tag == "!":
+                tag = loader.resolve(MappingNode, None, event.implicit)
+            node = MappingNode(tag, [], event.start_mark, None, flow_style=event.flow_style)
+            while not loader.check_event(MappingEndEvent):
+                key_node = self._compose(loader)
+                value_node = self._compose(loader)
+                node.value.append((key_node, value_node))
+            node.end_mark = loader.get_event().end_mark
+
+        if event.anchor is not None:
+            self._anchors[event.anchor] = node
+        return node
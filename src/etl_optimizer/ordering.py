@@ -0,0 +1,170 @@
+import re
+from typing import Dict, List, Optional, Set, Tuple
+from etl_ir.model import Pipeline, Operation
+from etl_ir.types import OpType
+from .construct import make_op, make_pipeline
+from .index import PipelineIndex
+
+# Sort order of a dataset: ((COLUMN, ascending), ...). () == no known order.
+Order = Tuple[Tuple[str, bool], ...]
+
+class OrderingOptimizer:
+    """
+    Optimization Pass (Ordering Properties):
+    1. Tracks the sort order of every dataset through the graph.
+    2. Drops SORT_ROWS ops whose input is already ordered on their keys.
+    3. Drops sorts that only feed a JOIN's lookup (non-driving) side: the join
+       runs as a hash join instead, and its output order is unchanged.
+    4. Marks every JOIN with parameters['strategy'] = 'sort_merge' | 'hash'.
+
+    Operation order is assumed topological (as emitted by the trace).
+    """
+
+    # Ops that pass rows through in the same order
+    ORDER_PRESERVING = {OpType.FILTER_ROWS, OpType.MATERIALIZE, OpType.SAVE_BINARY}
+
+    def __init__(self, pipeline: Pipeline, index: Optional[PipelineIndex] = None):
+        self.pipeline = pipeline
+        self.index = index or PipelineIndex(pipeline)
+        self.orders: Dict[str, Order] = {}
+        self.dropped_sorts: List[str] = []
+        self.join_strategies: Dict[str, str] = {}
+
+    def run(self) -> Pipeline:
+        self.orders = {}
+        orphans: Set[str] = set()
+
+        for op in self.pipeline.operations:
+            op = self.index.op(op.id)
+            if op is None:
+                continue # A sort dropped while planning a later join
+            if op.type == OpType.SORT_ROWS and self._is_redundant(op):
+                if self._drop_sort(op):
+                    orphans.update(op.outputs)
+                    continue
+            if op.type == OpType.JOIN:
+                for side_input in op.inputs[1:]:
+                    sort = self._lookup_side_sort(op, side_input)
+                    if sort and self._drop_sort(sort):
+                        orphans.update(sort.outputs)
+                op = self._plan_join(self.index.op(op.id))
+            for out in op.outputs:
+                self.orders[out] = self._output_order(op)
+
+        new_ops = [self.index.op(op.id) for op in self.pipeline.operations if self.index.op(op.id)]
+        datasets = []
+        for ds in self.pipeline.datasets:
+            if ds.id in orphans and not self.index.is_active(ds.id):
+                self.index.drop_dataset(ds.id)
+            else:
+                datasets.append(ds)
+
+        return make_pipeline(
+            metadata=self.pipeline.metadata,
+            datasets=datasets,
+            operations=new_ops
+        )
+
+    # --- Order propagation ---
+
+    def _order_of(self, ds_id: str) -> Order:
+        return self.orders.get(ds_id, ())
+
+    def _output_order(self, op: Operation) -> Order:
+        if op.type == OpType.SORT_ROWS:
+            return self.parse_keys(op.parameters.get("keys")) or ()
+        if op.type in self.ORDER_PRESERVING and op.inputs:
+            return self._order_of(op.inputs[0])
+        if op.type in (OpType.COMPUTE_COLUMNS, OpType.BATCH_COMPUTE) and len(op.inputs) == 1:
+            # Rows keep their order, but a reassigned key column breaks it from there on
+            entries = op.parameters.get("computes", []) if op.type == OpType.BATCH_COMPUTE else [op.parameters]
+            targets = {e["target"].upper() for e in entries if e.get("target")}
+            order = self._order_of(op.inputs[0])
+            for i, (column, _) in enumerate(order):
+                if column in targets:
+                    return order[:i]
+            return order
+        if op.type == OpType.JOIN and op.inputs:
+            # Both strategies stream the driving input in order
+            return self._order_of(op.inputs[0])
+        if op.type == OpType.AGGREGATE:
+            # One row per break group, emitted in break order
+            return tuple((str(name).upper(), True) for name in op.parameters.get("break", []))
+        return () # Sources and opaque generics
+
+    @staticmethod
+    def parse_keys(keys) -> Optional[Order]:
+        """
+        Parses SPSS sort keys ('BY a b (D) c'). A direction applies to every
+        variable listed since the previous one. Returns None when unknown.
+        """
+        if not keys or str(keys).strip().lower() == "unknown":
+            return None
+        tokens = re.findall(r'\(\s*[AD]\s*\)|[A-Za-z_$#@][A-Za-z0-9_.$#@]*', str(keys), re.IGNORECASE)
+        order: List[Tuple[str, bool]] = []
+        pending: List[str] = []
+        for token in tokens:
+            if token.startswith("("):
+                ascending = token.strip("() ").upper() == "A"
+                order.extend((name, ascending) for name in pending)
+                pending = []
+            elif token.upper() not in ("BY", "CASES", "SORT"):
+                pending.append(token.upper())
+        order.extend((name, True) for name in pending)
+        return tuple(order) or None
+
+    # --- Rewrites ---
+
+    def _is_redundant(self, sort: Operation) -> bool:
+        keys = self.parse_keys(sort.parameters.get("keys"))
+        if keys is None or len(sort.inputs) != 1:
+            return False
+        return self._order_of(sort.inputs[0])[:len(keys)] == keys
+
+    def _lookup_side_sort(self, join: Operation, ds_id: str) -> Optional[Operation]:
+        """The sort producing a join's lookup input, if nothing else reads it."""
+        producers = self.index.producers_of(ds_id)
+        if len(producers) != 1 or self.index.consumers_of(ds_id) != [join.id]:
+            return None
+        sort = self.index.op(producers[0])
+        return sort if sort.type == OpType.SORT_ROWS else None
+
+    def _drop_sort(self, sort: Operation) -> bool:
+        """Removes a sort and points its readers at its input. False if it must stay."""
+        if len(sort.inputs) != 1 or len(sort.outputs) != 1:
+            return False
+        source, target = sort.inputs[0], sort.outputs[0]
+        readers = list(self.index.consumers_of(target))
+        if not readers or self.index.producers_of(target) != [sort.id]:
+            return False # A pipeline output keeps its sort
+
+        self.index.remove_op(sort.id)
+        for reader_id in readers:
+            reader = self.index.op(reader_id)
+            rewired = make_op(
+                id=reader.id, type=reader.type,
+                inputs=[source if inp == target else inp for inp in reader.inputs],
+                outputs=reader.outputs, parameters=reader.parameters
+            )
+            self.index.replace_op(rewired)
+        self.dropped_sorts.append(sort.id)
+        return True
+
+    def _plan_join(self, join: Operation) -> Operation:
+        by = join.parameters.get("by") or []
+        keys = [str(k).upper() for k in (by.split() if isinstance(by, str) else by)]
+        sorted_inputs = keys and all(
+            [column for column, ascending in self._order_of(ds_id)[:len(keys)] if ascending] == keys
+            for ds_id in join.inputs
+        )
+        strategy = "sort_merge" if sorted_inputs else "hash"
+        self.join_strategies[join.id] = strategy
+        if join.parameters.get("strategy") == strategy:
+            return join
+
+        planned = make_op(
+            id=join.id, type=join.type, inputs=join.inputs, outputs=join.outputs,
+            parameters={**join.parameters, "strategy": strategy}
+        )
+        self.index.replace_op(planned)
+        return planned
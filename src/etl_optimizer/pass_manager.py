@@ -0,0 +1,134 @@
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from etl_ir.model import Pipeline
+from .index import PipelineIndex
+
+# A pass factory takes (pipeline, shared index) and returns an object with run() -> Pipeline
+PassFactory = Callable[[Pipeline, PipelineIndex], Any]
+
+@dataclass
+class PassStats:
+    name: str
+    iteration: int
+    skipped: bool = False
+    changed: bool = False
+    wall_time: float = 0.0                # seconds
+    memory_delta: Optional[int] = None    # bytes (only when tracking memory)
+    ops_before: int = 0
+    ops_after: int = 0
+    datasets_before: int = 0
+    datasets_after: int = 0
+
+
+class PassManager:
+    """
+    Pass Scheduler: Runs registered passes in order, round after round.
+    1. Stops at a fixed point (a whole round changed nothing) or after max_iterations.
+    2. Skips a pass when the pipeline is unchanged since that pass last ran
+       and found nothing to do.
+    3. Records wall time, memory delta (tracemalloc, opt-in) and op/dataset
+       counts for every pass run.
+    """
+
+    def __init__(self, max_iterations: int = 4, track_memory: bool = False):
+        if max_iterations < 1:
+            raise ValueError(f"max_iterations must be >= 1, got {max_iterations}")
+        self.max_iterations = max_iterations
+        self.track_memory = track_memory
+        self.passes: List[Tuple[str, PassFactory]] = []
+        self.instances: Dict[str, List[Any]] = {} # name -> pass object of every run, in order
+        self.stats: List[PassStats] = []
+        self.iterations = 0
+        self.converged = False
+
+    def register(self, name: str, factory: PassFactory):
+        if any(existing == name for existing, _ in self.passes):
+            raise ValueError(f"Pass '{name}' is already registered")
+        self.passes.append((name, factory))
+        return self
+
+    def run(self, pipeline: Pipeline, index: Optional[PipelineIndex] = None) -> Pipeline:
+        index = index or PipelineIndex(pipeline)
+        self.stats = []
+        self.instances = {}
+        self.converged = False
+        settled: Dict[str, int] = {} # name -> fingerprint the pass last ran on without changing it
+
+        started_tracing = self.track_memory and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        try:
+            current = fingerprint(pipeline)
+            for iteration in range(1, self.max_iterations + 1):
+                self.iterations = iteration
+                round_changed = False
+                for name, factory in self.passes:
+                    if settled.get(name) == current:
+                        # Already a no-op on exactly this pipeline: skip the rerun
+                        self.stats.append(PassStats(name, iteration, skipped=True))
+                        continue
+                    pipeline, stats = self._run_pass(name, factory, pipeline, index, iteration)
+                    after = fingerprint(pipeline)
+                    stats.changed = after != current
+                    round_changed |= stats.changed
+                    self.stats.append(stats)
+                    if not stats.changed:
+                        settled[name] = after
+                    current = after
+                if not round_changed:
+                    self.converged = True
+                    break
+        finally:
+            if started_tracing:
+                tracemalloc.stop()
+
+        return pipeline
+
+    def _run_pass(self, name, factory, pipeline, index, iteration):
+        stats = PassStats(name, iteration, ops_before=len(pipeline.operations), datasets_before=len(pipeline.datasets))
+        memory_before = tracemalloc.get_traced_memory()[0] if self.track_memory else None
+
+        start = time.perf_counter()
+        instance = factory(pipeline, index)
+        pipeline = instance.run()
+        stats.wall_time = time.perf_counter() - start
+
+        if memory_before is not None:
+            stats.memory_delta = tracemalloc.get_traced_memory()[0] - memory_before
+        stats.ops_after = len(pipeline.operations)
+        stats.datasets_after = len(pipeline.datasets)
+        self.instances.setdefault(name, []).append(instance)
+        return pipeline, stats
+
+    def report(self) -> str:
+        """Plain-text table of every pass run (skipped runs included)."""
+        lines = [f"{'iter':>4}  {'pass':<12} {'time (ms)':>10} {'mem (KiB)':>10} {'ops':>13} {'datasets':>13}"]
+        for s in self.stats:
+            if s.skipped:
+                lines.append(f"{s.iteration:>4}  {s.name:<12} {'skipped':>10}")
+                continue
+            memory = f"{s.memory_delta / 1024:.1f}" if s.memory_delta is not None else "-"
+            lines.append(
+                f"{s.iteration:>4}  {s.name:<12} {s.wall_time * 1000:>10.2f} {memory:>10} "
+                f"{f'{s.ops_before} -> {s.ops_after}':>13} {f'{s.datasets_before} -> {s.datasets_after}':>13}"
+            )
+        return "\n".join(lines)
+
+
+def fingerprint(pipeline: Pipeline) -> int:
+    """Content hash of the pipeline (stable within one process)."""
+    return hash((
+        tuple((op.id, op.type, tuple(op.inputs), tuple(op.outputs), _freeze(op.parameters)) for op in pipeline.operations),
+        tuple((ds.id, tuple((col.name, col.type) for col in ds.columns)) for ds in pipeline.datasets),
+    ))
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return tuple((k, _freeze(v)) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, set):
+        return frozenset(_freeze(v) for v in value)
+    return value
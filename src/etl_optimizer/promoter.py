@@ -1,6 +1,56 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
 from etl_ir.model import Pipeline, Operation
 from etl_ir.types import OpType
+from .construct import make_op
+from .index import PipelineIndex
+from .rewriter import PipelineRewriter
+from .rules import DROP, PromotionRules
+
+class AliasForest:
+    """
+    Union-find over dataset ids: when DCE drops an op, each of its outputs
+    becomes an alias of the input it passed through. find() follows any run of
+    dropped ops back to the surviving source (with path compression), in
+    whatever order the drops were recorded.
+    Reads like a {deleted_ds: source_ds} dict.
+    """
+
+    def __init__(self, aliases: Optional[Dict[str, str]] = None):
+        self.parent: Dict[str, str] = {}
+        for target, source in (aliases or {}).items():
+            self.union(target, source)
+
+    def find(self, ds_id: str) -> str:
+        root = ds_id
+        while root in self.parent:
+            root = self.parent[root]
+        while ds_id != root: # Path compression
+            self.parent[ds_id], ds_id = root, self.parent[ds_id]
+        return root
+
+    def union(self, target: str, source: str) -> bool:
+        """Aliases target to source. A dataset keeps its first alias, and no alias may loop back onto itself."""
+        if target in self.parent:
+            return False
+        root = self.find(source)
+        if root == target:
+            return False
+        self.parent[target] = root
+        return True
+
+    def resolve(self, ds_ids: List[str]) -> List[str]:
+        return [self.find(ds_id) for ds_id in ds_ids]
+
+    def __contains__(self, ds_id: str) -> bool:
+        return ds_id in self.parent
+
+    def __getitem__(self, ds_id: str) -> str:
+        if ds_id not in self.parent:
+            raise KeyError(ds_id)
+        return self.find(ds_id)
+
+    def __len__(self) -> int:
+        return len(self.parent)
 
 class SemanticPromoter:
     """
@@ -8,78 +58,134 @@ class SemanticPromoter:
     1. Promotes 'Generic' nodes to Semantic Nodes.
     2. Performs Dead Code Elimination (DCE) on Syntax Noise.
     3. REWIRES the graph to heal broken links caused by DCE.
+
+    What counts as noise and what gets promoted comes from PromotionRules
+    (the built-in set, or a rules file).
     """
     
-    NOISE_COMMANDS = {
-        "DO", "END", "FORMATS", "LIST", "STRING", "EXECUTE"
-    }
-
-    def __init__(self, pipeline: Pipeline):
+    def __init__(self, pipeline: Pipeline, index: Optional[PipelineIndex] = None, rules: Optional[PromotionRules] = None):
         self.pipeline = pipeline
+        self.index = index # Kept in sync when shared by the coordinator
+        self.rules = rules or PromotionRules.default()
         self.new_ops: List[Operation] = []
-        self.alias_map: Dict[str, str] = {} # Maps deleted_ds -> source_ds
+        self.alias_map = AliasForest() # Maps deleted_ds -> source_ds
 
     def run(self) -> Pipeline:
-        self.new_ops = []
-        self.alias_map = {} 
-
-        for op in self.pipeline.operations:
-            # 1. Resolve Inputs (Rewiring)
-            # If a previous node was deleted, its output is now an alias for its input.
-            # We points the current op to the original source.
-            resolved_inputs = [self.alias_map.get(inp, inp) for inp in op.inputs]
-            
-            # Create a temporary copy with resolved inputs to check/promote
-            current_op = Operation(
-                id=op.id,
-                type=op.type,
-                inputs=resolved_inputs,
-                outputs=op.outputs,
-                parameters=op.parameters
-            )
+        """
+        Rewires over the whole dataflow graph, not the list order: an op listed
+        before the noise that feeds it is healed too. Edits in place: untouched
+        ops stay the same objects, and the caller's pipeline is never modified.
+        """
+        self.alias_map = AliasForest()
+        rewriter = PipelineRewriter(self.pipeline, self.index)
 
-            if current_op.type == OpType.GENERIC_TRANSFORM:
-                promoted_op = self._promote_or_drop(current_op)
-                
-                if promoted_op:
-                    self.new_ops.append(promoted_op)
-                else:
-                    # Dropped! Heal the bridge.
-                    # If we drop a node A->B, map B->A.
-                    if current_op.inputs and current_op.outputs:
-                        source = current_op.inputs[0]
-                        target = current_op.outputs[0]
-                        self.alias_map[target] = source
+        # 1. Promote or drop every generic op (this needs no wiring)
+        dropped: List[Operation] = []
+        for op in rewriter:
+            if op.type != OpType.GENERIC_TRANSFORM:
+                continue
+            promoted_op = self._promote_or_drop(op)
+            if promoted_op is None:
+                dropped.append(rewriter.remove_op(op.id))
+            elif promoted_op is not op:
+                rewriter.replace_op(op.id, promoted_op)
+
+        # 2. Heal the bridges. A dataset a surviving op still writes keeps its id.
+        written = {out for op in rewriter for out in op.outputs}
+        for op in dropped:
+            for target, source in self._heals(op):
+                if target not in written:
+                    self.alias_map.union(target, source)
+
+        # 3. Point every reader at the surviving source
+        if self.alias_map:
+            for op in rewriter:
+                resolved_inputs = self.alias_map.resolve(op.inputs)
+                if resolved_inputs != op.inputs:
+                    rewriter.replace_op(op.id, make_op(
+                        id=op.id, type=op.type, inputs=resolved_inputs, outputs=op.outputs, parameters=op.parameters
+                    ))
+
+        result = rewriter.snapshot()
+        self.new_ops = result.operations
+        return result
+
+    def stream(self, operations: Iterable[Operation], aliases: Optional[Dict[str, str]] = None) -> Iterator[Operation]:
+        """
+        Promotes an operation stream lazily (e.g. straight from StreamingTraceLoader).
+        Only the alias map is kept in memory, so an op can only be healed through
+        noise listed before it. `aliases` seeds the map with links healed
+        by an earlier run (incremental re-optimization of part of a trace).
+        """
+        self.alias_map = AliasForest(aliases)
+
+        for op in operations:
+            new_op = self._rewrite(op)
+            if new_op is None:
+                if self.index:
+                    self.index.remove_op(op.id)
             else:
-                self.new_ops.append(current_op)
-        
-        return Pipeline(
-            metadata=self.pipeline.metadata,
-            datasets=self.pipeline.datasets,
-            operations=self.new_ops
+                self._sync_index(new_op)
+                yield new_op
+
+    def _rewrite(self, op: Operation) -> Optional[Operation]:
+        """
+        The op as this pass leaves it: `op` itself when nothing changes,
+        a new op when rewired or promoted, None when dropped.
+        """
+        # 1. Resolve Inputs (Rewiring)
+        # If a previous node was deleted, its output is now an alias for its input.
+        # We points the current op to the original source.
+        resolved_inputs = self.alias_map.resolve(op.inputs)
+
+        # Only a rewired op needs a copy; the rest pass through as they are
+        current_op = op if resolved_inputs == op.inputs else make_op(
+            id=op.id,
+            type=op.type,
+            inputs=resolved_inputs,
+            outputs=op.outputs,
+            parameters=op.parameters
         )
 
+        if current_op.type != OpType.GENERIC_TRANSFORM:
+            return current_op
+
+        promoted_op = self._promote_or_drop(current_op)
+        if promoted_op is None:
+            # Dropped! Heal the bridge.
+            for target, source in self._heals(current_op):
+                self.alias_map.union(target, source)
+        return promoted_op
+
+    def _heals(self, op: Operation) -> Iterator[Tuple[str, str]]:
+        """
+        (output, input it stands for) per output of a dropped op: we drop A->B, so map B->A.
+        With as many inputs as outputs they pair up by position;
+        otherwise every output stands for the first input.
+        """
+        if not op.inputs:
+            return
+        paired = len(op.inputs) == len(op.outputs)
+        for i, target in enumerate(op.outputs):
+            yield target, op.inputs[i] if paired else op.inputs[0]
+
+    def _sync_index(self, op: Operation):
+        if self.index:
+            self.index.replace_op(op)
+
     def _promote_or_drop(self, op: Operation) -> Operation | None:
         command = op.parameters.get("command", "").upper().strip()
-        args = op.parameters.get("args", "")
-        cmd_root = command.split()[0] if command else ""
+        rule = self.rules.dispatch(command)
 
         # 1. Dead Code Elimination
-        if cmd_root in self.NOISE_COMMANDS or command in self.NOISE_COMMANDS:
+        if rule is DROP:
             return None # Drop and trigger rewiring
 
-        # 2. Promote SORT
-        if "SORT" in command:
-            return Operation(
-                id=op.id, type=OpType.SORT_ROWS, inputs=op.inputs, outputs=op.outputs,
-                parameters={"keys": args or op.parameters.get("raw_content", "unknown")}
-            )
-            
-        # 3. Promote FILTER
-        if "SELECT IF" in command or "FILTER" in command or "IF" == command:
-            return Operation(
-                id=op.id, type=OpType.FILTER_ROWS, inputs=op.inputs, outputs=op.outputs,
-                parameters={"condition": args or op.parameters.get("raw_content", "unknown")}
+        # 2. Promote (SORT, FILTER, ... see rules.DEFAULT_RULES)
+        if rule is not None:
+            return make_op(
+                id=op.id, type=rule.type, inputs=op.inputs, outputs=op.outputs,
+                parameters=rule.parameters_for(op.parameters)
             )
 
-        return op
\ No newline at end of file
+        return op
@@ -0,0 +1,171 @@
+from typing import Dict, List, Optional, Set
+from etl_ir.model import Pipeline, Operation, Dataset
+from etl_ir.types import OpType
+from .construct import make_dataset, make_op, make_pipeline
+from .expressions import parse_expression, referenced_columns
+from .index import PipelineIndex
+
+class PredicatePushdown:
+    """
+    Optimization Pass (runs after SemanticPromoter, before VerticalCollapser):
+    1. Moves each FILTER_ROWS above the compute run that produces its input,
+       as long as no compute in the run creates a column the condition reads.
+    2. Crosses MATERIALIZE and SORT_ROWS freely (filtering keeps sort order).
+    3. Crosses JOINs onto the input whose schema holds every condition column:
+       the driving (first) input, or any input of an inner join.
+
+    The two ops swap datasets: the filter writes the dataset its old producer
+    used to write, so the surrounding wiring is untouched. A filter only moves
+    when its input feeds nothing else, and a condition we cannot parse (or the
+    promoter's 'unknown') never moves.
+    """
+
+    ROW_LOCAL_TYPES = {OpType.COMPUTE_COLUMNS, OpType.BATCH_COMPUTE}
+    TRANSPARENT_TYPES = {OpType.MATERIALIZE, OpType.SORT_ROWS}
+
+    def __init__(self, pipeline: Pipeline, index: Optional[PipelineIndex] = None):
+        self.pipeline = pipeline
+        self.index = index or PipelineIndex(pipeline)
+        self.ops: List[Operation] = []
+        self.slots: Dict[str, int] = {}
+        self.datasets: Dict[str, Dataset] = {}
+        self.pushed: Dict[str, List[str]] = {} # filter op_id -> ops it moved above
+
+    def run(self) -> Pipeline:
+        self.ops = list(self.pipeline.operations)
+        self.slots = {op.id: i for i, op in enumerate(self.ops)}
+        self.datasets = {ds.id: ds for ds in self.pipeline.datasets}
+
+        for filter_id in [op.id for op in self.ops if op.type == OpType.FILTER_ROWS]:
+            reads = self._reads(self.index.op(filter_id))
+            if reads is None:
+                continue
+            while self._push(filter_id, reads):
+                pass
+
+        return make_pipeline(
+            metadata=self.pipeline.metadata,
+            datasets=[self.datasets[ds.id] for ds in self.pipeline.datasets],
+            operations=self.ops
+        )
+
+    def _push(self, filter_id: str, reads: Set[str]) -> bool:
+        """Moves the filter one op upstream. Returns False once it cannot move."""
+        flt = self.index.op(filter_id)
+        if len(flt.inputs) != 1 or len(flt.outputs) != 1:
+            return False
+        link = flt.inputs[0]
+        producers = self.index.producers_of(link)
+        if len(producers) != 1 or self.index.consumers_of(link) != [filter_id]:
+            return False
+        producer = self.index.op(producers[0])
+
+        if producer.type in self.ROW_LOCAL_TYPES:
+            chain = self._compute_chain(producer)
+            if chain is None or reads & set().union(*(self._targets(op) for op in chain)):
+                return False # The condition needs a column the chain creates
+            for op in chain:
+                self._swap(self.index.op(filter_id), op, 0)
+                self.pushed.setdefault(filter_id, []).append(op.id)
+            return True
+        elif producer.type in self.TRANSPARENT_TYPES:
+            if len(producer.inputs) != 1 or producer.outputs != [link]:
+                return False
+            side = 0
+        elif producer.type == OpType.JOIN:
+            side = self._join_side(producer, reads)
+            if side is None or producer.outputs != [link]:
+                return False
+        else:
+            return False # Sources, aggregates, saves and opaque generics are barriers
+
+        self._swap(flt, producer, side)
+        self.pushed.setdefault(filter_id, []).append(producer.id)
+        return True
+
+    def _swap(self, flt: Operation, producer: Operation, side: int):
+        """
+        Before: source -producer-> link -filter-> out
+        After:  source -filter-> link -producer-> out
+        """
+        source, link, out = producer.inputs[side], flt.inputs[0], flt.outputs[0]
+        inputs = list(producer.inputs)
+        inputs[side] = link
+
+        new_filter = make_op(id=flt.id, type=flt.type, inputs=[source], outputs=[link], parameters=flt.parameters)
+        new_producer = make_op(id=producer.id, type=producer.type, inputs=inputs, outputs=[out], parameters=producer.parameters)
+        for old, new in ((flt, new_filter), (producer, new_producer)):
+            self.index.replace_op(new, old.id)
+
+        # The filter now runs where the producer ran (and vice versa)
+        filter_slot, producer_slot = self.slots[flt.id], self.slots[producer.id]
+        self.ops[producer_slot], self.slots[flt.id] = new_filter, producer_slot
+        self.ops[filter_slot], self.slots[producer.id] = new_producer, filter_slot
+
+        # 'link' now holds filtered source rows, so it takes the source's schema
+        source_ds = self.index.dataset(source)
+        link_ds = self.index.dataset(link)
+        if source_ds is not None and link_ds is not None:
+            moved = make_dataset(id=link, source=link_ds.source, columns=list(source_ds.columns))
+            self.index.put_dataset(moved)
+            self.datasets[link] = moved
+
+    def _compute_chain(self, producer: Operation) -> Optional[List[Operation]]:
+        """
+        The run of computes ending at `producer` (nearest first). A filter
+        crosses the whole run or none of it: stopping halfway would split a
+        chain VerticalCollapser can fuse into one scan.
+        """
+        chain = []
+        op = producer
+        while op is not None and op.type in self.ROW_LOCAL_TYPES:
+            if len(op.inputs) != 1 or len(op.outputs) != 1:
+                break # Fused multi-output batches stay put
+            chain.append(op)
+            upstream = op.inputs[0]
+            producers = self.index.producers_of(upstream)
+            if len(producers) != 1 or self.index.consumers_of(upstream) != [op.id]:
+                break
+            op = self.index.op(producers[0])
+        return chain or None
+
+    def _join_side(self, join: Operation, reads: Set[str]) -> Optional[int]:
+        """Index of the join input a filter on `reads` can move onto, if any."""
+        keys = self._names(join.parameters.get("by"))
+        schemas = []
+        for ds_id in join.inputs:
+            ds = self.index.dataset(ds_id)
+            schemas.append({col.name.upper() for col in ds.columns} if ds is not None else set())
+
+        inner = str(join.parameters.get("how", "")).lower() == "inner"
+        for side, schema in enumerate(schemas):
+            if side > 0 and not inner:
+                break # Outer/table lookups: only the driving input may lose rows
+            if not reads <= schema:
+                continue
+            # A non-key column present on another side would be ambiguous
+            others = set().union(*(s for i, s in enumerate(schemas) if i != side))
+            if (reads - keys) & others:
+                continue
+            return side
+        return None
+
+    def _reads(self, flt: Operation) -> Optional[Set[str]]:
+        condition = flt.parameters.get("condition")
+        if not condition or str(condition).strip().lower() == "unknown":
+            return None
+        try:
+            return {c.upper() for c in referenced_columns(parse_expression(str(condition)))}
+        except ValueError:
+            return None
+
+    def _targets(self, op: Operation) -> Set[str]:
+        entries = op.parameters.get("computes", []) if op.type == OpType.BATCH_COMPUTE else [op.parameters]
+        return {e["target"].upper() for e in entries if e.get("target")}
+
+    def _names(self, value) -> Set[str]:
+        if not value:
+            return set()
+        if isinstance(value, str):
+            value = value.split()
+        return {str(v).upper() for v in value}
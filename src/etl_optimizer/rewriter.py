@@ -0,0 +1,173 @@
+from typing import Dict, Iterator, List, Optional
+from etl_ir.model import Pipeline, Operation, Dataset
+from .construct import make_op, make_pipeline
+from .index import PipelineIndex
+
+class PipelineRewriter:
+    """
+    In-place Rewriting: One mutable view of a pipeline that a pass edits instead of rebuilding.
+    1. replace_op / remove_op / splice (a chain -> one op in its last member's slot) /
+       rewire_input / rewire_consumers / put_dataset / drop_dataset / gc_datasets.
+       Untouched ops are never copied. An edited op is replaced, never mutated,
+       because snapshots may share it.
+    2. Copy-on-write: the op and dataset lists are shared with the source pipeline
+       and with every snapshot() until the next edit copies them, so a caller's
+       original (or an earlier snapshot) never changes under it.
+    3. Keeps a PipelineIndex in sync when given one; edits that need adjacency
+       build one on first use.
+
+    Iterating while editing is safe: removed ops are skipped, and an op put
+    into a later slot (splice) is visited when the walk gets there.
+    """
+
+    def __init__(self, pipeline: Pipeline, index: Optional[PipelineIndex] = None):
+        self.pipeline = pipeline
+        self.index = index
+        self._ops: List[Optional[Operation]] = pipeline.operations # None = removed
+        self._ops_owned = False
+        self._removed = 0
+        self._slots: Dict[str, int] = {op.id: i for i, op in enumerate(self._ops)}
+        self._datasets: List[Dataset] = pipeline.datasets
+        self._datasets_owned = False
+        self.changed = False
+
+    # --- Queries ---
+
+    def op(self, op_id: str) -> Optional[Operation]:
+        slot = self._slots.get(op_id)
+        return self._ops[slot] if slot is not None else None
+
+    def __iter__(self) -> Iterator[Operation]:
+        for slot in range(len(self._ops)):
+            op = self._ops[slot] # Re-read: an edit may have swapped the list
+            if op is not None:
+                yield op
+
+    def __len__(self) -> int:
+        return len(self._ops) - self._removed
+
+    def snapshot(self) -> Pipeline:
+        """The current pipeline. Shares every list until the next edit."""
+        if self._removed:
+            self._compact()
+        self._ops_owned = self._datasets_owned = False
+        return make_pipeline(metadata=self.pipeline.metadata, datasets=self._datasets, operations=self._ops)
+
+    # --- Op edits ---
+
+    def replace_op(self, op_id: str, new_op: Operation):
+        """Puts new_op in op_id's slot (ids may differ)."""
+        slot = self._slot(op_id)
+        self._own_ops()
+        self._ops[slot] = new_op
+        if new_op.id != op_id:
+            del self._slots[op_id]
+            self._slots[new_op.id] = slot
+        if self.index is not None:
+            self.index.replace_op(new_op, op_id)
+        self.changed = True
+
+    def remove_op(self, op_id: str) -> Operation:
+        slot = self._slot(op_id)
+        self._own_ops()
+        op = self._ops[slot]
+        self._ops[slot] = None
+        del self._slots[op_id]
+        self._removed += 1
+        if self.index is not None:
+            self.index.remove_op(op_id)
+        self.changed = True
+        return op
+
+    def splice(self, op_ids: List[str], new_op: Operation):
+        """Replaces a group of ops (e.g. a fused chain) by new_op, in the slot of the last one."""
+        last = max(op_ids, key=self._slot)
+        for op_id in op_ids:
+            if op_id != last:
+                self.remove_op(op_id)
+        self.replace_op(last, new_op)
+
+    def rewire_input(self, op_id: str, old_ds: str, new_ds: str):
+        op = self.op(op_id)
+        if op is None or old_ds not in op.inputs:
+            raise ValueError(f"Operation '{op_id}' does not read '{old_ds}'")
+        inputs = [new_ds if inp == old_ds else inp for inp in op.inputs]
+        self.replace_op(op_id, make_op(id=op.id, type=op.type, inputs=inputs, outputs=op.outputs, parameters=op.parameters))
+
+    def rewire_consumers(self, old_ds: str, new_ds: str) -> List[str]:
+        """Points every reader of old_ds at new_ds. Returns the rewired op ids."""
+        readers = list(self._require_index().consumers_of(old_ds))
+        for op_id in readers:
+            self.rewire_input(op_id, old_ds, new_ds)
+        return readers
+
+    # --- Dataset edits ---
+
+    def put_dataset(self, ds: Dataset):
+        """Replaces the dataset with the same id (or appends a new one)."""
+        self._own_datasets()
+        for i, existing in enumerate(self._datasets):
+            if existing.id == ds.id:
+                self._datasets[i] = ds
+                break
+        else:
+            self._datasets.append(ds)
+        if self.index is not None:
+            self.index.put_dataset(ds)
+        self.changed = True
+
+    def drop_dataset(self, ds_id: str):
+        self._own_datasets()
+        kept = [ds for ds in self._datasets if ds.id != ds_id]
+        if len(kept) != len(self._datasets):
+            self._datasets = kept
+            self.changed = True
+        if self.index is not None:
+            self.index.drop_dataset(ds_id)
+
+    def gc_datasets(self) -> List[str]:
+        """Drops every dataset no op reads or writes. Returns their ids."""
+        if self.index is not None:
+            # The index already knows every live edge; no need to rescan ops
+            is_active = self.index.is_active
+        else:
+            active = {ds_id for op in self for ds_id in (*op.inputs, *op.outputs)}
+            is_active = active.__contains__
+        dropped = [ds.id for ds in self._datasets if not is_active(ds.id)]
+        if dropped:
+            gone = set(dropped)
+            self._datasets = [ds for ds in self._datasets if ds.id not in gone]
+            self._datasets_owned = True
+            if self.index is not None:
+                for ds_id in dropped:
+                    self.index.drop_dataset(ds_id)
+            self.changed = True
+        return dropped
+
+    # --- Internals ---
+
+    def _slot(self, op_id: str) -> int:
+        slot = self._slots.get(op_id)
+        if slot is None:
+            raise ValueError(f"Unknown operation '{op_id}'")
+        return slot
+
+    def _own_ops(self):
+        if not self._ops_owned:
+            self._ops = list(self._ops) # Copy-on-write
+            self._ops_owned = True
+
+    def _own_datasets(self):
+        if not self._datasets_owned:
+            self._datasets = list(self._datasets)
+            self._datasets_owned = True
+
+    def _compact(self):
+        self._ops = [op for op in self._ops if op is not None]
+        self._slots = {op.id: i for i, op in enumerate(self._ops)}
+        self._removed = 0
+
+    def _require_index(self) -> PipelineIndex:
+        if self.index is None:
+            self.index = PipelineIndex(make_pipeline(metadata=self.pipeline.metadata, datasets=self._datasets, operations=list(self)))
+        return self.index
@@ -0,0 +1,175 @@
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Pattern, Union
+import yaml
+from etl_ir.types import OpType
+
+# The built-in behaviour of SemanticPromoter, in the config file's own format
+DEFAULT_RULES: Dict[str, Any] = {
+    "noise": ["DO", "END", "FORMATS", "LIST", "STRING", "EXECUTE"],
+    "rules": [
+        {"match": "SORT", "type": "sort_rows",
+         "parameters": {"keys": {"from": ["args", "raw_content"], "default": "unknown"}}},
+        {"match": "SELECT IF|FILTER|^IF$", "type": "filter_rows",
+         "parameters": {"condition": {"from": ["args", "raw_content"], "default": "unknown"}}},
+    ],
+}
+
+# What dispatch() returns for a noise command
+DROP = "drop"
+
+@dataclass
+class ParameterMapping:
+    """
+    Where one parameter of the promoted op comes from.
+    sources: the first non-empty of these wins: a parameter of the generic op
+             (command, args, raw_content...) or a named group of the rule's `args` pattern
+    default: used when every source is empty
+    split:   turn the value into a list of names (split on commas/whitespace)
+    findall: regex: the value becomes the list of its matches in the source
+             (group 1 when it has a group), e.g. every '/name = FUNC(x)'
+    """
+    sources: List[str]
+    default: Any = None
+    split: bool = False
+    findall: Optional[Pattern] = None
+
+    @classmethod
+    def from_dict(cls, data: Union[str, List[str], Dict[str, Any]]) -> "ParameterMapping":
+        if isinstance(data, str): # Shorthand: one source
+            return cls(sources=[data])
+        if isinstance(data, list):
+            return cls(sources=list(data))
+        sources = data.get("from", [])
+        return cls(
+            sources=[sources] if isinstance(sources, str) else list(sources),
+            default=data.get("default"),
+            split=bool(data.get("split", False)),
+            findall=_compile(data["findall"], data["findall"]) if data.get("findall") else None,
+        )
+
+    def value(self, values: Dict[str, Any]) -> Any:
+        for source in self.sources:
+            value = values.get(source)
+            if value and self.findall is not None and isinstance(value, str):
+                value = [m.group(1) if m.groups() else m.group(0) for m in self.findall.finditer(value)]
+            if value:
+                return re.split(r"[\s,]+", value.strip()) if self.split and isinstance(value, str) else value
+        return self.default
+
+
+@dataclass
+class PromotionRule:
+    """
+    One command pattern -> semantic op.
+    match:      regex searched in the upper-cased command (anchor with ^...$ for an exact match)
+    type:       the OpType the op becomes
+    parameters: name -> ParameterMapping
+    args:       optional regex on the 'args' parameter; its named groups become sources
+    """
+    match: str
+    type: OpType
+    parameters: Dict[str, ParameterMapping] = field(default_factory=dict)
+    args: Optional[Pattern] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PromotionRule":
+        if not data.get("match") or not data.get("type"):
+            raise ValueError(f"Promotion rule needs 'match' and 'type': {data}")
+        try:
+            op_type = OpType(str(data["type"]).lower())
+        except ValueError:
+            raise ValueError(f"Unknown op type '{data['type']}' in promotion rule for '{data['match']}'") from None
+        return cls(
+            match=data["match"],
+            type=op_type,
+            parameters={name: ParameterMapping.from_dict(spec) for name, spec in (data.get("parameters") or {}).items()},
+            args=_compile(data["args"], data["match"]) if data.get("args") else None,
+        )
+
+    def parameters_for(self, parameters: Dict[str, Any]) -> Dict[str, Any]:
+        values = parameters
+        if self.args is not None:
+            found = self.args.search(str(parameters.get("args", "")))
+            if found:
+                values = {**parameters, **{k: v for k, v in found.groupdict().items() if v is not None}}
+        return {name: mapping.value(values) for name, mapping in self.parameters.items()}
+
+
+class PromotionRules:
+    """
+    Promotion Rule Engine: What SemanticPromoter drops or promotes, as data.
+    1. Loaded from a YAML/JSON file ('noise' command words + ordered 'rules'),
+       or DEFAULT_RULES.
+    2. Compiled once into a single regex: one anchored alternation, noise
+       first and then every rule in file order, so one match() call finds the
+       first rule that applies, however many rules there are.
+    3. Dispatch results are memoized per command (traces repeat a handful of commands).
+    """
+
+    MAX_CACHED_COMMANDS = 10_000
+
+    def __init__(self, noise: List[str], rules: List[PromotionRule]):
+        self.noise = [word.upper() for word in noise]
+        self.rules = rules
+        self._cache: Dict[str, Union[str, PromotionRule, None]] = {}
+
+        # Each alternative only looks ahead, so all of them start at position 0 and
+        # the regex engine tries them in order: lastgroup names the first rule that matched
+        branches = []
+        if self.noise:
+            words = "|".join(re.escape(word) for word in self.noise)
+            branches.append(f"(?P<noise>(?:{words})(?:\\s|$))") # The command's first word, or the whole command
+        for i, rule in enumerate(rules):
+            _compile(rule.match, rule.match) # Reports a bad pattern by its rule
+            branches.append(f"(?P<rule_{i}>(?=.*?(?:{rule.match})))")
+        try:
+            self._dispatch = re.compile("|".join(branches) or "(?!)", re.DOTALL)
+        except re.error as e: # e.g. two rules defining the same group name
+            raise ValueError(f"Promotion rules do not combine: {e}") from None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PromotionRules":
+        return cls(
+            noise=[str(word) for word in data.get("noise", [])],
+            rules=[PromotionRule.from_dict(rule) for rule in data.get("rules", [])],
+        )
+
+    @classmethod
+    def from_file(cls, path: Union[str, Path]) -> "PromotionRules":
+        with open(path, "r", encoding="utf-8") as f:
+            data = yaml.safe_load(f) or {} # JSON is valid YAML
+        if not isinstance(data, dict):
+            raise ValueError(f"Promotion rules in {path} must be a mapping with 'noise' and 'rules'")
+        return cls.from_dict(data)
+
+    @classmethod
+    @lru_cache(maxsize=None)
+    def default(cls) -> "PromotionRules":
+        """Compiled once and shared by every promoter."""
+        return cls.from_dict(DEFAULT_RULES)
+
+    def dispatch(self, command: str) -> Union[str, PromotionRule, None]:
+        """DROP for noise, the first matching rule, or None (left generic). `command` is upper-cased."""
+        if command in self._cache:
+            return self._cache[command]
+        found = self._dispatch.match(command)
+        if found is None:
+            result = None
+        elif found.lastgroup == "noise":
+            result = DROP
+        else:
+            result = self.rules[int(found.lastgroup[len("rule_"):])]
+        if len(self._cache) >= self.MAX_CACHED_COMMANDS:
+            self._cache.clear()
+        self._cache[command] = result
+        return result
+
+
+def _compile(pattern: str, rule: str) -> Pattern:
+    try:
+        return re.compile(pattern)
+    except re.error as e:
+        raise ValueError(f"Invalid pattern in promotion rule for '{rule}': {e}") from None
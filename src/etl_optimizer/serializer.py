@@ -0,0 +1,174 @@
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterator, TextIO, Tuple, Union
+from yaml.events import (
+    StreamStartEvent, StreamEndEvent, DocumentStartEvent, DocumentEndEvent,
+    ScalarEvent, SequenceStartEvent, SequenceEndEvent, MappingStartEvent, MappingEndEvent
+)
+from yaml.nodes import Node, ScalarNode, SequenceNode, MappingNode
+from pydantic import BaseModel
+from etl_ir.model import Pipeline
+
+from yaml import SafeDumper
+try:
+    from yaml import CSafeDumper as _FastDumper
+except ImportError: # PyYAML built without libyaml
+    _FastDumper = SafeDumper
+
+try:
+    import orjson
+except ImportError: # Optional: the stdlib writes the same bytes, only slower
+    orjson = None
+
+STR_TAG = "tag:yaml.org,2002:str"
+MAP_TAG = "tag:yaml.org,2002:map"
+SEQ_TAG = "tag:yaml.org,2002:seq"
+
+JSON_SUFFIXES = {".json"}
+
+class PipelineSerializer:
+    """
+    IR Output: Streams an optimized Pipeline to YAML or JSON, one record at a time.
+    1. Dumps each dataset/operation on its own (model_dump(mode='json')), so the
+       whole-document dict tree is never built.
+    2. YAML: feeds events straight to the emitter, without building nodes.
+       By default the libyaml emitter (CSafeDumper): same document as yaml.dump,
+       and the same bytes except where libyaml styles a scalar differently:
+       an empty key is written '': rather than as an explicit '? ' key, and a
+       long double-quoted non-ASCII string is folded at other points.
+       exact=True uses the pure-Python emitter, which yaml.dump also uses:
+       bytes then match yaml.dump(pipeline.model_dump(mode='json', exclude_none=True), sort_keys=False).
+    3. JSON: orjson when installed, else the stdlib; one record per line.
+    """
+
+    # Bounds the per-string resolver cache (values repeat a lot: names, types, ids)
+    MAX_CACHED_STRINGS = 100_000
+
+    def __init__(self, pipeline: Pipeline, exact: bool = False):
+        self.pipeline = pipeline
+        self.exact = exact
+        self._plain: Dict[str, bool] = {} # str -> would it read back as a str untagged?
+
+    def write(self, path: Union[str, Path]) -> Path:
+        """Picks the format from the file extension: .json is JSON, anything else YAML (as before)."""
+        path = Path(path)
+        with open(path, "w", encoding="utf-8") as f:
+            if path.suffix.lower() in JSON_SUFFIXES:
+                self.dump_json(f)
+            else:
+                self.dump_yaml(f)
+        return path
+
+    # --- YAML ---
+
+    def dump_yaml(self, fh: TextIO):
+        # Same settings yaml.dump uses, so the emitter makes the same choices
+        dumper_cls = SafeDumper if self.exact else _FastDumper
+        dumper = dumper_cls(fh, default_flow_style=False, sort_keys=False)
+        dumper.emit(StreamStartEvent())
+        dumper.emit(DocumentStartEvent(explicit=False))
+        dumper.emit(MappingStartEvent(None, MAP_TAG, True, flow_style=False))
+        for name, value, is_stream in self._fields():
+            self._emit(dumper, name)
+            if not is_stream:
+                self._emit(dumper, value)
+                continue
+            dumper.emit(SequenceStartEvent(None, SEQ_TAG, True, flow_style=False))
+            for record in value:
+                self._emit(dumper, record)
+            dumper.emit(SequenceEndEvent())
+        dumper.emit(MappingEndEvent())
+        dumper.emit(DocumentEndEvent(explicit=False))
+        dumper.emit(StreamEndEvent())
+        dumper.dispose()
+
+    def _emit(self, dumper, data: Any):
+        """
+        Events for plain JSON data, as SafeRepresenter + Serializer would make
+        them, without building nodes. Other scalars (numbers, bools, null) go
+        through the representer for its exact spelling.
+        """
+        if isinstance(data, str):
+            plain = self._plain.get(data)
+            if plain is None:
+                plain = dumper.resolve(ScalarNode, data, (True, False)) == STR_TAG
+                if len(self._plain) >= self.MAX_CACHED_STRINGS:
+                    self._plain.clear()
+                self._plain[data] = plain
+            dumper.emit(ScalarEvent(None, STR_TAG, (plain, True), data))
+        elif isinstance(data, dict):
+            dumper.emit(MappingStartEvent(None, MAP_TAG, True, flow_style=False))
+            for key, value in data.items():
+                self._emit(dumper, key)
+                self._emit(dumper, value)
+            dumper.emit(MappingEndEvent())
+        elif isinstance(data, list):
+            dumper.emit(SequenceStartEvent(None, SEQ_TAG, True, flow_style=False))
+            for item in data:
+                self._emit(dumper, item)
+            dumper.emit(SequenceEndEvent())
+        else:
+            self._emit_node(dumper, self._represent(dumper, data))
+
+    def _represent(self, dumper, data: Any) -> Node:
+        node = dumper.represent_data(data)
+        dumper.represented_objects = {} # Records are independent: no anchors across them
+        return node
+
+    def _emit_node(self, dumper, node: Node):
+        """The events yaml's Serializer would emit for this node (minus anchors)."""
+        if isinstance(node, ScalarNode):
+            detected = dumper.resolve(ScalarNode, node.value, (True, False))
+            default = dumper.resolve(ScalarNode, node.value, (False, True))
+            implicit = (node.tag == detected, node.tag == default)
+            dumper.emit(ScalarEvent(None, node.tag, implicit, node.value, style=node.style))
+        elif isinstance(node, SequenceNode):
+            implicit = node.tag == dumper.resolve(SequenceNode, node.value, True)
+            dumper.emit(SequenceStartEvent(None, node.tag, implicit, flow_style=node.flow_style))
+            for item in node.value:
+                self._emit_node(dumper, item)
+            dumper.emit(SequenceEndEvent())
+        elif isinstance(node, MappingNode):
+            implicit = node.tag == dumper.resolve(MappingNode, node.value, True)
+            dumper.emit(MappingStartEvent(None, node.tag, implicit, flow_style=node.flow_style))
+            for key, value in node.value:
+                self._emit_node(dumper, key)
+                self._emit_node(dumper, value)
+            dumper.emit(MappingEndEvent())
+
+    # --- JSON ---
+
+    def dump_json(self, fh: TextIO):
+        fh.write("{")
+        for i, (name, value, is_stream) in enumerate(self._fields()):
+            fh.write(f'{"," if i else ""}\n  {_json(name)}: ')
+            if not is_stream:
+                fh.write(_json(value))
+                continue
+            fh.write("[")
+            for j, record in enumerate(value):
+                fh.write(f'{"," if j else ""}\n    {_json(record)}')
+            fh.write("\n  ]")
+        fh.write("\n}\n")
+
+    # --- Records ---
+
+    def _fields(self) -> Iterator[Tuple[str, Any, bool]]:
+        """(name, value, is_stream) per Pipeline field, in model order; lists of models are lazy."""
+        for name in type(self.pipeline).model_fields:
+            value = getattr(self.pipeline, name)
+            if value is None:
+                continue # exclude_none
+            if isinstance(value, list) and value and all(isinstance(item, BaseModel) for item in value):
+                yield name, (item.model_dump(mode="json", exclude_none=True) for item in value), True
+            else:
+                yield name, self.pipeline.model_dump(mode="json", exclude_none=True, include={name})[name], False
+
+
+def _json(data: Any) -> str:
+    if orjson is not None:
+        return orjson.dumps(data).decode("utf-8")
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+def write_pipeline(pipeline: Pipeline, path: Union[str, Path], exact: bool = False) -> Path:
+    return PipelineSerializer(pipeline, exact=exact).write(path)
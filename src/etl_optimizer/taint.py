@@ -0,0 +1,301 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple
+from etl_ir.model import Pipeline, Operation
+from etl_ir.types import OpType
+from .expressions import Call, UnaryOp, BinaryOp, Variable, parse_expression
+from .index import PipelineIndex
+
+# Taint of one dataset: {COLUMN: bitset of tags}. Untainted columns are absent.
+Taint = Dict[str, int]
+
+@dataclass
+class TaintPolicy:
+    """
+    What the PII check enforces.
+    sensitive:      tag -> column names that carry it where they enter the pipeline
+    public_outputs: dataset ids or SAVE_BINARY filenames that must stay clean
+    sanitizers:     functions whose result no longer carries its arguments' tags
+    """
+    sensitive: Dict[str, List[str]] = field(default_factory=dict)
+    public_outputs: Set[str] = field(default_factory=set)
+    sanitizers: Set[str] = field(default_factory=set)
+    aggregation_sanitizes: bool = False # Treat AGGREGATE results as anonymized
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TaintPolicy":
+        sensitive = data.get("sensitive", {})
+        if isinstance(sensitive, list): # Bare column list: each column is its own tag
+            sensitive = {name: [name] for name in sensitive}
+        return cls(
+            sensitive={tag: [columns] if isinstance(columns, str) else list(columns) for tag, columns in sensitive.items()},
+            public_outputs=set(data.get("public_outputs", [])),
+            sanitizers={name.upper() for name in data.get("sanitizers", [])},
+            aggregation_sanitizes=bool(data.get("aggregation_sanitizes", False)),
+        )
+
+
+@dataclass(frozen=True)
+class Violation:
+    tag: str
+    column: str
+    dataset: str  # Public dataset the column reaches
+    sink: str     # Op that writes it
+
+
+class TaintAnalyzer:
+    """
+    PII Taint Flow: Forward dataflow over the op graph, one bit per sensitive tag.
+    1. Sources (LOAD_CSV outputs, datasets nothing produces) taint every column
+       the policy tags.
+    2. One sweep in op order (assumed topological) ORs the bits of every column
+       an expression reads into its target. Reads under a sanitizer call don't count.
+    3. A tagged column in a public output is a violation. explain() walks one
+       offending path backwards, only when asked.
+
+    Only tainted columns are stored and pass-through ops share their input's
+    map, so the sweep is linear in ops plus tainted columns, for any number of tags.
+    """
+
+    PASS_THROUGH_TYPES = {OpType.FILTER_ROWS, OpType.SORT_ROWS, OpType.MATERIALIZE, OpType.SAVE_BINARY, OpType.JOIN}
+
+    def __init__(self, pipeline: Pipeline, policy: TaintPolicy, index: Optional[PipelineIndex] = None):
+        self.pipeline = pipeline
+        self.policy = policy
+        self.index = index or PipelineIndex(pipeline)
+        self.tags: List[str] = list(policy.sensitive)
+        self._bits_of_column: Dict[str, int] = {}
+        for bit, tag in enumerate(self.tags):
+            for column in policy.sensitive[tag]:
+                self._bits_of_column[column.upper()] = self._bits_of_column.get(column.upper(), 0) | (1 << bit)
+        self._sanitizers: FrozenSet[str] = frozenset(name.upper() for name in policy.sanitizers)
+        self.taint: Dict[str, Taint] = {}
+        self.violations: List[Violation] = []
+
+    def run(self) -> List[Violation]:
+        self.taint = {}
+        for op in self.pipeline.operations:
+            self._visit(op)
+
+        self.violations = []
+        for ds_id, sink in self._public_datasets():
+            for column, bits in self.taint.get(ds_id, {}).items():
+                for tag in self._decode(bits):
+                    self.violations.append(Violation(tag, column, ds_id, sink))
+        return self.violations
+
+    def tags_of(self, ds_id: str, column: str) -> List[str]:
+        return self._decode(self.taint.get(ds_id, {}).get(column.upper(), 0))
+
+    # --- Forward sweep ---
+
+    def _visit(self, op: Operation):
+        inputs = [self._taint_of(ds_id) for ds_id in op.inputs]
+
+        if op.type == OpType.LOAD_CSV:
+            for ds_id in op.outputs:
+                self.taint[ds_id] = self._source_taint(ds_id)
+            return
+        merged = self._merge(inputs)
+        outs: Dict[str, Taint] = {} # Per output, where they differ (fused batches)
+        if op.type in self.PASS_THROUGH_TYPES:
+            out = merged
+        elif op.type in (OpType.COMPUTE_COLUMNS, OpType.BATCH_COMPUTE):
+            # Every entry reads the batch's one namespace, but only lands in the
+            # output it is tagged with (untagged: all of them; CSE temps: none)
+            out = merged
+            outs = {ds_id: merged for ds_id in op.outputs}
+            for entry in self._entries(op):
+                target = entry.get("target")
+                if not target:
+                    continue
+                bits = self._expression_bits(entry.get("expression"), out)
+                out = self._set_bits(out, merged, target.upper(), bits)
+                if entry.get("temporary"):
+                    continue
+                for ds_id in op.outputs:
+                    if self._writes_to(op, entry, ds_id):
+                        outs[ds_id] = self._set_bits(outs[ds_id], merged, target.upper(), bits)
+        elif op.type == OpType.AGGREGATE:
+            out = {name: merged[name] for name in self._names(op.parameters.get("break")) if name in merged}
+            if not self.policy.aggregation_sanitizes:
+                for spec in op.parameters.get("aggregations", []):
+                    target, _, expression = str(spec).partition("=")
+                    bits = self._expression_bits(expression, merged)
+                    if target.strip() and bits:
+                        out[target.strip().upper()] = bits
+        else:
+            # Opaque (GENERIC_TRANSFORM, ...): anything it declares may carry any input tag
+            out = merged
+            everything = self._or(merged.values())
+            extras = self._opaque_extras(op) - merged.keys()
+            if everything and extras:
+                out = {**merged, **{name: everything for name in extras}}
+
+        for ds_id in op.outputs:
+            taint = outs.get(ds_id, out)
+            if ds_id in self.taint: # A second writer: union both
+                taint = self._merge([self.taint[ds_id], taint])
+            self.taint[ds_id] = taint
+
+    def _set_bits(self, taint: Taint, shared: Taint, column: str, bits: int) -> Taint:
+        if bits == taint.get(column, 0):
+            return taint
+        taint = dict(taint) if taint is shared else taint # Copy on first change
+        if bits:
+            taint[column] = bits
+        else:
+            taint.pop(column, None)
+        return taint
+
+    def _taint_of(self, ds_id: str) -> Taint:
+        if ds_id not in self.taint:
+            self.taint[ds_id] = self._source_taint(ds_id) # External input
+        return self.taint[ds_id]
+
+    def _source_taint(self, ds_id: str) -> Taint:
+        taint = {}
+        for col in self._dataset_columns(ds_id):
+            bits = self._bits_of_column.get(col.name.upper(), 0)
+            if bits:
+                taint[col.name.upper()] = bits
+        return taint
+
+    def _merge(self, inputs: List[Taint]) -> Taint:
+        inputs = [taint for taint in inputs if taint]
+        if len(inputs) <= 1:
+            return inputs[0] if inputs else {} # Shared, never mutated
+        merged: Taint = {}
+        for taint in inputs:
+            for name, bits in taint.items():
+                merged[name] = merged.get(name, 0) | bits
+        return merged
+
+    def _expression_bits(self, text, env: Taint) -> int:
+        if not env or (text is not None and str(text).strip() == ""):
+            return 0
+        reads = self._unsanitized_reads(text)
+        if reads is None:
+            return self._or(env.values()) # Cannot tell what it reads: everything
+        return self._or(env.get(name, 0) for name in reads)
+
+    def _unsanitized_reads(self, text) -> Optional[List[str]]:
+        if text is None:
+            return None # No expression (e.g. a promoted RECODE): it may read anything
+        try:
+            expr = parse_expression(str(text))
+        except ValueError:
+            return None
+        reads, stack = [], [expr]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, Variable):
+                reads.append(node.name.upper())
+            elif isinstance(node, Call):
+                if node.name not in self._sanitizers:
+                    stack.extend(node.args)
+            elif isinstance(node, UnaryOp):
+                stack.append(node.operand)
+            elif isinstance(node, BinaryOp):
+                stack.extend((node.left, node.right))
+        return reads
+
+    # --- Reporting ---
+
+    def explain(self, violation: Violation) -> List[str]:
+        """
+        One path from a source column to the violation, as 'dataset.COLUMN'
+        steps with the op in between: ['src.DOB', 'op_031', 'ds_026.DOB_NUM', ...].
+        """
+        bit = 1 << self.tags.index(violation.tag)
+        steps = [f"{violation.dataset}.{violation.column}"]
+        ds_id, column = violation.dataset, violation.column.upper()
+        seen = set()
+        while (ds_id, column) not in seen:
+            seen.add((ds_id, column))
+            step = self._tainted_feed(ds_id, column, bit)
+            if step is None:
+                break # Reached a source
+            op_id, ds_id, column = step
+            steps.extend([op_id, f"{ds_id}.{column}"])
+        steps.reverse()
+        return steps
+
+    def _tainted_feed(self, ds_id: str, column: str, bit: int) -> Optional[Tuple[str, str, str]]:
+        """(op, input dataset, input column) that brought `bit` into ds_id.column."""
+        for op_id in self.index.producers_of(ds_id):
+            op = self.index.op(op_id)
+            if op.type == OpType.LOAD_CSV:
+                continue
+            for inp, name in self._feeds(op, column, ds_id):
+                if self.taint.get(inp, {}).get(name, 0) & bit:
+                    return op.id, inp, name
+        return None
+
+    def _feeds(self, op: Operation, column: str, ds_id: str) -> List[Tuple[str, str]]:
+        """The input columns an op reads to produce `column` of its output ds_id (same rules as the sweep)."""
+        env = {name: [(inp, name)] for inp in op.inputs for name in self.taint.get(inp, {})}
+        if op.type in (OpType.COMPUTE_COLUMNS, OpType.BATCH_COMPUTE):
+            written = dict(env) # What lands in ds_id
+            for entry in self._entries(op):
+                target = entry.get("target")
+                if target:
+                    reads = self._unsanitized_reads(entry.get("expression"))
+                    env[target.upper()] = [ref for name in (reads if reads is not None else list(env)) for ref in env.get(name, [])]
+                    if not entry.get("temporary") and self._writes_to(op, entry, ds_id):
+                        written[target.upper()] = env[target.upper()]
+            return written.get(column, [])
+        elif op.type == OpType.AGGREGATE:
+            for spec in op.parameters.get("aggregations", []):
+                target, _, expression = str(spec).partition("=")
+                if target.strip().upper() == column:
+                    reads = self._unsanitized_reads(expression)
+                    return [ref for name in (reads if reads is not None else list(env)) for ref in env.get(name, [])]
+        elif op.type not in self.PASS_THROUGH_TYPES and column in self._opaque_extras(op):
+            return [ref for refs in env.values() for ref in refs]
+        return env.get(column, [])
+
+    def _public_datasets(self) -> List[Tuple[str, str]]:
+        """(dataset, writing op) for every public output."""
+        public = self.policy.public_outputs
+        found = []
+        for op in self.pipeline.operations:
+            for ds_id in op.outputs:
+                if ds_id in public or (op.type == OpType.SAVE_BINARY and op.parameters.get("filename") in public):
+                    found.append((ds_id, op.id))
+        return found
+
+    # --- Helpers ---
+
+    def _entries(self, op: Operation) -> List[Dict[str, Any]]:
+        return op.parameters.get("computes", []) if op.type == OpType.BATCH_COMPUTE else [op.parameters]
+
+    def _writes_to(self, op: Operation, entry: Dict[str, Any], ds_id: str) -> bool:
+        """HorizontalFuser tags each entry with its output; untagged entries write every output."""
+        tag = entry.get("output")
+        return not tag or tag == ds_id or tag not in op.outputs
+
+    def _opaque_extras(self, op: Operation) -> Set[str]:
+        """Columns an opaque op declares that none of its inputs has."""
+        inherited = {c.name.upper() for ds_id in op.inputs for c in self._dataset_columns(ds_id)}
+        inherited.update(name for ds_id in op.inputs for name in self.taint.get(ds_id, {}))
+        return {c.name.upper() for ds_id in op.outputs for c in self._dataset_columns(ds_id)} - inherited
+
+    def _dataset_columns(self, ds_id: str):
+        ds = self.index.dataset(ds_id)
+        return ds.columns if ds is not None else []
+
+    def _decode(self, bits: int) -> List[str]:
+        return [tag for i, tag in enumerate(self.tags) if bits >> i & 1]
+
+    def _or(self, values) -> int:
+        bits = 0
+        for value in values:
+            bits |= value
+        return bits
+
+    def _names(self, value) -> List[str]:
+        if not value:
+            return []
+        if isinstance(value, str):
+            value = value.split()
+        return [str(v).upper() for v in value]
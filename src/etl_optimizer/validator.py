@@ -1,25 +1,33 @@
+import os
 import networkx as nx
-from typing import List
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Set, Optional, Tuple
 from etl_ir.model import Pipeline, Operation
 from etl_ir.types import OpType
-import re
+from .expressions import parse_expression, referenced_columns
+from .index import PipelineIndex
+from .taint import TaintAnalyzer, TaintPolicy
 
 class SecurityValidator:
     """
     Validation Pass: Performs stateful checks on the pipeline.
     1. Ghost Column Detection (Use-Before-Def)
     2. Type Safety (Future)
-    3. PII Leakage (Future)
+    3. PII Leakage (given a TaintPolicy; see etl_optimizer.taint)
     """
     
-    # SPSS Keywords to ignore when checking for variable names
-    KNOWN_FUNCTIONS = {
-        "NUMBER", "DATE", "MDY", "TRUNC", "MOD", "SUM", "MEAN", "MAX", "MIN", 
-        "SYSMIS", "AND", "OR", "NOT", "IF", "THRU", "LOWEST", "HIGHEST"
-    }
-    def __init__(self, pipeline: Pipeline):
+    # Upper bound on the number of nodes reported for a sample cycle
+    MAX_CYCLE_SAMPLE = 12
+    # validate_partitioned(): ops per worker task, and the size below which a pool isn't worth it
+    MAX_PARTITION_OPS = 5000
+    PARALLEL_MIN_OPS = 20000
+
+    def __init__(self, pipeline: Pipeline, index: Optional[PipelineIndex] = None, policy: Optional[TaintPolicy] = None):
         self.pipeline = pipeline
-        self.ds_map = {ds.id: ds for ds in pipeline.datasets}
+        self.index = index or PipelineIndex(pipeline)
+        self.policy = policy
+        self.ds_map = self.index.datasets
         self.graph = self._build_graph()
 
     def _build_graph(self) -> nx.DiGraph:
@@ -30,51 +38,153 @@ class SecurityValidator:
         """
         G = nx.DiGraph()
         
-        for op in self.pipeline.operations:
-            G.add_node(op.id, type="operation")
-            
-            for inp in op.inputs:
-                G.add_edge(inp, op.id) # Dataset -> Op
-            
-            for out in op.outputs:
-                G.add_edge(op.id, out) # Op -> Dataset
+        for op_id in self.index.ops:
+            G.add_node(op_id, type="operation")
+        
+        # Edges come straight from the index's adjacency lists
+        for ds_id, op_ids in self.index.consumers.items():
+            G.add_edges_from((ds_id, op_id) for op_id in op_ids) # Dataset -> Op
+        for ds_id, op_ids in self.index.producers.items():
+            G.add_edges_from((op_id, ds_id) for op_id in op_ids) # Op -> Dataset
                 
         return G
 
     def validate_topology(self) -> List[str]:
-        errors = []
-        
+        return self._cycle_errors() + self._island_errors() + self._missing_input_errors()
+
+    def _cycle_errors(self) -> List[str]:
         # 1. Check for Cycles
-        try:
-            cycles = list(nx.simple_cycles(self.graph))
-            if cycles:
-                errors.append(f"Cycle detected in pipeline: {cycles}")
-        except:
-            pass # NetworkX recursive error sometimes happens on huge graphs
-            
+        # Every cycle lives inside a strongly connected component, so one
+        # O(V+E) SCC sweep finds them all without enumerating each cycle.
+        return _cycle_errors(self.graph, self.MAX_CYCLE_SAMPLE)
+
+    def _island_errors(self, island_count: Optional[int] = None) -> List[str]:
         # 2. Check for Disconnected Components (Islands)
-        # Convert to undirected to find islands
-        undirected = self.graph.to_undirected()
-        components = list(nx.connected_components(undirected))
-        if len(components) > 1:
-            errors.append(f"Disconnected component detected. Found {len(components)} islands.")
+        # Weak connectivity == islands, without copying the graph to undirected
+        if island_count is None:
+            island_count = nx.number_weakly_connected_components(self.graph)
+        if island_count > 1:
+            return [f"Disconnected component detected. Found {island_count} islands."]
+        return []
+
+    def _missing_input_errors(self) -> List[str]:
+        return [error for errors in self._missing_inputs_by_op().values() for error in errors]
 
+    def _missing_inputs_by_op(self) -> Dict[str, List[str]]:
         # 3. Check for Broken Bridges (Missing Inputs)
         # Any operation input that isn't in the graph is a missing link
+        errors = {}
         for op in self.pipeline.operations:
-            for inp in op.inputs:
-                if inp not in self.ds_map:
-                     errors.append(f"Missing input dataset '{inp}' for operation '{op.id}'")
-        
+            missing = [inp for inp in op.inputs if inp not in self.ds_map]
+            if missing:
+                errors[op.id] = [f"Missing input dataset '{inp}' for operation '{op.id}'" for inp in missing]
         return errors
 
+    # --- Partitioned Validation ---
+
+    def validate_partitioned(self, workers: Optional[int] = None) -> Tuple[List[str], List[str]]:
+        """
+        Runs validate_topology() and run() per weakly connected component.
+        1. Components share no edges, so cycle, missing-input and ghost-column
+           checks never need to look across one; the island count is the
+           number of components.
+        2. Small components are packed together; a component above
+           MAX_PARTITION_OPS is sliced for the per-op checks, and its cycle
+           check is a task of its own over the whole component.
+        3. Tasks carry plain data (edge lists, op tuples, column names), not
+           Pipeline models, and go to a process pool (below PARALLEL_MIN_OPS
+           they run in-process); errors are merged back into pipeline order.
+        Returns (topology_errors, logic_errors).
+        """
+        workers = workers or os.cpu_count() or 1
+        position = {op.id: i for i, op in enumerate(self.pipeline.operations)}
+        components = sorted(
+            ((sorted(c & self.index.ops.keys(), key=position.__getitem__), c) for c in nx.weakly_connected_components(self.graph)),
+            key=lambda component: position[component[0][0]]
+        )
+
+        tasks: List[Tuple[list, dict, Optional[list]]] = [] # (op tuples, columns per dataset, edges or None)
+        packed_ops: List[str] = []
+        packed_nodes: Set[str] = set()
+        for op_ids, nodes in components:
+            if len(op_ids) > self.MAX_PARTITION_OPS:
+                tasks.append(([], {}, self._edges(nodes))) # Cycle check over the whole component
+                for start in range(0, len(op_ids), self.MAX_PARTITION_OPS):
+                    tasks.append((*self._op_slice(op_ids[start:start + self.MAX_PARTITION_OPS]), None))
+                continue
+            if packed_ops and len(packed_ops) + len(op_ids) > self.MAX_PARTITION_OPS:
+                tasks.append((*self._op_slice(packed_ops), self._edges(packed_nodes)))
+                packed_ops, packed_nodes = [], set()
+            packed_ops.extend(op_ids)
+            packed_nodes |= nodes
+        if packed_ops:
+            tasks.append((*self._op_slice(packed_ops), self._edges(packed_nodes)))
+
+        if workers > 1 and len(tasks) > 1 and len(self.pipeline.operations) >= self.PARALLEL_MIN_OPS:
+            with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+                results = list(pool.map(_validate_partition, *zip(*tasks), [self.MAX_CYCLE_SAMPLE] * len(tasks)))
+        else:
+            results = [_validate_partition(*task, self.MAX_CYCLE_SAMPLE) for task in tasks]
+
+        cycle_errors: List[str] = []
+        missing_by_op: Dict[str, List[str]] = {}
+        errors_by_op: Dict[str, List[str]] = {}
+        for partition_cycles, partition_missing, partition_errors in results:
+            cycle_errors.extend(partition_cycles)
+            missing_by_op.update(partition_missing)
+            errors_by_op.update(partition_errors)
+
+        missing = [e for op in self.pipeline.operations for e in missing_by_op.get(op.id, [])]
+        logic = [e for op in self.pipeline.operations for e in errors_by_op.get(op.id, [])]
+        return cycle_errors + self._island_errors(len(components)) + missing, logic
+
+    def _edges(self, nodes: Set[str]) -> List[Tuple[str, str]]:
+        """The component's edges, in graph order (so the sample cycle matches validate_topology)."""
+        return list(self.graph.subgraph(nodes).edges())
+
+    def _op_slice(self, op_ids: List[str]) -> Tuple[list, Dict[str, List[str]]]:
+        """(op_id, inputs, compute expression or None) per op, and the column names of the datasets they read."""
+        ops = []
+        columns: Dict[str, List[str]] = {}
+        for op_id in op_ids:
+            op = self.index.ops[op_id]
+            expression = op.parameters.get("expression", "") if op.type == OpType.COMPUTE_COLUMNS else None
+            ops.append((op.id, list(op.inputs), expression))
+            for ds_id in op.inputs:
+                ds = self.ds_map.get(ds_id)
+                if ds is not None and ds_id not in columns:
+                    columns[ds_id] = [col.name for col in ds.columns]
+        return ops, columns
+
+    def _find_cyclic_components(self) -> List[Set[str]]:
+        return _cyclic_components(self.graph)
+
+    def _sample_cycle(self, component: Set[str]) -> List[str]:
+        return _sample_cycle(self.graph, component, self.MAX_CYCLE_SAMPLE)
+
+    def validate_pii(self) -> List[str]:
+        """Sensitive columns reaching a public output, with one path each."""
+        if self.policy is None:
+            return []
+        analyzer = TaintAnalyzer(self.pipeline, self.policy, self.index)
+        return [
+            f"PII Leakage: Column '{v.column}' tagged '{v.tag}' reaches public output '{v.dataset}' "
+            f"(written by '{v.sink}'). Path: {' -> '.join(analyzer.explain(v))}"
+            for v in analyzer.run()
+        ]
 
     def run(self) -> List[str]:
-        errors = []
+        return [error for errors in self.run_by_op().values() for error in errors]
+
+    def run_by_op(self, op_ids: Optional[Set[str]] = None) -> Dict[str, List[str]]:
+        """Logic errors per operation, optionally only for the ops in `op_ids`."""
+        errors = {}
         
         for op in self.pipeline.operations:
+            if op_ids is not None and op.id not in op_ids:
+                continue
             if op.type == OpType.COMPUTE_COLUMNS:
-                errors.extend(self._validate_compute(op))
+                errors[op.id] = self._validate_compute(op)
             # Future: Add hooks for _validate_join, _validate_filter, etc.
             
         return errors
@@ -94,23 +204,114 @@ class SecurityValidator:
                 for col in ds.columns:
                     input_columns.add(col.name.upper()) # Case insensitive normalization
 
-        # 2. Extract Variables from Expression
-        # Regex to find words that look like variables
-        tokens = set(re.findall(r'[a-zA-Z_][a-zA-Z0-9_]*', expression))
-        
-        # 3. Check for Ghosts
-        for token in tokens:
-            upper_token = token.upper()
-            
-            # Skip numbers, keywords, and functions
-            if upper_token in self.KNOWN_FUNCTIONS:
-                continue
-            
-            # If it's not in inputs, it's a Ghost!
-            if upper_token not in input_columns:
-                errors.append(
-                    f"Ghost Column Detected: Operation '{op.id}' uses variable '{token}' "
-                    f"which does not exist in input datasets {op.inputs}."
-                )
-                
-        return errors
\ No newline at end of file
+        return _ghost_columns(op.id, op.inputs, expression, input_columns)
+
+
+def _ghost_columns(op_id: str, inputs: List[str], expression, input_columns: Set[str]) -> List[str]:
+    errors = []
+
+    # 2. Extract Variables from Expression
+    # The parsed AST is cached per text, and knows that function names,
+    # string literals and format specs (F8.0) are not columns
+    try:
+        columns = referenced_columns(parse_expression(str(expression)))
+    except ValueError as e:
+        return [f"Unparseable Expression: Operation '{op_id}': {e}"]
+
+    # 3. Check for Ghosts
+    for column in columns:
+        # If it's not in inputs, it's a Ghost!
+        if column.upper() not in input_columns:
+            errors.append(
+                f"Ghost Column Detected: Operation '{op_id}' uses variable '{column}' "
+                f"which does not exist in input datasets {inputs}."
+            )
+
+    return errors
+
+def _cycle_errors(graph: nx.DiGraph, max_sample: int) -> List[str]:
+    errors = []
+    for component in _cyclic_components(graph):
+        sample = _sample_cycle(graph, component, max_sample)
+        errors.append(
+            f"Cycle detected in pipeline: {len(component)} nodes are mutually reachable. "
+            f"Sample cycle: {' -> '.join(sample)}"
+        )
+    return errors
+
+def _cyclic_components(graph: nx.DiGraph) -> List[Set[str]]:
+    """
+    Returns the strongly connected components that contain a cycle.
+    NetworkX's SCC implementation is iterative, so huge traces cannot
+    blow the recursion limit.
+    """
+    cyclic = []
+    for component in nx.strongly_connected_components(graph):
+        if len(component) > 1:
+            cyclic.append(component)
+        else:
+            node = next(iter(component))
+            if graph.has_edge(node, node): # Self-loop
+                cyclic.append(component)
+    return cyclic
+
+def _sample_cycle(graph: nx.DiGraph, component: Set[str], max_len: int) -> List[str]:
+    """
+    Finds the shortest cycle through one node of the component (BFS, linear
+    in the component size) and truncates it to max_len nodes.
+    """
+    start = min(component) # Deterministic pick, independent of hash order
+    parents = {start: None}
+    queue = deque([start])
+    closing_node = None
+
+    while queue and closing_node is None:
+        node = queue.popleft()
+        for succ in graph.successors(node):
+            if succ == start:
+                closing_node = node
+                break
+            if succ in component and succ not in parents:
+                parents[succ] = node
+                queue.append(succ)
+
+    # Walk back from the node that closes the loop
+    path = []
+    node = closing_node
+    while node is not None:
+        path.append(node)
+        node = parents[node]
+    path.reverse()
+    path.append(start)
+
+    if len(path) > max_len:
+        path = path[:max_len] + ["..."]
+    return path
+
+def _validate_partition(ops: list, columns: Dict[str, List[str]], edges: Optional[List[Tuple[str, str]]], max_sample: int):
+    """
+    Worker entry point: (cycle errors, missing-input errors per op, logic errors per op).
+    Plain data in: (op_id, inputs, expression) per op, column names per dataset read,
+    and the partition's edges (None: its cycle check runs in another task).
+    """
+    cycles = []
+    if edges is not None:
+        graph = nx.DiGraph()
+        graph.add_edges_from(edges)
+        cycles = _cycle_errors(graph, max_sample)
+
+    upper = {ds_id: {name.upper() for name in names} for ds_id, names in columns.items()}
+    missing: Dict[str, List[str]] = {}
+    errors: Dict[str, List[str]] = {}
+    for op_id, inputs, expression in ops:
+        absent = [inp for inp in inputs if inp not in columns]
+        if absent:
+            missing[op_id] = [f"Missing input dataset '{inp}' for operation '{op_id}'" for inp in absent]
+        if expression is None:
+            continue # Not a compute: no logic checks yet (as in run_by_op)
+        if not expression:
+            errors[op_id] = []
+            continue
+        input_columns = set().union(*(upper.get(ds_id, set()) for ds_id in inputs))
+        errors[op_id] = _ghost_columns(op_id, inputs, expression, input_columns)
+    return cycles, missing, errors
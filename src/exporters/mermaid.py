@@ -1,3 +1,4 @@
+from typing import Dict, Iterator, List, Optional, Set, TextIO
 from etl_ir.model import Pipeline
 from etl_ir.types import OpType
 
@@ -5,41 +6,174 @@ class MermaidExporter:
     """
     Visualizes the Optimized Pipeline.
     Highlights BATCH nodes to show compression.
+    For big traces:
+    1. cluster_by="component" | "barrier" groups nodes into subgraphs, one per
+       connected component, or one per stage between JOIN/AGGREGATE/SAVE_BINARY barriers.
+    2. collapse_datasets=True drops intermediate dataset nodes; the dataset id
+       becomes the label of the producer -> consumer edge.
+    3. write() streams lines to a file handle instead of joining one big string.
+       The flat diagram keeps nothing; clusters and collapsing keep a few ids per node.
     """
-    
+
+    BARRIER_TYPES = {OpType.JOIN, OpType.AGGREGATE, OpType.SAVE_BINARY}
+    CLUSTER_MODES = ("component", "barrier")
+
     def __init__(self, pipeline: Pipeline):
         self.pipeline = pipeline
 
-    def generate(self) -> str:
-        lines = ["graph TD"]
-        
+    def generate(self, cluster_by: Optional[str] = None, collapse_datasets: bool = False) -> str:
+        return "\n".join(self.lines(cluster_by, collapse_datasets))
+
+    def write(self, fh: TextIO, cluster_by: Optional[str] = None, collapse_datasets: bool = False) -> int:
+        """Writes the diagram line by line. Returns the number of lines."""
+        count = 0
+        for line in self.lines(cluster_by, collapse_datasets):
+            fh.write(line)
+            fh.write("\n")
+            count += 1
+        return count
+
+    def lines(self, cluster_by: Optional[str] = None, collapse_datasets: bool = False) -> Iterator[str]:
+        if cluster_by is not None and cluster_by not in self.CLUSTER_MODES:
+            raise ValueError(f"Unknown cluster mode '{cluster_by}'. Expected one of {self.CLUSTER_MODES}")
+
+        yield "graph TD"
+
         # Styles
-        lines.append("    classDef dataset fill:#e1f5fe,stroke:#01579b,stroke-width:2px,rx:5,ry:5;")
-        lines.append("    classDef op fill:#fff9c4,stroke:#fbc02d,stroke-width:2px;")
-        lines.append("    classDef batch fill:#c8e6c9,stroke:#2e7d32,stroke-width:4px;") # Thick green border for batches
-        lines.append("    classDef barrier fill:#ffccbc,stroke:#d84315,stroke-width:2px;") # Red for Joins/Aggs
+        yield "    classDef dataset fill:#e1f5fe,stroke:#01579b,stroke-width:2px,rx:5,ry:5;"
+        yield "    classDef op fill:#fff9c4,stroke:#fbc02d,stroke-width:2px;"
+        yield "    classDef batch fill:#c8e6c9,stroke:#2e7d32,stroke-width:4px;" # Thick green border for batches
+        yield "    classDef barrier fill:#ffccbc,stroke:#d84315,stroke-width:2px;" # Red for Joins/Aggs
 
-        # Nodes
-        for ds in self.pipeline.datasets:
-            lines.append(f'    {ds.id}[("{ds.id}")]:::dataset')
+        if cluster_by is None and not collapse_datasets:
+            # Flat: nodes and edges in one pass, nothing kept
+            for ds in self.pipeline.datasets:
+                yield self._dataset_node(ds.id)
+            for op in self.pipeline.operations:
+                yield self._op_node(op)
+                yield from self._edges(op, {}, set())
+            return
+
+        producers = self._producers()
+        hidden = self._intermediates(producers) if collapse_datasets else set()
+        if cluster_by is None:
+            for ds in self.pipeline.datasets:
+                if ds.id not in hidden:
+                    yield self._dataset_node(ds.id)
+            for op in self.pipeline.operations:
+                yield self._op_node(op)
+        else:
+            yield from self._clusters(cluster_by, producers, hidden)
+        for op in self.pipeline.operations:
+            yield from self._edges(op, producers, hidden)
+
+    # --- Nodes & edges ---
+
+    def _dataset_node(self, ds_id: str) -> str:
+        return f'    {ds_id}[("{ds_id}")]:::dataset'
+
+    def _op_node(self, op, indent: str = "    ") -> str:
+        style = "op"
+        label = f"{op.type.name}<br/>{op.id}"
 
+        if op.type == OpType.BATCH_COMPUTE:
+            style = "batch"
+            count = len(op.parameters.get('computes', [])) + len(op.parameters.get('filters', []))
+            label = f"BATCH COMPUTE<br/>(Merged {count} steps)"
+            if len(op.outputs) > 1:
+                # Horizontal fusion: one scan feeding several outputs
+                label += f"<br/>{len(op.outputs)} outputs, 1 scan"
+        elif op.type in self.BARRIER_TYPES:
+            style = "barrier"
+
+        return f'{indent}{op.id}["{label}"]:::{style}'
+
+    def _edges(self, op, producers: Dict[str, List[str]], hidden: Set[str]) -> Iterator[str]:
+        for inp in op.inputs:
+            if inp in hidden:
+                # Collapsed: the dataset is only an edge label now
+                for producer in producers[inp]:
+                    yield f"    {producer} -->|{inp}| {op.id}"
+            else:
+                yield f"    {inp} --> {op.id}"
+        for out in op.outputs:
+            if out not in hidden:
+                yield f"    {op.id} --> {out}"
+
+    # --- Grouping ---
+
+    def _producers(self) -> Dict[str, List[str]]:
+        producers: Dict[str, List[str]] = {}
         for op in self.pipeline.operations:
-            style = "op"
-            label = f"{op.type.name}<br/>{op.id}"
-            
-            if op.type == OpType.BATCH_COMPUTE:
-                style = "batch"
-                count = len(op.parameters.get('computes', []))
-                label = f"BATCH COMPUTE<br/>(Merged {count} steps)"
-            elif op.type in [OpType.JOIN, OpType.AGGREGATE, OpType.SAVE_BINARY]:
-                style = "barrier"
-            
-            lines.append(f'    {op.id}["{label}"]:::{style}')
-            
-            # Edges
-            for inp in op.inputs:
-                lines.append(f"    {inp} --> {op.id}")
             for out in op.outputs:
-                lines.append(f"    {op.id} --> {out}")
+                producers.setdefault(out, []).append(op.id)
+        return producers
+
+    def _intermediates(self, producers: Dict[str, List[str]]) -> Set[str]:
+        """Datasets written and read by ops; external inputs and final outputs stay visible."""
+        return {inp for op in self.pipeline.operations for inp in op.inputs if inp in producers}
+
+    def _clusters(self, cluster_by: str, producers: Dict[str, List[str]], hidden: Set[str]) -> Iterator[str]:
+        ops = self.pipeline.operations
+        position = {op.id: i for i, op in enumerate(ops)}
+        parent = list(range(len(ops)))
+
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]] # Path halving
+                i = parent[i]
+            return i
+
+        def union(a: int, b: int):
+            a, b = find(a), find(b)
+            if a != b:
+                parent[max(a, b)] = min(a, b) # The earliest op names the cluster
+
+        if cluster_by == "component":
+            first_toucher: Dict[str, int] = {}
+            for i, op in enumerate(ops):
+                for ds_id in (*op.inputs, *op.outputs):
+                    union(i, first_toucher.setdefault(ds_id, i))
+        else:
+            # A barrier starts a new stage; everything else joins its producers' stage
+            for i, op in enumerate(ops):
+                if op.type not in self.BARRIER_TYPES:
+                    for inp in op.inputs:
+                        for producer in producers.get(inp, []):
+                            union(i, position[producer])
+
+        members: Dict[int, List[int]] = {}
+        for i in range(len(ops)):
+            members.setdefault(find(i), []).append(i)
+
+        # A dataset sits with its (first) producer, or its first reader if it is an input
+        home: Dict[str, int] = {}
+        for i, op in enumerate(ops):
+            for ds_id in op.outputs:
+                home.setdefault(ds_id, find(i))
+        for i, op in enumerate(ops):
+            for ds_id in op.inputs:
+                home.setdefault(ds_id, find(i))
+        datasets_of: Dict[int, List[str]] = {}
+        loose = []
+        for ds in self.pipeline.datasets:
+            if ds.id in hidden:
+                continue
+            if ds.id in home:
+                datasets_of.setdefault(home[ds.id], []).append(ds.id)
+            else:
+                loose.append(ds.id)
 
-        return "\n".join(lines)
\ No newline at end of file
+        for number, (root, indices) in enumerate(sorted(members.items()), start=1):
+            if cluster_by == "component":
+                title = f"Component {number} ({len(indices)} ops)"
+            else:
+                title = f"Stage {number}: {ops[root].id}"
+            yield f'    subgraph cluster_{number}["{title}"]'
+            for ds_id in datasets_of.get(root, []):
+                yield "    " + self._dataset_node(ds_id)
+            for i in indices:
+                yield self._op_node(ops[i], indent="        ")
+            yield "    end"
+        for ds_id in loose:
+            yield self._dataset_node(ds_id)
@@ -0,0 +1,110 @@
+import shutil
+import sys
+import pytest
+import cli
+
+FIXTURE = "tests/fixtures/raw_trace.yaml"
+
+class TestBatchCli:
+
+    def test_directory_is_optimized_per_file(self, tmp_path, capsys):
+        """
+        Scenario: A directory with two traces and one broken file.
+        Expected: Each good trace gets its own IR + diagram, the broken one is
+        reported in the summary table, and the exit code flags the failure.
+        """
+        traces = tmp_path / "traces"
+        traces.mkdir()
+        shutil.copy(FIXTURE, traces / "claims.yaml")
+        shutil.copy("hello_world.yaml", traces / "hello.yaml")
+        (traces / "broken.yaml").write_text("operations: [\n")
+        (traces / "notes.txt").write_text("not a trace")
+
+        args = cli.build_parser().parse_args([
+            str(traces), "--no-cache", "--jobs", "2",
+            "--dump-yaml", str(tmp_path / "ir"), "--visualize", str(tmp_path / "viz"),
+        ])
+        inputs = cli.batch_inputs(args.input_file)
+        exit_code = cli.run_batch(inputs, args)
+
+        assert [p.name for p in inputs] == ["broken.yaml", "claims.yaml", "hello.yaml"]
+        assert exit_code == 1
+        assert sorted(p.name for p in (tmp_path / "ir").iterdir()) == ["claims.yaml", "hello.yaml"]
+        assert sorted(p.name for p in (tmp_path / "viz").iterdir()) == ["claims.md", "hello.md"]
+
+        table = capsys.readouterr().out
+        assert "60 -> 29" in table and "-51.7%" in table
+        assert "broken.yaml  ❌" in table
+        assert "2 optimized, 1 failed" in table
+
+    def test_incremental_flag_reuses_the_last_run(self, tmp_path):
+        """
+        Scenario: The same trace run twice with --incremental (islands patched,
+        as the incremental path validates topology).
+        Expected: A full promote + collapse run first, then nothing re-optimized.
+        """
+        state = tmp_path / "state.pkl"
+        args = cli.build_parser().parse_args([FIXTURE, "--no-cache", "--patch-islands", "--incremental", str(state)])
+        logs = []
+
+        first = cli.optimize_file(cli.Path(FIXTURE), args, log=logs.append)
+        second = cli.optimize_file(cli.Path(FIXTURE), args, log=logs.append)
+
+        assert (first["ops_after"], second["ops_after"]) == (29, 29)
+        assert "   (full run, 60 ops re-optimized)" in logs
+        assert "   (incremental run, 0 ops re-optimized)" in logs
+
+    def test_incremental_rejects_linear_collapse(self, tmp_path, monkeypatch, capsys):
+        monkeypatch.setattr(sys, "argv", ["cli.py", FIXTURE, "--incremental", str(tmp_path / "state.pkl"), "--collapse-mode", "linear"])
+
+        with pytest.raises(SystemExit):
+            cli.main()
+
+        assert "--incremental only supports --collapse-mode dag" in capsys.readouterr().err
+
+    def test_single_file_is_not_batch_mode(self):
+        assert cli.batch_inputs(FIXTURE) is None
+
+    def test_glob_selects_matching_traces(self, tmp_path):
+        for name in ("a.yaml", "b.yml", "c.json"):
+            (tmp_path / name).write_text("")
+
+        inputs = cli.batch_inputs(str(tmp_path / "*.y*ml"))
+
+        assert [p.name for p in inputs] == ["a.yaml", "b.yml"]
+
+    def test_same_stem_in_different_directories(self, tmp_path, capsys):
+        """
+        Scenario: A recursive glob matching two traces both named claims.yaml.
+        Expected: Outputs mirror the input tree below the common directory, so
+        neither overwrites the other; --patch-islands is ignored with a warning.
+        """
+        for sub in ("2023", "2024"):
+            (tmp_path / "traces" / sub).mkdir(parents=True)
+            shutil.copy("hello_world.yaml", tmp_path / "traces" / sub / "claims.yaml")
+
+        args = cli.build_parser().parse_args([
+            str(tmp_path / "traces" / "**" / "*.yaml"), "--no-cache", "--jobs", "1",
+            "--dump-yaml", str(tmp_path / "ir"), "--patch-islands",
+        ])
+        exit_code = cli.run_batch(cli.batch_inputs(args.input_file), args)
+
+        assert exit_code == 0
+        assert sorted(p.relative_to(tmp_path / "ir").as_posix() for p in (tmp_path / "ir").rglob("*.yaml")) == [
+            "2023/claims.yaml", "2024/claims.yaml"]
+        assert "--patch-islands only applies to a single trace" in capsys.readouterr().out
+
+    def test_outputs_that_would_collide_are_rejected(self, tmp_path, capsys):
+        """
+        Edge Case: a.yaml and a.yml side by side both map to 'a'.
+        Expected: Nothing runs and the clash is reported.
+        """
+        for name in ("a.yaml", "a.yml"):
+            shutil.copy("hello_world.yaml", tmp_path / name)
+
+        args = cli.build_parser().parse_args([str(tmp_path), "--no-cache", "--dump-yaml", str(tmp_path / "ir")])
+        exit_code = cli.run_batch(cli.batch_inputs(args.input_file), args)
+
+        assert exit_code == 1
+        assert "would overwrite each other's outputs" in capsys.readouterr().out
+        assert not (tmp_path / "ir").exists()
@@ -78,4 +78,45 @@ class TestGraphTopology:
         validator = SecurityValidator(pipeline)
         
         errors = validator.validate_topology()
-        assert any("Missing input dataset 'ds_b'" in e for e in errors)
\ No newline at end of file
+        assert any("Missing input dataset 'ds_b'" in e for e in errors)
+
+    def test_reports_each_cyclic_component_with_sample(self):
+        """
+        Scenario: Two independent loops (A <-> B, X <-> Y).
+        Each strongly connected component gets its own report,
+        and the sample cycle starts and ends on the same node.
+        """
+        ops = [
+            Operation(id="op_1", type=OpType.COMPUTE_COLUMNS, inputs=["ds_a"], outputs=["ds_b"]),
+            Operation(id="op_2", type=OpType.COMPUTE_COLUMNS, inputs=["ds_b"], outputs=["ds_a"]),
+            Operation(id="op_3", type=OpType.COMPUTE_COLUMNS, inputs=["ds_x"], outputs=["ds_y"]),
+            Operation(id="op_4", type=OpType.COMPUTE_COLUMNS, inputs=["ds_y"], outputs=["ds_x"]),
+        ]
+        datasets = [Dataset(id=x, source="derived", columns=[]) for x in ["ds_a", "ds_b", "ds_x", "ds_y"]]
+        
+        validator = SecurityValidator(Pipeline(datasets=datasets, operations=ops))
+        cycle_errors = [e for e in validator.validate_topology() if "Cycle detected" in e]
+        
+        assert len(cycle_errors) == 2
+        assert "ds_a -> op_1 -> ds_b -> op_2 -> ds_a" in cycle_errors[0] + cycle_errors[1]
+
+    def test_cycle_check_scales_to_large_traces(self):
+        """
+        Scenario: A 50k-step linear chain with one back edge at the end.
+        Exhaustive cycle enumeration would be hopeless; the SCC check
+        must report it and bound the printed sample.
+        """
+        n = 50_000
+        ops = [
+            Operation(id=f"op_{i}", type=OpType.COMPUTE_COLUMNS, inputs=[f"ds_{i}"], outputs=[f"ds_{i + 1}"])
+            for i in range(n)
+        ]
+        ops.append(Operation(id="op_back", type=OpType.COMPUTE_COLUMNS, inputs=[f"ds_{n}"], outputs=["ds_0"]))
+        datasets = [Dataset(id=f"ds_{i}", source="derived", columns=[]) for i in range(n + 1)]
+        
+        validator = SecurityValidator(Pipeline(datasets=datasets, operations=ops))
+        errors = validator.validate_topology()
+        
+        assert len(errors) == 1
+        assert "Cycle detected" in errors[0]
+        assert errors[0].endswith("...")
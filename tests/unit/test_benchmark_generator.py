@@ -0,0 +1,80 @@
+import json
+from etl_ir.model import Pipeline
+from etl_ir.types import OpType
+from etl_optimizer.loader import StreamingTraceLoader
+from etl_optimizer.promoter import SemanticPromoter
+from etl_optimizer.validator import SecurityValidator
+from benchmarks.generator import TraceGenerator
+from benchmarks import run
+
+class TestTraceGenerator:
+
+    def test_same_seed_same_trace(self, tmp_path):
+        a = TraceGenerator(500, seed=7).write(tmp_path / "a.yaml")
+        b = TraceGenerator(500, seed=7).write(tmp_path / "b.yaml")
+        c = TraceGenerator(500, seed=8).write(tmp_path / "c.yaml")
+
+        assert a.read_bytes() == b.read_bytes()
+        assert a.read_bytes() != c.read_bytes()
+
+    def test_trace_loads_with_requested_size_and_shape(self, tmp_path):
+        """
+        Scenario: A 2000-op trace is written and streamed back.
+        Expected: Exactly 2000 ops, every input is declared, and it has the
+        features the passes care about: noise, joins, fan-out and islands.
+        """
+        path = TraceGenerator(2000, seed=0).write(tmp_path / "trace.yaml")
+
+        pipeline = StreamingTraceLoader(path).load()
+
+        assert len(pipeline.operations) == 2000
+        declared = {ds.id for ds in pipeline.datasets}
+        assert all(inp in declared for op in pipeline.operations for inp in op.inputs)
+        commands = {op.parameters.get("command") for op in pipeline.operations if op.type == OpType.GENERIC_TRANSFORM}
+        assert {"DO", "END", "SORT", "LIST"} <= commands
+        assert any(op.type == OpType.JOIN and len(op.inputs) == 2 for op in pipeline.operations)
+        assert any(op.type == OpType.JOIN and len(op.inputs) == 1 for op in pipeline.operations)
+        assert any("islands" in error for error in SecurityValidator(pipeline).validate_topology())
+
+        readers = {}
+        for op in pipeline.operations:
+            for inp in op.inputs:
+                readers[inp] = readers.get(inp, 0) + 1
+        assert max(readers.values()) > 1 # Fan-out
+
+    def test_optimized_trace_has_no_ghost_columns(self):
+        """
+        Edge Case: Expressions only read columns of their input, so the logic
+        checks have nothing to report once the noise is promoted away.
+        """
+        data = TraceGenerator(1000, seed=3).to_dict()
+        pipeline = SemanticPromoter(Pipeline.model_validate(data)).run()
+
+        assert SecurityValidator(pipeline).run() == []
+
+class TestBenchmarkRunner:
+
+    def test_results_are_machine_readable(self, tmp_path):
+        output = tmp_path / "bench.json"
+
+        run.main(["--sizes", "200", "300", "--output", str(output)])
+        results = json.loads(output.read_text())
+
+        assert results["meta"]["seed"] == 0
+        assert [r["size"] for r in results["runs"]] == [200, 300]
+        for r in results["runs"]:
+            assert set(r["seconds"]) == set(run.STAGES)
+            assert r["ops_raw"] == r["size"] and r["ops_optimized"] < r["ops_raw"]
+
+    def test_compare_reports_ratio_per_stage(self):
+        baseline = {"meta": {"commit": "abc123", "seed": 0},
+                    "runs": [{"size": 100, "seconds": {stage: 2.0 for stage in run.STAGES}}]}
+        current = {"meta": {"commit": "def456", "seed": 0},
+                   "runs": [{"size": 100, "seconds": {stage: 1.0 for stage in run.STAGES}},
+                            {"size": 200, "seconds": {stage: 1.0 for stage in run.STAGES}}]}
+
+        table = run.compare_table(baseline, current)
+
+        assert "abc123" in table
+        assert table.splitlines()[-1].split()[0] == "100" # No baseline for 200
+        assert table.count("0.50x") == len(run.STAGES)
@@ -0,0 +1,46 @@
+from pydantic import BaseModel, field_validator
+from etl_ir.model import Pipeline, Operation, Dataset
+from etl_ir.types import OpType
+from etl_optimizer.construct import _builder, make_op
+from etl_optimizer.index import PipelineIndex
+
+class TestBuilders:
+
+    def test_built_op_matches_a_validated_one(self):
+        """
+        Expected: Same fields, same fields_set and the same dump as Operation(...),
+        through Pydantic's public model_construct.
+        """
+        values = dict(id="c1", type=OpType.COMPUTE_COLUMNS, inputs=["a"], outputs=["b"], parameters={"target": "x"})
+
+        built, validated = make_op(**values), Operation(**values)
+
+        assert built.model_dump() == validated.model_dump()
+        assert built.model_fields_set == validated.model_fields_set
+        assert built == validated
+
+    def test_ops_built_from_an_op_own_their_lists(self):
+        """
+        Edge Case: An op rebuilt from another (as every pass does) and then
+        patched with PipelineIndex.add_input.
+        Expected: The original op's inputs are untouched.
+        """
+        old = Operation(id="j", type=OpType.JOIN, inputs=["a"], outputs=["b"])
+        new = make_op(id=old.id, type=old.type, inputs=old.inputs, outputs=old.outputs, parameters=old.parameters)
+
+        PipelineIndex(Pipeline(datasets=[Dataset(id="a", source="file")], operations=[new])).add_input("j", "lookup")
+
+        assert new.inputs == ["a", "lookup"]
+        assert old.inputs == ["a"]
+
+    def test_models_with_validators_are_validated(self):
+        """Edge Case: model_construct would skip the validator silently; the builder runs it."""
+        class Upper(BaseModel):
+            name: str
+
+            @field_validator("name")
+            @classmethod
+            def upper(cls, value):
+                return value.upper()
+
+        assert _builder(Upper)(name="dob").name == "DOB"
@@ -25,4 +25,18 @@ def test_coordinator_runs_full_chain():
     assert result_pipeline.metadata["id"] == "test_coord"
     
     # If the coordinator crashed on .collapse() vs .run(), this test would fail.
-    print("\n✅ Coordinator Wiring: Verified")
\ No newline at end of file
+    print("\n✅ Coordinator Wiring: Verified")
+def test_coordinator_partitioned_validation_reports_ghosts():
+    """
+    Scenario: Validation split per connected component (validation_workers > 1).
+    Expected: A ghost column still fails the run, as with sequential validation.
+    """
+    pipeline = Pipeline(
+        datasets=[Dataset(id="ds1", source="file")],
+        operations=[
+            Operation(id="op1", type="compute_columns", inputs=["ds1"], outputs=["ds2"], parameters={"target": "x", "expression": "salary"})
+        ]
+    )
+
+    with pytest.raises(ValueError, match="Ghost Column"):
+        OptimizationCoordinator(validation_workers=2).optimize(pipeline)
@@ -0,0 +1,208 @@
+import pytest
+from etl_ir.model import Pipeline, Operation, Dataset, Column
+from etl_ir.types import OpType, DataType
+from etl_optimizer.fusion import HorizontalFuser
+from etl_optimizer.index import PipelineIndex
+from etl_optimizer.liveness import DeadColumnEliminator
+
+def _cols(*names):
+    return [Column(name=n, type=DataType.INTEGER) for n in names]
+
+def _pipeline(sink_type=OpType.AGGREGATE):
+    """
+    LOAD(a, b, c, d) -> BATCH(x = a + 1, y = b * 2, z = x * 3) -> FILTER(x > 0) -> sink
+    The aggregate sink only reads 'z' (by 'd'); a SAVE sink reads everything.
+    """
+    datasets = [
+        Dataset(id="src", source="file", columns=_cols("a", "b", "c", "d")),
+        Dataset(id="ds1", source="derived", columns=_cols("a", "b", "c", "d", "x", "y", "z")),
+        Dataset(id="ds2", source="derived", columns=_cols("a", "b", "c", "d", "x", "y", "z")),
+        Dataset(id="out", source="derived", columns=_cols("d", "total")),
+    ]
+    if sink_type == OpType.AGGREGATE:
+        sink = Operation(id="op_agg", type=OpType.AGGREGATE, inputs=["ds2"], outputs=["out"],
+                         parameters={"break": ["d"], "aggregations": ["total = SUM ( z )"]})
+    else:
+        sink = Operation(id="op_save", type=OpType.SAVE_BINARY, inputs=["ds2"], outputs=["out"],
+                         parameters={"filename": "out.sav"})
+    ops = [
+        Operation(id="op_load", type=OpType.LOAD_CSV, inputs=[], outputs=["src"], parameters={"filename": "src.csv"}),
+        Operation(id="batch_op", type=OpType.BATCH_COMPUTE, inputs=["src"], outputs=["ds1"],
+                  parameters={"computes": [
+                      {"target": "x", "expression": "a + 1"},
+                      {"target": "y", "expression": "b * 2"},
+                      {"target": "z", "expression": "x * 3"},
+                  ]}),
+        Operation(id="op_filter", type=OpType.FILTER_ROWS, inputs=["ds1"], outputs=["ds2"],
+                  parameters={"condition": "x > 0"}),
+        sink,
+    ]
+    return Pipeline(datasets=datasets, operations=ops)
+
+class TestDeadColumnEliminator:
+    
+    def test_drops_dead_computes_and_narrows_source(self):
+        """
+        Scenario: Only 'z' (and 'd') reach the aggregate; 'x' feeds z and the filter.
+        Expected: 'y' is dropped, LOAD reads only a and d, schemas shrink.
+        """
+        pipeline = _pipeline()
+        index = PipelineIndex(pipeline)
+        
+        dce = DeadColumnEliminator(pipeline, index)
+        result = dce.run()
+        ops = {op.id: op for op in result.operations}
+        datasets = {ds.id: ds for ds in result.datasets}
+        
+        assert [c["target"] for c in ops["batch_op"].parameters["computes"]] == ["x", "z"]
+        assert ops["op_load"].parameters["columns"] == ["a", "d"]
+        assert [c.name for c in datasets["src"].columns] == ["a", "d"]
+        assert [c.name for c in datasets["ds2"].columns] == ["a", "d", "x", "z"]
+        assert dce.dropped_computes == {"batch_op": ["y"]}
+        
+        # The shared index sees the rewritten ops and datasets
+        assert index.op("batch_op") is ops["batch_op"]
+        assert index.dataset("src") is datasets["src"]
+
+    def test_save_keeps_every_column(self):
+        """
+        Scenario: A SAVE writes the whole dataset, so nothing upstream is dead.
+        """
+        pipeline = _pipeline(sink_type=OpType.SAVE_BINARY)
+        
+        dce = DeadColumnEliminator(pipeline)
+        result = dce.run()
+        
+        assert len(result.operations[1].parameters["computes"]) == 3
+        assert "columns" not in result.operations[0].parameters
+        assert dce.dropped_columns == {}
+
+    def test_join_projection_keeps_keys_and_trusts_only_complete_schemas(self):
+        """
+        Scenario: A join feeds a compute reading 'v'.
+        Expected: The join keeps its key and 'v'. If the downstream reads a
+        column the join schema does not list (it comes from an untraced
+        table), the schema is incomplete and nothing is narrowed.
+        """
+        def build(expression):
+            datasets = [
+                Dataset(id="left", source="file", columns=_cols("k", "v", "w")),
+                Dataset(id="joined", source="derived", columns=_cols("k", "v", "w")),
+                Dataset(id="res", source="derived", columns=_cols("k", "v", "w", "r")),
+                Dataset(id="saved", source="file", columns=[]),
+            ]
+            ops = [
+                Operation(id="op_join", type=OpType.JOIN, inputs=["left"], outputs=["joined"], parameters={"by": "k"}),
+                Operation(id="op_c", type=OpType.COMPUTE_COLUMNS, inputs=["joined"], outputs=["res"],
+                          parameters={"target": "r", "expression": expression}),
+                Operation(id="op_agg", type=OpType.AGGREGATE, inputs=["res"], outputs=["saved"],
+                          parameters={"break": ["k"], "aggregations": ["n = SUM ( r )"]}),
+            ]
+            return Pipeline(datasets=datasets, operations=ops)
+        
+        narrowed = DeadColumnEliminator(build("v * 2")).run()
+        assert narrowed.operations[0].parameters["columns"] == ["k", "v"]
+        
+        untrusted = DeadColumnEliminator(build("v * rate")).run()
+        assert "columns" not in untrusted.operations[0].parameters
+
+    def test_unparseable_expression_keeps_everything_live(self):
+        """
+        Edge Case: If we cannot tell what an expression reads, nothing upstream is dead.
+        """
+        pipeline = _pipeline()
+        pipeline.operations[2].parameters["condition"] = "x >> 0"
+        
+        result = DeadColumnEliminator(pipeline).run()
+        
+        assert len(result.operations[1].parameters["computes"]) == 3
+        assert "columns" not in result.operations[0].parameters
+
+    def test_fused_branches_keep_their_own_liveness(self):
+        """
+        Scenario: load(x, a) feeds two siblings: c1 overwrites 'a' into out_a,
+        c2 computes 'y' into out_b, whose reader c3 still needs the ORIGINAL 'a'.
+        HorizontalFuser fuses c1 and c2 into one multi-output batch.
+        Expected: c1's 'a' only shadows the load's 'a' in out_a, so the load
+        keeps both columns, exactly as without fusion.
+        """
+        datasets = [
+            Dataset(id="src", source="file", columns=_cols("x", "a")),
+            Dataset(id="out_a", source="derived", columns=_cols("x", "a")),
+            Dataset(id="out_b", source="derived", columns=_cols("x", "a", "y")),
+            Dataset(id="ds3", source="derived", columns=_cols("x", "a", "y", "z")),
+            Dataset(id="agg_a", source="derived", columns=_cols("n")),
+            Dataset(id="agg_b", source="derived", columns=_cols("n")),
+        ]
+        ops = [
+            Operation(id="load", type=OpType.LOAD_CSV, inputs=[], outputs=["src"], parameters={"filename": "src.csv"}),
+            Operation(id="c1", type=OpType.COMPUTE_COLUMNS, inputs=["src"], outputs=["out_a"], parameters={"target": "a", "expression": "x + 1"}),
+            Operation(id="c2", type=OpType.COMPUTE_COLUMNS, inputs=["src"], outputs=["out_b"], parameters={"target": "y", "expression": "x * 2"}),
+            Operation(id="c3", type=OpType.COMPUTE_COLUMNS, inputs=["out_b"], outputs=["ds3"], parameters={"target": "z", "expression": "a + y"}),
+            Operation(id="agg1", type=OpType.AGGREGATE, inputs=["out_a"], outputs=["agg_a"], parameters={"aggregations": ["n = SUM ( a )"]}),
+            Operation(id="agg2", type=OpType.AGGREGATE, inputs=["ds3"], outputs=["agg_b"], parameters={"aggregations": ["n = SUM ( z )"]}),
+        ]
+        pipeline = Pipeline(datasets=datasets, operations=ops)
+        fused = HorizontalFuser(pipeline).run()
+        assert fused.operations[1].outputs == ["out_a", "out_b"]
+
+        dce = DeadColumnEliminator(fused)
+        result = dce.run()
+
+        assert "columns" not in result.operations[0].parameters
+        assert dce.dropped_computes == {}
+        assert "columns" not in DeadColumnEliminator(pipeline).run().operations[0].parameters
+
+    def test_fused_batch_drops_dead_entries_per_output(self):
+        """
+        Scenario: A fused batch whose out_b entry 'y' nobody reads.
+        Expected: Only 'y' is dropped, and only out_b's schema loses it.
+        """
+        datasets = [
+            Dataset(id="src", source="file", columns=_cols("x")),
+            Dataset(id="out_a", source="derived", columns=_cols("x", "y")),
+            Dataset(id="out_b", source="derived", columns=_cols("x", "y")),
+            Dataset(id="agg_a", source="derived", columns=_cols("n")),
+            Dataset(id="agg_b", source="derived", columns=_cols("n")),
+        ]
+        ops = [
+            Operation(id="load", type=OpType.LOAD_CSV, inputs=[], outputs=["src"]),
+            Operation(id="batch", type=OpType.BATCH_COMPUTE, inputs=["src"], outputs=["out_a", "out_b"],
+                      parameters={"computes": [
+                          {"target": "y", "expression": "x + 1", "output": "out_a"},
+                          {"target": "y", "expression": "x * 2", "output": "out_b"},
+                      ]}),
+            Operation(id="agg1", type=OpType.AGGREGATE, inputs=["out_a"], outputs=["agg_a"], parameters={"aggregations": ["n = SUM ( y )"]}),
+            Operation(id="agg2", type=OpType.AGGREGATE, inputs=["out_b"], outputs=["agg_b"], parameters={"aggregations": ["n = SUM ( x )"]}),
+        ]
+
+        dce = DeadColumnEliminator(Pipeline(datasets=datasets, operations=ops))
+        result = dce.run()
+        datasets = {ds.id: ds for ds in result.datasets}
+
+        assert result.operations[1].parameters["computes"] == [{"target": "y", "expression": "x + 1", "output": "out_a"}]
+        assert [c.name for c in datasets["out_a"].columns] == ["x", "y"]
+        assert [c.name for c in datasets["out_b"].columns] == ["x"]
+
+    def test_sort_keys_and_counts_read_the_right_columns(self):
+        """
+        Edge Case: Columns named A and D sorted by 'SORT CASES BY d (D) a', then
+        'n = N' per a. Neither CASES nor the bare N is a column.
+        Expected: The load is narrowed to exactly the sort keys.
+        """
+        datasets = [
+            Dataset(id="src", source="file", columns=_cols("a", "b", "d")),
+            Dataset(id="sorted", source="derived", columns=_cols("a", "b", "d")),
+            Dataset(id="out", source="derived", columns=_cols("a", "n")),
+        ]
+        ops = [
+            Operation(id="op_load", type=OpType.LOAD_CSV, inputs=[], outputs=["src"]),
+            Operation(id="op_sort", type=OpType.SORT_ROWS, inputs=["src"], outputs=["sorted"],
+                      parameters={"keys": "SORT CASES BY d (D) a"}),
+            Operation(id="op_agg", type=OpType.AGGREGATE, inputs=["sorted"], outputs=["out"],
+                      parameters={"break": ["a"], "aggregations": ["n = N"]}),
+        ]
+
+        result = DeadColumnEliminator(Pipeline(datasets=datasets, operations=ops)).run()
+
+        assert result.operations[0].parameters["columns"] == ["a", "d"]
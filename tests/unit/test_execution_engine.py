@@ -0,0 +1,177 @@
+import pytest
+import numpy as np
+from etl_ir.model import Pipeline, Operation, Dataset
+from etl_ir.types import OpType
+from etl_optimizer.engine import ExecutionEngine, compile_expression
+
+def _batch(*computes, outputs=("out",), filters=None):
+    parameters = {"computes": list(computes)}
+    if filters:
+        parameters["filters"] = filters
+    return Operation(id="batch", type=OpType.BATCH_COMPUTE, inputs=["in"], outputs=list(outputs), parameters=parameters)
+
+class TestExecutionEngine:
+    
+    def test_runs_batch_in_order(self):
+        """
+        Scenario: Later computes see earlier targets; reassignment replaces the column.
+        """
+        op = _batch(
+            {"target": "x", "expression": "a * 2"},
+            {"target": "y", "expression": "x + 1"},
+            {"target": "a", "expression": "y ** 2"},
+        )
+        table = {"a": np.array([1.0, 2.0, 3.0])}
+        
+        out = ExecutionEngine().run_batch(op, table)["out"]
+        
+        assert list(out) == ["a", "x", "y"]
+        np.testing.assert_array_equal(out["x"], [2, 4, 6])
+        np.testing.assert_array_equal(out["a"], [9, 25, 49])
+        np.testing.assert_array_equal(table["a"], [1, 2, 3]) # Input untouched
+
+    def test_spss_missing_value_semantics(self):
+        """
+        Scenario: Division by zero and $SYSMIS give SYSMIS (NaN);
+        comparisons with missing are missing; FALSE AND missing is FALSE.
+        """
+        op = _batch(
+            {"target": "ratio", "expression": "a / b"},
+            {"target": "gone", "expression": "$SYSMIS"},
+            {"target": "cmp", "expression": "gone > 1"},
+            {"target": "both", "expression": "a > 5 AND gone > 1"},
+            {"target": "flag", "expression": "SYSMIS(ratio)"},
+        )
+        out = ExecutionEngine().run_batch(op, {"a": np.array([4.0, 6.0]), "b": np.array([2.0, 0.0])})["out"]
+        
+        np.testing.assert_array_equal(out["ratio"], [2.0, np.nan])
+        assert np.isnan(out["cmp"]).all()
+        np.testing.assert_array_equal(out["both"], [0.0, np.nan])
+        np.testing.assert_array_equal(out["flag"], [0.0, 1.0])
+
+    def test_known_functions(self):
+        """
+        Scenario: NUMBER, TRUNC, MOD, DATE.MDY and the row statistics.
+        """
+        table = {"s": np.array(["19800101", "x", ""]), "v": np.array([7.5, -7.5, np.nan])}
+        
+        number = compile_expression("NUMBER ( s , F8.0 )")
+        np.testing.assert_array_equal(number(_ns(table)), [19800101, np.nan, np.nan])
+        np.testing.assert_array_equal(compile_expression("TRUNC(v)")(_ns(table)), [7, -7, np.nan])
+        np.testing.assert_array_equal(compile_expression("MOD(-7, 3)")(_ns(table)), -1)
+        np.testing.assert_array_equal(compile_expression("SUM(v, 1)")(_ns(table)), [8.5, -6.5, 1])
+        np.testing.assert_array_equal(compile_expression("MAX(v, 0)")(_ns(table)), [7.5, 0, 0])
+        
+        # One day after the Gregorian epoch, and month 13 rolling into next January
+        assert compile_expression("DATE.MDY(10, 15, 1582)")(_ns(table)) == 86400
+        jan = compile_expression("DATE.MDY(1, 1, 2025)")(_ns(table))
+        assert compile_expression("DATE.MDY(13, 1, 2024)")(_ns(table)) == jan
+
+    def test_fused_batch_outputs_and_filters(self):
+        """
+        Scenario: A horizontally fused batch writes each target only to its
+        own output, and each filter only narrows its own output.
+        """
+        op = _batch(
+            {"target": "a", "expression": "x + 1", "output": "out_a"},
+            {"target": "b", "expression": "x * 2", "output": "out_b"},
+            outputs=("out_a", "out_b", "out_f"),
+            filters=[{"condition": "x > 1", "output": "out_f"}],
+        )
+        result = ExecutionEngine().run_batch(op, {"x": np.array([1.0, 2.0, 3.0])})
+        
+        assert list(result["out_a"]) == ["x", "a"]
+        assert list(result["out_b"]) == ["x", "b"]
+        np.testing.assert_array_equal(result["out_f"]["x"], [2, 3])
+
+    def test_rejects_unknown_columns_and_functions(self):
+        """
+        Edge Case: Ghost columns and unsupported functions fail loudly.
+        """
+        engine = ExecutionEngine()
+        with pytest.raises(ValueError, match="Unknown column 'GHOST'"):
+            engine.run_batch(_batch({"target": "y", "expression": "ghost + 1"}), {"x": np.array([1.0])})
+        with pytest.raises(ValueError, match="Unsupported function"):
+            compile_expression("FROBNICATE(x)")
+
+    def test_sort_join_and_aggregate(self):
+        """
+        Scenario: SORT CASES BY region (D) amount, MATCH FILES with a lookup
+        table on region, then AGGREGATE per region.
+        Expected: Stable sort with system-missing lowest; unmatched rows get
+        system-missing / blank; aggregates skip missing values.
+        """
+        engine = ExecutionEngine()
+        table = {"region": np.array(["n", "s", "n", "w"]), "amount": np.array([2.0, 5.0, np.nan, 1.0])}
+        rates = {"REGION": np.array(["s", "n", "n"]), "rate": np.array([10.0, 20.0, 99.0]), "label": np.array(["South", "North", "Dup"])}
+
+        ordered = engine.run_sort(Operation(id="sort", type=OpType.SORT_ROWS, inputs=["in"], outputs=["out"],
+                                            parameters={"keys": "BY region (D) amount"}), table)
+        joined = engine.run_join(Operation(id="join", type=OpType.JOIN, inputs=["in", "rates"], outputs=["out"],
+                                           parameters={"by": "region"}), [table, rates])
+        summary = engine.run_aggregate(Operation(id="agg", type=OpType.AGGREGATE, inputs=["in"], outputs=["out"],
+                                                 parameters={"break": ["region"], "aggregations": [
+                                                     "total = SUM ( amount * 2 )", "avg = MEAN ( amount )", "cases = N"]}), table)
+
+        assert list(ordered["region"]) == ["w", "s", "n", "n"]
+        np.testing.assert_array_equal(ordered["amount"], [1, 5, np.nan, 2])
+        np.testing.assert_array_equal(joined["rate"], [20, 10, 20, np.nan]) # First row per key
+        assert list(joined["label"]) == ["North", "South", "North", ""]
+        assert list(summary["region"]) == ["n", "s", "w"]
+        np.testing.assert_array_equal(summary["total"], [4, 10, 2])
+        np.testing.assert_array_equal(summary["avg"], [2, 5, 1])
+        np.testing.assert_array_equal(summary["cases"], [2, 1, 1])
+
+    def test_optimized_pipeline_matches_raw_pipeline(self):
+        """
+        Scenario: load -> DO/END noise -> two computes -> SORT -> join rates ->
+        compute -> filter -> aggregate -> save, run before and after the full
+        default schedule (promotion, collapse, DCE...).
+        Expected: The same summary either way.
+        """
+        from etl_optimizer.coordinator import DEFAULT_PASSES
+        from etl_optimizer.index import PipelineIndex
+        from etl_optimizer.pass_manager import PassManager
+        from etl_optimizer.promoter import SemanticPromoter
+
+        def op(op_id, op_type, inputs, outputs, **parameters):
+            return Operation(id=op_id, type=op_type, inputs=inputs, outputs=outputs, parameters=parameters)
+        ops = [
+            op("load", OpType.LOAD_CSV, [], ["claims"]),
+            op("load_rates", OpType.LOAD_CSV, [], ["rates"]),
+            op("do", OpType.GENERIC_TRANSFORM, ["claims"], ["ds1"], command="DO"),
+            op("c1", OpType.COMPUTE_COLUMNS, ["ds1"], ["ds2"], target="days", expression="claim_end - claim_start + 1"),
+            op("end", OpType.GENERIC_TRANSFORM, ["ds2"], ["ds3"], command="END"),
+            op("c2", OpType.COMPUTE_COLUMNS, ["ds3"], ["ds4"], target="unused", expression="days * 100"),
+            op("sort", OpType.GENERIC_TRANSFORM, ["ds4"], ["ds5"], command="SORT CASES", args="BY region"),
+            op("join", OpType.JOIN, ["ds5", "rates"], ["ds6"], by="region"),
+            op("pay", OpType.COMPUTE_COLUMNS, ["ds6"], ["ds7"], target="payment", expression="days * rate"),
+            op("keep", OpType.GENERIC_TRANSFORM, ["ds7"], ["ds8"], command="SELECT IF", args="payment > 0"),
+            op("agg", OpType.AGGREGATE, ["ds8"], ["summary"], **{"break": ["region"], "aggregations": ["TOTAL = SUM ( payment )", "CASES = N"]}),
+            op("save", OpType.SAVE_BINARY, ["summary"], ["summary.sav"], filename="summary.sav"),
+        ]
+        names = ["claims", "rates", "ds1", "ds2", "ds3", "ds4", "ds5", "ds6", "ds7", "ds8", "summary", "summary.sav"]
+        raw = Pipeline(datasets=[Dataset(id=n, source="derived") for n in names], operations=ops)
+        promoted = SemanticPromoter(raw).run()
+        manager = PassManager()
+        for name, factory in DEFAULT_PASSES:
+            manager.register(name, factory)
+        optimized = manager.run(raw, PipelineIndex(raw))
+        sources = {
+            "claims": {"region": np.array(["n", "s", "n", "e"]), "claim_start": np.array([1.0, 5.0, 10.0, 3.0]),
+                       "claim_end": np.array([3.0, 9.0, 9.0, 4.0])},
+            "rates": {"region": np.array(["n", "s"]), "rate": np.array([2.0, 3.0])},
+        }
+
+        before = ExecutionEngine().run_pipeline(promoted, sources)["summary.sav"]
+        after = ExecutionEngine().run_pipeline(optimized, sources)["summary.sav"]
+
+        assert len(optimized.operations) < len(promoted.operations)
+        assert list(after["region"]) == list(before["region"]) == ["n", "s"]
+        np.testing.assert_array_equal(after["TOTAL"], before["TOTAL"])
+        np.testing.assert_array_equal(after["TOTAL"], [6, 15])
+        np.testing.assert_array_equal(after["CASES"], [1, 1])
+
+def _ns(table):
+    from etl_optimizer.engine import _Namespace
+    return _Namespace(table)
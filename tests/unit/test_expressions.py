@@ -0,0 +1,55 @@
+import pytest
+from etl_optimizer.expressions import (
+    Number, String, Variable, Sysmis, FormatSpec, UnaryOp, BinaryOp, Call,
+    parse_expression, referenced_columns
+)
+
+class TestExpressionParser:
+    
+    def test_builds_typed_ast_with_spss_precedence(self):
+        """
+        Scenario: ** binds tighter than unary minus, which binds tighter than * and +;
+        relational binds looser than arithmetic, AND looser than NOT.
+        """
+        assert parse_expression("-a ** 2 + b * 3") == BinaryOp(
+            "+",
+            UnaryOp("-", BinaryOp("**", Variable("a"), Number(2.0))),
+            BinaryOp("*", Variable("b"), Number(3.0)),
+        )
+        assert parse_expression("NOT x >= 1 AND y ~= 'n'") == BinaryOp(
+            "AND",
+            UnaryOp("NOT", BinaryOp("GE", Variable("x"), Number(1.0))),
+            BinaryOp("NE", Variable("y"), String("n")),
+        )
+
+    def test_functions_formats_and_sysmis(self):
+        """
+        Scenario: Trace-style spacing, dotted function names and format specs.
+        """
+        assert parse_expression("NUMBER ( dob , F8.0 )") == Call("NUMBER", (Variable("dob"), FormatSpec("F8.0")))
+        assert parse_expression("date.mdy(1, 1, $sysmis)") == Call("DATE.MDY", (Number(1.0), Number(1.0), Sysmis()))
+        assert parse_expression("'it''s'") == String("it's")
+
+    def test_referenced_columns(self):
+        """
+        Scenario: Columns in first-appearance order, deduplicated ignoring case.
+        String literals, function names and formats are skipped.
+        """
+        expr = parse_expression("MAX(claim_start, Month_Start) - CLAIM_START + NUMBER(code, F3.0) * (flag = 'dob')")
+        assert referenced_columns(expr) == ["claim_start", "Month_Start", "code", "flag"]
+
+    def test_parses_each_text_once(self):
+        """
+        Scenario: Repeated expressions hit the LRU cache and share one tree.
+        """
+        text = "TRUNC ( reference_month_n / 100 ) + 0"
+        first = parse_expression(text)
+        hits = parse_expression.cache_info().hits
+        
+        assert parse_expression(text) is first
+        assert parse_expression.cache_info().hits == hits + 1
+
+    @pytest.mark.parametrize("text", ["", "a +", "(a", "a b", "f(a,)", "a ? b"])
+    def test_rejects_malformed_input(self, text):
+        with pytest.raises(ValueError, match="Cannot parse expression"):
+            parse_expression(text)
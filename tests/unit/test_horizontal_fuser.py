@@ -0,0 +1,77 @@
+import pytest
+from etl_ir.model import Pipeline, Operation, Dataset
+from etl_ir.types import OpType
+from etl_optimizer.fusion import HorizontalFuser
+from exporters.mermaid import MermaidExporter
+
+class TestHorizontalFuser:
+    
+    def test_fuses_siblings_into_single_scan(self):
+        """
+        Scenario: ds1 fans out to a Compute, a Filter and a vertical Batch.
+        Expected: One multi-output BATCH_COMPUTE reading ds1 once,
+        with every expression tagged with its output.
+        """
+        ops = [
+            Operation(id="load", type=OpType.LOAD_CSV, inputs=[], outputs=["ds1"]),
+            Operation(id="c1", type=OpType.COMPUTE_COLUMNS, inputs=["ds1"], outputs=["out_a"],
+                      parameters={"target": "a", "expression": "x + 1"}),
+            Operation(id="f1", type=OpType.FILTER_ROWS, inputs=["ds1"], outputs=["out_b"],
+                      parameters={"condition": "x > 0"}),
+            Operation(id="batch_c2", type=OpType.BATCH_COMPUTE, inputs=["ds1"], outputs=["out_c"],
+                      parameters={"computes": [{"target": "b", "expression": "x * 2"},
+                                               {"target": "c", "expression": "b - 1"}]}),
+            Operation(id="save", type=OpType.SAVE_BINARY, inputs=["out_c"], outputs=["file"]),
+        ]
+        pipeline = Pipeline(datasets=[], operations=ops)
+        
+        result = HorizontalFuser(pipeline).run()
+        
+        assert [op.id for op in result.operations] == ["load", "hfuse_c1", "save"]
+        fused = result.operations[1]
+        assert fused.type == OpType.BATCH_COMPUTE
+        assert fused.inputs == ["ds1"]
+        assert fused.outputs == ["out_a", "out_b", "out_c"]
+        assert fused.parameters["computes"] == [
+            {"target": "a", "expression": "x + 1", "output": "out_a"},
+            {"target": "b", "expression": "x * 2", "output": "out_c"},
+            {"target": "c", "expression": "b - 1", "output": "out_c"},
+        ]
+        assert fused.parameters["filters"] == [{"condition": "x > 0", "output": "out_b"}]
+        assert fused.parameters["fused_ops"] == ["c1", "f1", "batch_c2"]
+
+    def test_does_not_fuse_conflicting_siblings(self):
+        """
+        Safety Check: c2 reads 'a', which sibling c1 assigns.
+        In a shared scan c2 would see c1's value instead of the input's.
+        """
+        ops = [
+            Operation(id="c1", type=OpType.COMPUTE_COLUMNS, inputs=["ds1"], outputs=["d2"],
+                      parameters={"target": "a", "expression": "1"}),
+            Operation(id="c2", type=OpType.COMPUTE_COLUMNS, inputs=["ds1"], outputs=["d3"],
+                      parameters={"target": "b", "expression": "a + 1"}),
+        ]
+        pipeline = Pipeline(datasets=[], operations=ops)
+        
+        result = HorizontalFuser(pipeline).run()
+        
+        assert [op.id for op in result.operations] == ["c1", "c2"]
+
+    def test_mermaid_shows_fused_op_as_batch(self):
+        """
+        Scenario: The exporter renders the fused op with the batch style
+        and wires it to every output.
+        """
+        ops = [
+            Operation(id="c1", type=OpType.COMPUTE_COLUMNS, inputs=["ds1"], outputs=["d2"],
+                      parameters={"target": "a", "expression": "1"}),
+            Operation(id="c2", type=OpType.COMPUTE_COLUMNS, inputs=["ds1"], outputs=["d3"],
+                      parameters={"target": "b", "expression": "2"}),
+        ]
+        pipeline = HorizontalFuser(Pipeline(datasets=[], operations=ops)).run()
+        
+        diagram = MermaidExporter(pipeline).generate()
+        
+        assert 'hfuse_c1["BATCH COMPUTE<br/>(Merged 2 steps)<br/>2 outputs, 1 scan"]:::batch' in diagram
+        assert "hfuse_c1 --> d2" in diagram
+        assert "hfuse_c1 --> d3" in diagram
@@ -0,0 +1,143 @@
+import pytest
+from etl_ir.model import Pipeline, Operation, Dataset
+from etl_ir.types import OpType
+from etl_optimizer.collapser import VerticalCollapser
+from etl_optimizer import incremental as incremental_module
+from etl_optimizer.incremental import IncrementalOptimizer
+from etl_optimizer.loader import StreamingTraceLoader
+from etl_optimizer.promoter import SemanticPromoter
+from etl_optimizer.rules import PromotionRules
+
+FIXTURE = "tests/fixtures/raw_trace.yaml"
+
+def _edit(pipeline, drop=(), **changes):
+    ops = [op.model_copy(update=changes[op.id]) if op.id in changes else op
+           for op in pipeline.operations if op.id not in drop]
+    return Pipeline(metadata=pipeline.metadata, datasets=pipeline.datasets, operations=ops)
+
+def _full_run(pipeline):
+    return VerticalCollapser(SemanticPromoter(pipeline).run(), mode="dag").run()
+
+@pytest.fixture
+def trace():
+    # The raw fixture has islands; wire the implicit SPSS joins like --patch-islands
+    raw = StreamingTraceLoader(FIXTURE).load()
+    return _edit(raw,
+                 op_029_join={"inputs": ["ds_023_materialized", "file_control_values.sav"]},
+                 op_053_join={"inputs": ["ds_047_generic", "file_benefit_rates.sav"]})
+
+class TestIncrementalOptimizer:
+
+    def test_first_run_is_a_full_run(self, trace, tmp_path):
+        """
+        Scenario: No stored state yet.
+        Expected: Every op is optimized, and the result matches promote + collapse.
+        """
+        optimizer = IncrementalOptimizer(tmp_path / "state.pkl")
+
+        result = optimizer.optimize(trace)
+
+        assert optimizer.mode == "full"
+        assert len(optimizer.last_affected) == len(trace.operations)
+        assert result.model_dump() == _full_run(trace).model_dump()
+        assert (tmp_path / "state.pkl").exists()
+
+    def test_unchanged_trace_touches_nothing(self, trace, tmp_path):
+        optimizer = IncrementalOptimizer(tmp_path / "state.pkl")
+        first = optimizer.optimize(trace)
+
+        second = optimizer.optimize(trace)
+
+        assert optimizer.mode == "incremental"
+        assert optimizer.last_affected == set()
+        assert second.model_dump() == first.model_dump()
+
+    def test_changed_op_only_reoptimizes_its_cone(self, trace, tmp_path):
+        """
+        Scenario: One compute near the end of the trace changes its expression.
+        Expected: Only that op, its batch and its downstream cone are re-run;
+        the spliced IR equals a full run on the edited trace.
+        """
+        optimizer = IncrementalOptimizer(tmp_path / "state.pkl")
+        optimizer.optimize(trace)
+        edited = _edit(trace, op_056_compute={"parameters": {"target": "payment_amount", "expression": "eligible_days * daily_rate * 2"}})
+
+        result = optimizer.optimize(edited)
+
+        assert optimizer.mode == "incremental"
+        assert "op_056_compute" in optimizer.last_affected
+        assert "op_055_compute" in optimizer.last_affected # Same batch
+        assert "op_059_save" in optimizer.last_affected     # Downstream
+        assert "op_001_load" not in optimizer.last_affected
+        assert len(optimizer.last_affected) < len(trace.operations) // 4
+        assert result.model_dump() == _full_run(edited).model_dump()
+
+    def test_removed_noise_op_refuses_neighbours(self, trace, tmp_path):
+        """
+        Edge Case: Deleting an IF between two compute runs lets them fuse.
+        The producer upstream of the change must be re-collapsed too.
+        """
+        optimizer = IncrementalOptimizer(tmp_path / "state.pkl")
+        before = optimizer.optimize(trace)
+        edited = _edit(trace, drop=("op_043_generic",), op_044_compute={"inputs": ["ds_037_derived"]})
+
+        result = optimizer.optimize(edited)
+
+        assert optimizer.mode == "incremental"
+        assert "op_042_compute" in optimizer.last_affected
+        assert len(result.operations) < len(before.operations)
+        assert result.model_dump() == _full_run(edited).model_dump()
+
+    def test_model_or_rules_change_invalidates_state(self, trace, tmp_path, monkeypatch):
+        """
+        Scenario: etl-ir-core is upgraded, or other promotion rules are used.
+        Expected: The stored run is not reused.
+        """
+        IncrementalOptimizer(tmp_path / "state.pkl").optimize(trace)
+
+        monkeypatch.setattr(incremental_module, "_model_fingerprint", lambda: "etl-ir-core=9.9|schema=0")
+        upgraded = IncrementalOptimizer(tmp_path / "state.pkl")
+        upgraded.optimize(trace)
+        monkeypatch.undo()
+        other_rules = IncrementalOptimizer(tmp_path / "state.pkl", rules=PromotionRules.from_dict({"noise": ["DO", "END"]}))
+
+        assert upgraded.mode == "full"
+        assert other_rules._read() is None
+
+    def test_corrupt_state_falls_back_to_full_run(self, trace, tmp_path):
+        state = tmp_path / "state.pkl"
+        state.write_bytes(b"not a pickle")
+        optimizer = IncrementalOptimizer(state)
+
+        result = optimizer.optimize(trace)
+
+        assert optimizer.mode == "full"
+        assert result.model_dump() == _full_run(trace).model_dump()
+
+    def test_heals_noise_listed_after_its_reader(self, tmp_path, monkeypatch):
+        """
+        Edge Case: c1 reads ds_b, but the EXECUTE producing ds_b is listed after it.
+        Expected: Healed over the graph as in a full run, both on the first run
+        and after an edit that leaves the EXECUTE untouched.
+        """
+        def op(op_id, op_type, inputs, outputs, **parameters):
+            return Operation(id=op_id, type=op_type, inputs=inputs, outputs=outputs, parameters=parameters)
+        ops = [
+            op("load", OpType.LOAD_CSV, [], ["ds_a"]),
+            op("c1", OpType.COMPUTE_COLUMNS, ["ds_b"], ["ds_c"], target="x", expression="1"),
+            op("exec", OpType.GENERIC_TRANSFORM, ["ds_a"], ["ds_b"], command="EXECUTE"),
+            op("c2", OpType.COMPUTE_COLUMNS, ["ds_c"], ["ds_d"], target="y", expression="2"),
+            op("save", OpType.SAVE_BINARY, ["ds_d"], ["out"]),
+        ]
+        trace = Pipeline(datasets=[Dataset(id=d, source="derived") for d in ("ds_a", "ds_b", "ds_c", "ds_d", "out")], operations=ops)
+        monkeypatch.setattr(IncrementalOptimizer, "FULL_RUN_RATIO", 1.0) # A tiny trace: stay incremental
+        optimizer = IncrementalOptimizer(tmp_path / "state.pkl")
+
+        first = optimizer.optimize(trace)
+        edited = _edit(trace, c2={"parameters": {"target": "y", "expression": "3"}})
+        second = optimizer.optimize(edited)
+
+        assert first.model_dump() == _full_run(trace).model_dump()
+        assert first.operations[1].inputs == ["ds_a"]
+        assert optimizer.mode == "incremental" and "exec" not in optimizer.last_affected
+        assert second.model_dump() == _full_run(edited).model_dump()
@@ -0,0 +1,87 @@
+import pytest
+import shutil
+from etl_optimizer import cache as cache_module
+from etl_optimizer.cache import IRCache
+from etl_optimizer.coordinator import OptimizationCoordinator
+from etl_optimizer.loader import StreamingTraceLoader
+
+FIXTURE = "tests/fixtures/raw_trace.yaml"
+
+class TestIRCache:
+    
+    def test_second_load_skips_parsing(self, tmp_path, monkeypatch):
+        """
+        Scenario: The first load parses and stores; the second load must be
+        served from the cache without touching the YAML loader.
+        """
+        cache = IRCache(tmp_path / "cache")
+        first = cache.load(FIXTURE)
+        assert (cache.hits, cache.misses) == (0, 1)
+        
+        def explode(self):
+            raise AssertionError("YAML was re-parsed on a cache hit")
+        monkeypatch.setattr(StreamingTraceLoader, "load", explode)
+        
+        second = cache.load(FIXTURE)
+        assert (cache.hits, cache.misses) == (1, 1)
+        assert second.model_dump() == first.model_dump()
+
+    def test_content_change_invalidates_entry(self, tmp_path):
+        """
+        Scenario: The key is the content hash, not the file name.
+        Editing the trace in place must produce a miss.
+        """
+        trace = tmp_path / "trace.yaml"
+        shutil.copy(FIXTURE, trace)
+        cache = IRCache(tmp_path / "cache")
+        
+        key_before = cache.key(trace)
+        cache.load(trace)
+        with open(trace, "a") as f:
+            f.write("\n# edited\n")
+        
+        assert cache.key(trace) != key_before
+        cache.load(trace)
+        assert cache.misses == 2
+
+    def test_model_change_invalidates_entry(self, tmp_path, monkeypatch):
+        """
+        Scenario: etl-ir-core is upgraded (new version or changed Pipeline schema).
+        Expected: The same trace gets a new key, so old pickles are never read.
+        """
+        cache = IRCache(tmp_path / "cache")
+        key_before = cache.key(FIXTURE)
+
+        monkeypatch.setattr(cache_module, "_model_fingerprint", lambda: "etl-ir-core=9.9|schema=0")
+
+        assert cache.key(FIXTURE) != key_before
+
+    def test_corrupt_entry_falls_back_to_parsing(self, tmp_path):
+        """
+        Edge Case: A truncated cache file must not crash the run.
+        """
+        cache = IRCache(tmp_path / "cache")
+        cache.load(FIXTURE)
+        entry = tmp_path / "cache" / f"{cache.key(FIXTURE)}.pkl"
+        entry.write_bytes(b"not a pickle")
+        
+        pipeline = cache.load(FIXTURE)
+        
+        assert len(pipeline.operations) >= 60
+        assert cache.misses == 2
+
+    def test_coordinator_loads_paths_through_cache(self, tmp_path):
+        """
+        Scenario: OptimizationCoordinator.optimize accepts a trace path
+        and loads it transparently through the cache.
+        """
+        cache = IRCache(tmp_path / "cache")
+        cache.load(FIXTURE)
+        coord = OptimizationCoordinator(cache=cache)
+        
+        # The raw fixture has islands, so validation is expected to object;
+        # what matters here is that the pipeline came from the cache.
+        with pytest.raises(ValueError):
+            coord.optimize(FIXTURE)
+        
+        assert cache.hits == 1
@@ -0,0 +1,90 @@
+import pytest
+from etl_ir.model import Pipeline, Operation, Dataset, Column
+from etl_ir.types import OpType, DataType
+from etl_optimizer.fusion import HorizontalFuser
+from etl_optimizer.lineage import LineageIndex
+
+def _ds(ds_id, *names):
+    return Dataset(id=ds_id, source="file", columns=[Column(name=n, type=DataType.INTEGER) for n in names])
+
+@pytest.fixture
+def lineage():
+    """
+    claims(dob, claim_start, benefit_type) -> batch(age, days) -> filter -> join rates
+    -> compute payment -> aggregate TOTAL by benefit_type
+    """
+    datasets = [
+        _ds("claims", "dob", "claim_start", "benefit_type"),
+        _ds("rates", "benefit_type", "weekly_rate"),
+        _ds("aged"), _ds("adults"), _ds("joined"), _ds("paid"), _ds("summary"),
+    ]
+    ops = [
+        Operation(id="load_claims", type=OpType.LOAD_CSV, inputs=[], outputs=["claims"]),
+        Operation(id="load_rates", type=OpType.LOAD_CSV, inputs=[], outputs=["rates"]),
+        Operation(id="batch", type=OpType.BATCH_COMPUTE, inputs=["claims"], outputs=["aged"], parameters={"computes": [
+            {"target": "tmp", "expression": "claim_start - dob"},
+            {"target": "age", "expression": "TRUNC ( tmp / 365 )"},
+            {"target": "days", "expression": "30"},
+        ]}),
+        Operation(id="adults", type=OpType.FILTER_ROWS, inputs=["aged"], outputs=["adults"], parameters={"condition": "age >= 18"}),
+        Operation(id="join", type=OpType.JOIN, inputs=["adults", "rates"], outputs=["joined"], parameters={"by": "benefit_type"}),
+        Operation(id="pay", type=OpType.COMPUTE_COLUMNS, inputs=["joined"], outputs=["paid"],
+                  parameters={"target": "payment_amount", "expression": "days * weekly_rate / 7"}),
+        Operation(id="agg", type=OpType.AGGREGATE, inputs=["paid"], outputs=["summary"],
+                  parameters={"break": ["benefit_type"], "aggregations": ["TOTAL = SUM ( payment_amount )"]}),
+    ]
+    return LineageIndex(Pipeline(datasets=datasets, operations=ops))
+
+class TestLineageIndex:
+
+    def test_origins_follow_computes_joins_and_aggregates(self, lineage):
+        # days is a constant: it is its own origin
+        assert sorted(lineage.origins("paid", "payment_amount")) == [("aged", "DAYS"), ("rates", "WEEKLY_RATE")]
+        assert sorted(lineage.origins("summary", "TOTAL")) == [("aged", "DAYS"), ("rates", "WEEKLY_RATE")]
+        assert sorted(lineage.origins("aged", "age")) == [("claims", "CLAIM_START"), ("claims", "DOB")]
+        # Join keys merge both sides
+        assert sorted(lineage.origins("joined", "benefit_type")) == [("claims", "BENEFIT_TYPE"), ("rates", "BENEFIT_TYPE")]
+
+    def test_impact_lists_downstream_definitions(self, lineage):
+        assert lineage.impact("claims", "dob") == [("aged", "TMP"), ("aged", "AGE")]
+        assert sorted(lineage.impact("rates", "weekly_rate")) == [("paid", "PAYMENT_AMOUNT"), ("summary", "TOTAL")]
+
+    def test_unchanged_copies_share_one_id(self, lineage):
+        """
+        Scenario: dob flows unchanged through the batch, the filter and the join.
+        Expected: Every copy resolves to the source column's id (no new bits).
+        """
+        source = lineage.column_id("claims", "DOB")
+        assert {lineage.column_id(ds, "dob") for ds in ("aged", "adults", "joined", "paid")} == {source}
+        assert lineage.derives_from("joined", "age", "claims", "dob")
+        assert not lineage.derives_from("joined", "age", "rates", "weekly_rate")
+
+    def test_batch_intermediates_resolve_to_what_they_read(self, lineage):
+        """Edge Case: 'age' reads 'tmp' from earlier in the same batch."""
+        assert sorted(lineage.upstream("aged", "age")) == [("claims", "CLAIM_START"), ("claims", "DOB")]
+
+    def test_unknown_column_raises(self, lineage):
+        with pytest.raises(ValueError, match="Unknown column 'salary'"):
+            lineage.origins("paid", "salary")
+
+    def test_fused_batch_defines_columns_per_output(self):
+        """
+        Scenario: Siblings c1 (h = ssn + 1 -> priv) and c2 (k = x * 2 -> pub),
+        fused by HorizontalFuser into one two-output batch.
+        Expected: Each output only gets its own branch's column.
+        """
+        ops = [
+            Operation(id="load", type=OpType.LOAD_CSV, inputs=[], outputs=["src"]),
+            Operation(id="c1", type=OpType.COMPUTE_COLUMNS, inputs=["src"], outputs=["priv"], parameters={"target": "h", "expression": "ssn + 1"}),
+            Operation(id="c2", type=OpType.COMPUTE_COLUMNS, inputs=["src"], outputs=["pub"], parameters={"target": "k", "expression": "x * 2"}),
+        ]
+        fused = HorizontalFuser(Pipeline(datasets=[_ds("src", "ssn", "x"), _ds("priv"), _ds("pub")], operations=ops)).run()
+
+        lineage = LineageIndex(fused)
+
+        assert fused.operations[1].outputs == ["priv", "pub"]
+        assert lineage.origins("priv", "h") == [("src", "SSN")]
+        assert lineage.origins("pub", "k") == [("src", "X")]
+        with pytest.raises(ValueError, match="Unknown column 'h' in dataset 'pub'"):
+            lineage.origins("pub", "h")
+        assert lineage.impact("src", "ssn") == [("priv", "H")]
@@ -0,0 +1,97 @@
+import io
+import pytest
+from etl_ir.model import Pipeline, Operation, Dataset
+from etl_ir.types import OpType
+from exporters.mermaid import MermaidExporter
+
+def _op(op_id, op_type, inputs, outputs):
+    return Operation(id=op_id, type=op_type, inputs=inputs, outputs=outputs)
+
+@pytest.fixture
+def pipeline():
+    # Two jobs: load -> compute -> join -> compute -> save, and an unrelated load -> save
+    ops = [
+        _op("load_a", OpType.LOAD_CSV, [], ["src_a"]),
+        _op("calc_a", OpType.COMPUTE_COLUMNS, ["src_a"], ["ds_1"]),
+        _op("join_a", OpType.JOIN, ["ds_1", "lookup"], ["ds_2"]),
+        _op("calc_b", OpType.COMPUTE_COLUMNS, ["ds_2"], ["ds_3"]),
+        _op("save_a", OpType.SAVE_BINARY, ["ds_3"], ["out_a"]),
+        _op("load_z", OpType.LOAD_CSV, [], ["src_z"]),
+        _op("save_z", OpType.SAVE_BINARY, ["src_z"], ["out_z"]),
+    ]
+    names = ["src_a", "ds_1", "lookup", "ds_2", "ds_3", "out_a", "src_z", "out_z", "unused"]
+    return Pipeline(datasets=[Dataset(id=name, source="derived", columns=[]) for name in names], operations=ops)
+
+def _clusters(diagram):
+    """{title: [node lines]} for every subgraph."""
+    clusters, current = {}, None
+    for line in diagram.splitlines():
+        line = line.strip()
+        if line.startswith("subgraph"):
+            current = line.split('"')[1]
+            clusters[current] = []
+        elif line == "end":
+            current = None
+        elif current:
+            clusters[current].append(line.split("[")[0])
+    return clusters
+
+class TestMermaidExporter:
+
+    def test_write_streams_the_same_diagram(self, pipeline):
+        exporter = MermaidExporter(pipeline)
+        buffer = io.StringIO()
+
+        count = exporter.write(buffer)
+
+        assert buffer.getvalue() == exporter.generate() + "\n"
+        assert count == len(exporter.generate().splitlines())
+
+    def test_cluster_by_component(self, pipeline):
+        """
+        Scenario: Two unconnected jobs.
+        Expected: One subgraph each, datasets included; an unreferenced dataset stays outside.
+        """
+        diagram = MermaidExporter(pipeline).generate(cluster_by="component")
+
+        clusters = _clusters(diagram)
+        assert list(clusters) == ["Component 1 (5 ops)", "Component 2 (2 ops)"]
+        assert clusters["Component 2 (2 ops)"] == ["src_z", "out_z", "load_z", "save_z"]
+        assert "lookup" in clusters["Component 1 (5 ops)"]
+        assert '    unused[("unused")]:::dataset' in diagram.splitlines()
+        assert "    calc_a --> ds_1" in diagram # Edges are unchanged
+
+    def test_cluster_by_barrier(self, pipeline):
+        """
+        Scenario: JOIN and SAVE_BINARY are barriers.
+        Expected: A new stage starts at each barrier and takes in what follows it.
+        """
+        diagram = MermaidExporter(pipeline).generate(cluster_by="barrier")
+
+        ops_per_stage = {title: [n for n in nodes if not n.startswith(("src", "ds", "out", "lookup"))]
+                         for title, nodes in _clusters(diagram).items()}
+        assert ops_per_stage == {
+            "Stage 1: load_a": ["load_a", "calc_a"],
+            "Stage 2: join_a": ["join_a", "calc_b"],
+            "Stage 3: save_a": ["save_a"],
+            "Stage 4: load_z": ["load_z"],
+            "Stage 5: save_z": ["save_z"],
+        }
+
+    def test_collapse_datasets_into_edge_labels(self, pipeline):
+        """
+        Expected: Datasets an op writes and another reads become edge labels;
+        external inputs and final outputs keep their nodes.
+        """
+        diagram = MermaidExporter(pipeline).generate(collapse_datasets=True)
+
+        assert "    calc_a -->|ds_1| join_a" in diagram
+        assert "    load_z -->|src_z| save_z" in diagram
+        assert "    lookup --> join_a" in diagram
+        assert "    save_a --> out_a" in diagram
+        assert "ds_1[(" not in diagram
+        assert 'lookup[("lookup")]' in diagram
+
+    def test_unknown_cluster_mode(self, pipeline):
+        with pytest.raises(ValueError, match="Unknown cluster mode"):
+            MermaidExporter(pipeline).generate(cluster_by="region")
@@ -0,0 +1,118 @@
+import pytest
+from etl_ir.model import Pipeline, Operation, Dataset
+from etl_ir.types import OpType
+from etl_optimizer.index import PipelineIndex
+from etl_optimizer.ordering import OrderingOptimizer
+
+def _ds(*ids):
+    return [Dataset(id=ds_id, source="derived", columns=[]) for ds_id in ids]
+
+def _sort(op_id, inp, out, keys):
+    return Operation(id=op_id, type=OpType.SORT_ROWS, inputs=[inp], outputs=[out], parameters={"keys": keys})
+
+class TestOrderingOptimizer:
+    
+    def test_parses_spss_sort_keys(self):
+        """
+        Scenario: A direction applies to every variable listed before it.
+        """
+        parse = OrderingOptimizer.parse_keys
+        assert parse("BY region claim_id (D) amount") == (("REGION", False), ("CLAIM_ID", False), ("AMOUNT", True))
+        assert parse("claim_id (A)") == (("CLAIM_ID", True),)
+        assert parse("unknown") is None
+
+    def test_drops_resort_on_same_keys(self):
+        """
+        Scenario: SORT BY id -> FILTER -> x = y + 1 -> SORT BY id.
+        Expected: The second sort is redundant; its reader is rewired to its input.
+        A reassigned key column breaks the order, so that sort would stay.
+        """
+        def build(target):
+            return Pipeline(
+                datasets=_ds("src", "s1", "f1", "c1", "s2", "out"),
+                operations=[
+                    _sort("op_s1", "src", "s1", "BY id"),
+                    Operation(id="op_f", type=OpType.FILTER_ROWS, inputs=["s1"], outputs=["f1"], parameters={"condition": "x > 0"}),
+                    Operation(id="op_c", type=OpType.COMPUTE_COLUMNS, inputs=["f1"], outputs=["c1"],
+                              parameters={"target": target, "expression": "y + 1"}),
+                    _sort("op_s2", "c1", "s2", "BY id"),
+                    Operation(id="op_save", type=OpType.SAVE_BINARY, inputs=["s2"], outputs=["out"], parameters={}),
+                ]
+            )
+        
+        pipeline = build("x")
+        index = PipelineIndex(pipeline)
+        optimizer = OrderingOptimizer(pipeline, index)
+        result = optimizer.run()
+        
+        assert [op.id for op in result.operations] == ["op_s1", "op_f", "op_c", "op_save"]
+        assert result.operations[-1].inputs == ["c1"]
+        assert "s2" not in [ds.id for ds in result.datasets]
+        assert optimizer.dropped_sorts == ["op_s2"]
+        assert dict(PipelineIndex(result).consumers) == dict(index.consumers)
+        
+        reassigned = OrderingOptimizer(build("id")).run()
+        assert "op_s2" in [op.id for op in reassigned.operations]
+
+    def test_plans_sort_merge_when_inputs_are_ordered(self):
+        """
+        Scenario: Both join inputs are sorted on the key; the lookup sort is
+        also saved to disk, so it has to run anyway.
+        Expected: sort_merge; nothing is dropped.
+        """
+        pipeline = Pipeline(
+            datasets=_ds("a", "b", "sa", "sb", "j", "b_file"),
+            operations=[
+                _sort("op_sa", "a", "sa", "BY key"),
+                _sort("op_sb", "b", "sb", "BY key"),
+                Operation(id="op_save", type=OpType.SAVE_BINARY, inputs=["sb"], outputs=["b_file"], parameters={}),
+                Operation(id="op_join", type=OpType.JOIN, inputs=["sa", "sb"], outputs=["j"], parameters={"by": "key"}),
+            ]
+        )
+        
+        optimizer = OrderingOptimizer(pipeline)
+        result = optimizer.run()
+        
+        assert result.operations[-1].parameters["strategy"] == "sort_merge"
+        assert optimizer.dropped_sorts == []
+
+    def test_lookup_side_sort_becomes_hash_join(self):
+        """
+        Scenario: The driving input is unsorted and the lookup table is sorted
+        only to feed the join.
+        Expected: The lookup sort is dropped and the join is planned as a hash join.
+        """
+        pipeline = Pipeline(
+            datasets=_ds("claims", "rates", "sorted_rates", "j"),
+            operations=[
+                _sort("op_sort_rates", "rates", "sorted_rates", "BY benefit_type"),
+                Operation(id="op_join", type=OpType.JOIN, inputs=["claims", "sorted_rates"], outputs=["j"],
+                          parameters={"by": "benefit_type"}),
+            ]
+        )
+        
+        optimizer = OrderingOptimizer(pipeline)
+        result = optimizer.run()
+        
+        assert [op.id for op in result.operations] == ["op_join"]
+        join = result.operations[0]
+        assert join.inputs == ["claims", "rates"]
+        assert join.parameters == {"by": "benefit_type", "strategy": "hash"}
+        assert optimizer.join_strategies == {"op_join": "hash"}
+
+    def test_unknown_keys_are_never_dropped(self):
+        """
+        Edge Case: The promoter's 'unknown' keys tell us nothing about the order.
+        """
+        pipeline = Pipeline(
+            datasets=_ds("src", "s1", "s2", "out"),
+            operations=[
+                _sort("op_s1", "src", "s1", "unknown"),
+                _sort("op_s2", "s1", "s2", "unknown"),
+                Operation(id="op_save", type=OpType.SAVE_BINARY, inputs=["s2"], outputs=["out"], parameters={}),
+            ]
+        )
+        
+        result = OrderingOptimizer(pipeline).run()
+        
+        assert len(result.operations) == 3
@@ -0,0 +1,92 @@
+import pytest
+from etl_ir.model import Pipeline, Operation, Dataset, Column
+from etl_ir.types import OpType, DataType
+from etl_optimizer import validator as validator_module
+from etl_optimizer.validator import SecurityValidator
+
+def _compute(op_id, src, dst, expression):
+    return Operation(id=op_id, type=OpType.COMPUTE_COLUMNS, inputs=[src], outputs=[dst],
+                     parameters={"target": f"{op_id}_out", "expression": expression})
+
+@pytest.fixture
+def pipeline():
+    """Three islands: a clean chain, a chain with a ghost column and a missing input, and a cycle."""
+    cols = [Column(name="age", type=DataType.INTEGER)]
+    datasets = [Dataset(id=f"ds{i}", source="derived", columns=cols) for i in range(9)]
+    ops = [
+        Operation(id="load_a", type=OpType.LOAD_CSV, inputs=[], outputs=["ds0"]),
+        _compute("a1", "ds0", "ds1", "age + 1"),
+        _compute("a2", "ds1", "ds2", "age * 2"),
+        Operation(id="load_b", type=OpType.LOAD_CSV, inputs=[], outputs=["ds3"]),
+        _compute("b1", "ds3", "ds4", "salary * 0.1"),        # Ghost column
+        _compute("b2", "ds4", "ds5", "age"),
+        Operation(id="b_join", type=OpType.JOIN, inputs=["ds5", "ghost_ds"], outputs=["ds6"]), # Missing input
+        _compute("c1", "ds7", "ds8", "age"),
+        _compute("c2", "ds8", "ds7", "bonus"),               # Cycle + ghost column
+    ]
+    return Pipeline(datasets=datasets, operations=ops)
+
+class TestPartitionedValidation:
+
+    def test_matches_sequential_checks(self, pipeline, monkeypatch):
+        """
+        Scenario: One island per worker task, run through a real process pool.
+        Expected: The merged errors equal validate_topology() + run().
+        """
+        monkeypatch.setattr(SecurityValidator, "MAX_PARTITION_OPS", 3)
+        monkeypatch.setattr(SecurityValidator, "PARALLEL_MIN_OPS", 0)
+        validator = SecurityValidator(pipeline)
+
+        topology, logic = validator.validate_partitioned(workers=2)
+
+        assert sorted(topology) == sorted(validator.validate_topology())
+        assert logic == validator.run()
+        assert "Found 3 islands" in str(topology)
+        assert any("Cycle detected" in e for e in topology)
+        assert [e for e in topology if "Missing input" in e] == ["Missing input dataset 'ghost_ds' for operation 'b_join'"]
+        assert len(logic) == 2
+
+    def test_oversized_component_is_sliced(self, pipeline, monkeypatch):
+        """
+        Edge Case: Components larger than a partition are split for the per-op
+        checks, but their cycle check still sees the whole component.
+        """
+        monkeypatch.setattr(SecurityValidator, "MAX_PARTITION_OPS", 1)
+        validator = SecurityValidator(pipeline)
+
+        topology, logic = validator.validate_partitioned(workers=1)
+
+        assert sorted(topology) == sorted(validator.validate_topology())
+        assert logic == validator.run()
+
+    def test_tasks_carry_plain_data(self, pipeline, monkeypatch):
+        """
+        Scenario: Oversized components (MAX_PARTITION_OPS=1).
+        Expected: Workers get op tuples, column names and edge lists, never
+        Pipeline models; each component's cycle check is a task of its own,
+        with its whole edge list.
+        """
+        monkeypatch.setattr(SecurityValidator, "MAX_PARTITION_OPS", 1)
+        tasks = []
+        run = validator_module._validate_partition
+        def record(ops, columns, edges, max_sample):
+            tasks.append((ops, columns, edges))
+            return run(ops, columns, edges, max_sample)
+        monkeypatch.setattr(validator_module, "_validate_partition", record)
+
+        SecurityValidator(pipeline).validate_partitioned(workers=1)
+
+        cycle_tasks = [edges for ops, _, edges in tasks if edges is not None]
+        assert all(not ops for ops, _, edges in tasks if edges is not None)
+        assert len(cycle_tasks) == 3
+        assert sorted(cycle_tasks[2]) == [("c1", "ds8"), ("c2", "ds7"), ("ds7", "c1"), ("ds8", "c2")]
+        assert ("b_join", ["ds5", "ghost_ds"], None) in [op for ops, _, _ in tasks for op in ops]
+        assert {"ds3": ["age"]} in [columns for _, columns, _ in tasks]
+
+    def test_connected_pipeline_has_no_island_error(self):
+        ds = [Dataset(id="ds0", source="file", columns=[Column(name="age", type=DataType.INTEGER)]), Dataset(id="ds1", source="derived")]
+        ops = [Operation(id="load", type=OpType.LOAD_CSV, inputs=[], outputs=["ds0"]), _compute("c", "ds0", "ds1", "age")]
+
+        topology, logic = SecurityValidator(Pipeline(datasets=ds, operations=ops)).validate_partitioned()
+
+        assert (topology, logic) == ([], [])
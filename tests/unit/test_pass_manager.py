@@ -0,0 +1,123 @@
+import pytest
+import yaml
+from etl_ir.model import Pipeline, Operation, Dataset
+from etl_ir.types import OpType
+from etl_optimizer.coordinator import OptimizationCoordinator
+from etl_optimizer.pass_manager import PassManager
+
+class _DropLastCompute:
+    """Toy pass: removes one trailing COMPUTE per run, so it needs several rounds."""
+    runs = 0
+
+    def __init__(self, pipeline, index):
+        self.pipeline = pipeline
+
+    def run(self):
+        _DropLastCompute.runs += 1
+        ops = list(self.pipeline.operations)
+        if len(ops) > 1 and ops[-1].type == OpType.COMPUTE_COLUMNS:
+            ops.pop()
+        return Pipeline(metadata=self.pipeline.metadata, datasets=self.pipeline.datasets, operations=ops)
+
+class _Identity:
+    runs = 0
+
+    def __init__(self, pipeline, index):
+        self.pipeline = pipeline
+
+    def run(self):
+        _Identity.runs += 1
+        return self.pipeline
+
+def _chain(n):
+    ops = [Operation(id=f"op{i}", type=OpType.COMPUTE_COLUMNS, inputs=[f"ds{i}"], outputs=[f"ds{i + 1}"],
+                     parameters={"target": f"x{i}", "expression": "1"}) for i in range(n)]
+    return Pipeline(datasets=[Dataset(id="ds0", source="file", columns=[])], operations=ops)
+
+@pytest.fixture(autouse=True)
+def _reset_counters():
+    _DropLastCompute.runs = 0
+    _Identity.runs = 0
+
+class TestPassManager:
+    
+    def test_iterates_to_fixed_point(self):
+        """
+        Scenario: A pass that makes progress one step at a time.
+        Expected: Rounds repeat until nothing changes; the final round is a no-op.
+        """
+        manager = PassManager(max_iterations=10).register("drop", _DropLastCompute)
+        
+        result = manager.run(_chain(4))
+        
+        assert [op.id for op in result.operations] == ["op0"]
+        assert manager.converged
+        assert manager.iterations == 4 # 3 changing rounds + 1 confirming round
+        assert [s.changed for s in manager.stats] == [True, True, True, False]
+        assert (manager.stats[0].ops_before, manager.stats[0].ops_after) == (4, 3)
+
+    def test_iteration_cap(self):
+        """
+        Scenario: The cap is hit before the fixed point.
+        Expected: Stops after max_iterations rounds and reports non-convergence.
+        """
+        manager = PassManager(max_iterations=2).register("drop", _DropLastCompute)
+        
+        result = manager.run(_chain(5))
+        
+        assert len(result.operations) == 3
+        assert not manager.converged
+        assert _DropLastCompute.runs == 2
+
+    def test_skips_passes_whose_input_did_not_change(self):
+        """
+        Scenario: 'noop' never changes anything. Once 'drop' stops making
+        progress, nothing has changed since 'noop' last ran as a no-op.
+        Expected: 'noop' is skipped instead of re-run.
+        """
+        manager = PassManager(max_iterations=10).register("drop", _DropLastCompute).register("noop", _Identity)
+        
+        manager.run(_chain(2))
+        
+        # Round 1: drop changes, noop finds nothing to do. Round 2: drop finds
+        # nothing either, so noop would see the exact pipeline it settled on.
+        assert [(s.iteration, s.name, s.skipped) for s in manager.stats] == [
+            (1, "drop", False), (1, "noop", False), (2, "drop", False), (2, "noop", True)
+        ]
+        assert _Identity.runs == 1
+        assert manager.converged
+
+    def test_records_memory_and_timing(self):
+        manager = PassManager(track_memory=True).register("drop", _DropLastCompute)
+        
+        manager.run(_chain(2))
+        
+        ran = [s for s in manager.stats if not s.skipped]
+        assert all(s.wall_time >= 0 and s.memory_delta is not None for s in ran)
+        assert "drop" in manager.report()
+
+    def test_rejects_bad_configuration(self):
+        with pytest.raises(ValueError, match="max_iterations"):
+            PassManager(max_iterations=0)
+        manager = PassManager().register("drop", _DropLastCompute)
+        with pytest.raises(ValueError, match="already registered"):
+            manager.register("drop", _Identity)
+
+    def test_coordinator_default_schedule_converges_on_fixture(self):
+        """
+        Scenario: The real pass list on the raw trace reaches a fixed point,
+        and every pass reports its stats.
+        """
+        with open("tests/fixtures/raw_trace.yaml", "r") as f:
+            pipeline = Pipeline(**yaml.safe_load(f))
+        coordinator = OptimizationCoordinator(cache=object())
+        
+        try:
+            coordinator.optimize(pipeline)
+        except ValueError:
+            pass # The raw fixture has islands; only the scheduling matters here
+        
+        assert coordinator.manager.converged
+        first_round = [s.name for s in coordinator.stats if s.iteration == 1]
+        assert first_round == ["promote", "pushdown", "ordering", "collapse", "fuse", "cse", "dce"]
+        assert coordinator.stats[-1].iteration == coordinator.manager.iterations
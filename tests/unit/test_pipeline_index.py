@@ -0,0 +1,73 @@
+import pytest
+import yaml
+from etl_ir.model import Pipeline, Operation, Dataset
+from etl_ir.types import OpType
+from etl_optimizer.index import PipelineIndex
+from etl_optimizer.promoter import SemanticPromoter
+from etl_optimizer.collapser import VerticalCollapser
+
+def _snapshot(index: PipelineIndex):
+    """Order-insensitive view of an index, for equality checks."""
+    return (
+        {op_id: op.model_dump() for op_id, op in index.ops.items()},
+        set(index.datasets),
+        {ds: sorted(ops) for ds, ops in index.producers.items() if ops},
+        {ds: sorted(ops) for ds, ops in index.consumers.items() if ops},
+    )
+
+class TestPipelineIndex:
+    
+    def test_lookups_and_adjacency(self):
+        """
+        Scenario: Load -> A -> (B, C) fan-out.
+        """
+        ops = [
+            Operation(id="load", type=OpType.LOAD_CSV, inputs=[], outputs=["ds1"]),
+            Operation(id="a", type=OpType.COMPUTE_COLUMNS, inputs=["ds1"], outputs=["ds2"]),
+            Operation(id="b", type=OpType.COMPUTE_COLUMNS, inputs=["ds2"], outputs=["ds3"]),
+            Operation(id="c", type=OpType.FILTER_ROWS, inputs=["ds2"], outputs=["ds4"]),
+        ]
+        index = PipelineIndex(Pipeline(datasets=[Dataset(id="ds1", source="file")], operations=ops))
+        
+        assert index.op("a").type == OpType.COMPUTE_COLUMNS
+        assert index.dataset("ds1").source == "file"
+        assert index.producers_of("ds2") == ["a"]
+        assert index.consumers_of("ds2") == ["b", "c"]
+        assert index.successors("a") == ["b", "c"]
+        assert index.predecessors("b") == ["a"]
+        assert not index.is_active("ds_unknown")
+
+    def test_incremental_updates(self):
+        """
+        Scenario: Removing and rewiring ops keeps the adjacency lists exact.
+        """
+        ops = [
+            Operation(id="a", type=OpType.COMPUTE_COLUMNS, inputs=["ds1"], outputs=["ds2"]),
+            Operation(id="b", type=OpType.COMPUTE_COLUMNS, inputs=["ds2"], outputs=["ds3"]),
+        ]
+        index = PipelineIndex(Pipeline(datasets=[], operations=ops))
+        
+        index.remove_op("a")
+        assert not index.is_active("ds1")
+        
+        index.replace_op(Operation(id="b", type=OpType.COMPUTE_COLUMNS, inputs=["ds1"], outputs=["ds3"]))
+        assert index.consumers_of("ds1") == ["b"]
+        assert index.consumers_of("ds2") == []
+        
+        index.add_input("b", "ds9")
+        assert index.op("b").inputs == ["ds1", "ds9"]
+        assert index.consumers_of("ds9") == ["b"]
+
+    def test_shared_index_tracks_passes(self):
+        """
+        Scenario: After Promotion and Collapse share one index, it must match
+        an index rebuilt from scratch on the optimized pipeline.
+        """
+        with open("tests/fixtures/raw_trace.yaml", "r") as f:
+            pipeline = Pipeline(**yaml.safe_load(f))
+        
+        index = PipelineIndex(pipeline)
+        pipeline = SemanticPromoter(pipeline, index).run()
+        pipeline = VerticalCollapser(pipeline, index).run()
+        
+        assert _snapshot(index) == _snapshot(PipelineIndex(pipeline))
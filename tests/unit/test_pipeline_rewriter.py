@@ -0,0 +1,110 @@
+import pytest
+from etl_ir.model import Pipeline, Operation, Dataset
+from etl_ir.types import OpType
+from etl_optimizer.collapser import VerticalCollapser
+from etl_optimizer.index import PipelineIndex
+from etl_optimizer.promoter import SemanticPromoter
+from etl_optimizer.rewriter import PipelineRewriter
+
+def _op(op_id, op_type, inputs, outputs, **params):
+    return Operation(id=op_id, type=op_type, inputs=inputs, outputs=outputs, parameters=params)
+
+@pytest.fixture
+def pipeline():
+    # load -> c1 -> c2 -> c3 -> save, plus a noise op on a side branch
+    ops = [
+        _op("load", OpType.LOAD_CSV, [], ["src"]),
+        _op("c1", OpType.COMPUTE_COLUMNS, ["src"], ["ds1"]),
+        _op("noise", OpType.GENERIC_TRANSFORM, ["src"], ["side"], command="FORMATS"),
+        _op("c2", OpType.COMPUTE_COLUMNS, ["ds1"], ["ds2"]),
+        _op("c3", OpType.COMPUTE_COLUMNS, ["ds2"], ["ds3"]),
+        _op("save", OpType.SAVE_BINARY, ["ds3"], ["out"]),
+        _op("save_side", OpType.SAVE_BINARY, ["side"], ["out_side"]),
+    ]
+    names = ["src", "ds1", "ds2", "ds3", "out", "side", "out_side"]
+    return Pipeline(datasets=[Dataset(id=name, source="derived") for name in names], operations=ops)
+
+def _ids(pipeline):
+    return [op.id for op in pipeline.operations]
+
+class TestPipelineRewriter:
+
+    def test_edits_leave_the_original_untouched(self, pipeline):
+        """
+        Expected: The source pipeline's lists and ops never change;
+        ops that were not edited are the same objects in the result.
+        """
+        before = pipeline.model_dump()
+        rewriter = PipelineRewriter(pipeline)
+
+        rewriter.remove_op("noise")
+        rewriter.rewire_input("save_side", "side", "src")
+        result = rewriter.snapshot()
+
+        assert pipeline.model_dump() == before
+        assert _ids(result) == ["load", "c1", "c2", "c3", "save", "save_side"]
+        assert result.operations[-1].inputs == ["src"]
+        assert result.operations[1] is pipeline.operations[1]
+
+    def test_snapshot_is_copy_on_write(self, pipeline):
+        """
+        Scenario: Edit, snapshot, edit again.
+        Expected: The first snapshot shares the rewriter's list until the next
+        edit, which copies it; the snapshot keeps what it saw.
+        """
+        rewriter = PipelineRewriter(pipeline)
+        rewriter.remove_op("noise")
+        first = rewriter.snapshot()
+
+        rewriter.remove_op("save_side")
+        second = rewriter.snapshot()
+
+        assert _ids(first)[-1] == "save_side"
+        assert "save_side" not in _ids(second)
+        assert first.operations is not second.operations
+        assert PipelineRewriter(second).snapshot().operations is second.operations # No edit, no copy
+
+    def test_splice_takes_the_last_members_slot(self, pipeline):
+        """
+        Expected: The new op sits where the last chain member was, and the
+        index now routes the chain's outer edges to it.
+        """
+        index = PipelineIndex(pipeline)
+        rewriter = PipelineRewriter(pipeline, index)
+        batch = _op("batch", OpType.BATCH_COMPUTE, ["src"], ["ds3"])
+
+        rewriter.splice(["c1", "c2", "c3"], batch)
+
+        assert _ids(rewriter.snapshot()) == ["load", "noise", "batch", "save", "save_side"]
+        assert index.consumers_of("src") == ["noise", "batch"]
+        assert index.producers_of("ds3") == ["batch"]
+        assert rewriter.gc_datasets() == ["ds1", "ds2"]
+        assert "ds1" not in index.datasets
+
+    def test_rewire_consumers(self, pipeline):
+        rewriter = PipelineRewriter(pipeline)
+
+        rewired = rewriter.rewire_consumers("src", "raw")
+
+        assert rewired == ["c1", "noise"]
+        assert rewriter.op("c1").inputs == ["raw"]
+        assert pipeline.operations[1].inputs == ["src"]
+
+    def test_unknown_op(self, pipeline):
+        with pytest.raises(ValueError, match="Unknown operation 'ghost'"):
+            PipelineRewriter(pipeline).remove_op("ghost")
+
+    def test_passes_keep_untouched_ops(self, pipeline):
+        """
+        Scenario: Promoter then DAG collapser.
+        Expected: Only the dropped noise, the rewired reader and the fused
+        chain change; every other op is carried over as the same object.
+        """
+        promoted = SemanticPromoter(pipeline).run()
+        collapsed = VerticalCollapser(promoted, mode="dag").run()
+
+        assert _ids(collapsed) == ["load", "batch_c1", "save", "save_side"]
+        assert collapsed.operations[0] is pipeline.operations[0]
+        assert collapsed.operations[2] is pipeline.operations[5]
+        assert promoted.operations[-1].inputs == ["src"]
+        assert [ds.id for ds in collapsed.datasets] == ["src", "ds3", "out", "out_side"]
@@ -0,0 +1,114 @@
+import pytest
+from etl_ir.model import Pipeline, Operation, Dataset, Column
+from etl_ir.types import OpType, DataType
+from etl_optimizer.collapser import VerticalCollapser
+from etl_optimizer.index import PipelineIndex
+from etl_optimizer.pushdown import PredicatePushdown
+
+def _ds(ds_id, *names):
+    return Dataset(id=ds_id, source="derived", columns=[Column(name=n, type=DataType.INTEGER) for n in names])
+
+def _compute(op_id, inp, out, target, expression):
+    return Operation(id=op_id, type=OpType.COMPUTE_COLUMNS, inputs=[inp], outputs=[out],
+                     parameters={"target": target, "expression": expression})
+
+def _filter(op_id, inp, out, condition):
+    return Operation(id=op_id, type=OpType.FILTER_ROWS, inputs=[inp], outputs=[out],
+                     parameters={"condition": condition})
+
+class TestPredicatePushdown:
+    
+    def test_moves_filter_above_compute_chain_and_materialize(self):
+        """
+        Scenario: src -> MATERIALIZE -> x = a + 1 -> y = x * 2 -> FILTER(b > 0)
+        Expected: The filter runs right after the source; the computes stay a
+        contiguous chain and still collapse into one batch.
+        """
+        pipeline = Pipeline(
+            datasets=[_ds("src", "a", "b"), _ds("m", "a", "b"), _ds("d1", "a", "b", "x"),
+                      _ds("d2", "a", "b", "x", "y"), _ds("out", "a", "b", "x", "y")],
+            operations=[
+                Operation(id="op_mat", type=OpType.MATERIALIZE, inputs=["src"], outputs=["m"], parameters={}),
+                _compute("op_x", "m", "d1", "x", "a + 1"),
+                _compute("op_y", "d1", "d2", "y", "x * 2"),
+                _filter("op_f", "d2", "out", "b > 0"),
+            ]
+        )
+        index = PipelineIndex(pipeline)
+        
+        pushdown = PredicatePushdown(pipeline, index)
+        result = pushdown.run()
+        
+        assert [op.id for op in result.operations] == ["op_f", "op_mat", "op_x", "op_y"]
+        assert pushdown.pushed == {"op_f": ["op_y", "op_x", "op_mat"]}
+        flt = result.operations[0]
+        assert (flt.inputs, flt.outputs) == (["src"], ["m"])
+        assert result.operations[-1].outputs == ["out"] # Downstream wiring unchanged
+        
+        # The shared index matches a fresh one, and the chain still collapses
+        fresh = PipelineIndex(result)
+        assert dict(fresh.producers) == dict(index.producers)
+        assert dict(fresh.consumers) == dict(index.consumers)
+        collapsed = VerticalCollapser(result, mode="dag").run()
+        assert [op.type for op in collapsed.operations] == [OpType.FILTER_ROWS, OpType.MATERIALIZE, OpType.BATCH_COMPUTE]
+
+    def test_stops_below_compute_that_defines_condition_column(self):
+        """
+        Scenario: The condition reads 'y', created by the chain.
+        Expected: The filter does not move (not even halfway up the chain).
+        """
+        pipeline = Pipeline(
+            datasets=[_ds("src", "a"), _ds("d1", "a", "x"), _ds("d2", "a", "x", "y"), _ds("out", "a", "x", "y")],
+            operations=[
+                _compute("op_x", "src", "d1", "x", "a + 1"),
+                _compute("op_y", "d1", "d2", "y", "a * 2"),
+                _filter("op_f", "d2", "out", "y > 0"),
+            ]
+        )
+        
+        pushdown = PredicatePushdown(pipeline)
+        result = pushdown.run()
+        
+        assert [op.id for op in result.operations] == ["op_x", "op_y", "op_f"]
+        assert pushdown.pushed == {}
+
+    def test_pushes_onto_correct_join_side(self):
+        """
+        Scenario: An inner join of claims (claim_id, amount) and people (claim_id, region).
+        Expected: A filter on 'region' moves onto the people input; the join reads the filtered rows.
+        For a non-inner join only the driving (first) input may be filtered.
+        """
+        def build(how):
+            return Pipeline(
+                datasets=[_ds("claims", "claim_id", "amount"), _ds("people", "claim_id", "region"),
+                          _ds("joined", "claim_id", "amount", "region"), _ds("out", "claim_id", "amount", "region")],
+                operations=[
+                    Operation(id="op_join", type=OpType.JOIN, inputs=["claims", "people"], outputs=["joined"],
+                              parameters={"by": "claim_id", "how": how}),
+                    _filter("op_f", "joined", "out", "region = 'NORTH'"),
+                ]
+            )
+        
+        result = PredicatePushdown(build("inner")).run()
+        flt, join = result.operations
+        assert (flt.id, flt.inputs, flt.outputs) == ("op_f", ["people"], ["joined"])
+        assert (join.inputs, join.outputs) == (["claims", "joined"], ["out"])
+        assert [c.name for c in result.datasets[2].columns] == ["claim_id", "region"]
+        
+        untouched = PredicatePushdown(build("table")).run()
+        assert [op.id for op in untouched.operations] == ["op_join", "op_f"]
+
+    @pytest.mark.parametrize("condition", ["unknown", "b >> 0"])
+    def test_opaque_conditions_stay_put(self, condition):
+        """
+        Edge Case: The promoter's 'unknown' placeholder and unparseable
+        conditions give no column lineage, so they never move.
+        """
+        pipeline = Pipeline(
+            datasets=[_ds("src", "a", "b"), _ds("d1", "a", "b", "x"), _ds("out", "a", "b", "x")],
+            operations=[_compute("op_x", "src", "d1", "x", "a + 1"), _filter("op_f", "d1", "out", condition)]
+        )
+        
+        result = PredicatePushdown(pipeline).run()
+        
+        assert [op.id for op in result.operations] == ["op_x", "op_f"]
@@ -0,0 +1,136 @@
+import pytest
+from etl_ir.model import Pipeline, Operation, Dataset, Column
+from etl_ir.types import OpType, DataType
+from etl_optimizer.lineage import LineageIndex
+from etl_optimizer.liveness import DeadColumnEliminator
+from etl_optimizer.promoter import SemanticPromoter
+from etl_optimizer.rules import DROP, PromotionRules
+from etl_optimizer.taint import TaintAnalyzer, TaintPolicy
+
+RULES_FILE = "tests/fixtures/promotion_rules.yaml"
+
+def _generic(op_id, command, args=None, inputs=("ds_in",), outputs=("ds_out",)):
+    parameters = {"command": command}
+    if args is not None:
+        parameters["args"] = args
+    return Operation(id=op_id, type=OpType.GENERIC_TRANSFORM, inputs=list(inputs), outputs=list(outputs), parameters=parameters)
+
+def _promote(*ops):
+    # Source: x, dob, region, amount
+    columns = [Column(name=name, type=DataType.INTEGER) for name in ("x", "dob", "region", "amount")]
+    ds_ids = {ds_id for op in ops for ds_id in (*op.inputs, *op.outputs)} - {"src"}
+    datasets = [Dataset(id="src", source="file", columns=columns)] + [Dataset(id=ds_id, source="derived") for ds_id in sorted(ds_ids)]
+    load = Operation(id="load", type=OpType.LOAD_CSV, inputs=[], outputs=["src"])
+    pipeline = Pipeline(datasets=datasets, operations=[load, *ops])
+    return SemanticPromoter(pipeline, rules=PromotionRules.from_file(RULES_FILE)).run()
+
+RECODE_ARGS = "dob (0 thru 1990=1) (ELSE=2) INTO band"
+
+class TestPromotionRules:
+
+    def test_defaults_keep_the_builtin_behaviour(self):
+        """
+        Expected: Noise is matched on the first word (or the whole command);
+        SORT beats FILTER when both appear; a bare 'IF' is a filter, 'IF X' is not.
+        """
+        rules = PromotionRules.default()
+
+        assert rules.dispatch("DO IF") is DROP
+        assert rules.dispatch("EXECUTE") is DROP
+        assert rules.dispatch("DOX") is None
+        assert rules.dispatch("SELECT IF SORT").type == OpType.SORT_ROWS
+        assert rules.dispatch("IF").type == OpType.FILTER_ROWS
+        assert rules.dispatch("IF X") is None
+        assert rules.dispatch("FREQUENCIES") is None
+
+    def test_rules_file_promotes_new_commands(self):
+        """
+        Scenario: A rules file adding AGGREGATE, RECODE and MATCH FILES.
+        Expected: Each becomes its OpType, with parameters taken from the
+        named groups of the rule's args pattern.
+        """
+        ops = [
+            _generic("agg", "AGGREGATE", "/OUTFILE=* /BREAK=region year /total=SUM(amount) /n = N"),
+            _generic("rec", "recode", "age (0 thru 17=1) INTO age_band"),
+            _generic("match", "MATCH FILES", "/FILE=* /TABLE='rates.sav' /BY region"),
+            _generic("sort", "SORT CASES", "BY region"),
+        ]
+        pipeline = Pipeline(datasets=[], operations=ops)
+
+        result = SemanticPromoter(pipeline, rules=PromotionRules.from_file(RULES_FILE)).run()
+
+        agg, rec, match, sort = result.operations
+        assert agg.type == OpType.AGGREGATE
+        assert agg.parameters == {"break": ["region", "year"], "aggregations": ["total=SUM(amount)", "n = N"]}
+        assert rec.type == OpType.COMPUTE_COLUMNS
+        assert rec.parameters == {"target": "age_band", "recode": "age (0 thru 17=1) INTO age_band"}
+        assert match.type == OpType.JOIN
+        assert match.parameters == {"by": ["region"], "how": "left"}
+        assert sort.parameters == {"keys": "BY region"}
+
+    def test_missing_args_fall_back_to_default(self):
+        """
+        Edge Case: An AGGREGATE without /BREAK.
+        Expected: The mapping's default is used.
+        """
+        rules = PromotionRules.from_file(RULES_FILE)
+
+        assert rules.dispatch("AGGREGATE").parameters_for({"args": "/OUTFILE=*"}) == {"break": [], "aggregations": []}
+
+    def test_rules_are_tried_in_order(self):
+        rules = PromotionRules.from_dict({"rules": [
+            {"match": "FILES", "type": "join"},
+            {"match": "^MATCH FILES$", "type": "aggregate"},
+        ]})
+
+        assert rules.dispatch("MATCH FILES").type == OpType.JOIN
+
+    @pytest.mark.parametrize("rule, message", [
+        ({"match": "X", "type": "teleport"}, "Unknown op type 'teleport'"),
+        ({"match": "SORT("}, "needs 'match' and 'type'"),
+        ({"match": "SORT(", "type": "sort_rows"}, "Invalid pattern in promotion rule for 'SORT\\('"),
+    ])
+    def test_invalid_rules(self, rule, message):
+        with pytest.raises(ValueError, match=message):
+            PromotionRules.from_dict({"rules": [rule]})
+
+    def test_promoted_ops_keep_their_reads_through_dce(self):
+        """
+        Scenario: RECODE dob INTO band -> score = band * x -> AGGREGATE by region
+        (SUM(score), SUM(amount)), promoted by the rules file, then DCE.
+        Expected: The recode has no expression, so it counts as reading every
+        column: the load keeps dob. The aggregations are mapped, so their
+        reads are live too.
+        """
+        promoted = _promote(
+            _generic("rec", "RECODE", RECODE_ARGS, inputs=["src"], outputs=["banded"]),
+            Operation(id="score", type=OpType.COMPUTE_COLUMNS, inputs=["banded"], outputs=["scored"],
+                      parameters={"target": "score", "expression": "band * x"}),
+            _generic("agg", "AGGREGATE", "/OUTFILE=* /BREAK=region /total=SUM(score) /spend=SUM(amount)",
+                     inputs=["scored"], outputs=["totals"]),
+            Operation(id="save", type=OpType.SAVE_BINARY, inputs=["totals"], outputs=["totals.sav"]),
+        )
+        dce = DeadColumnEliminator(promoted)
+
+        result = dce.run()
+
+        assert "columns" not in result.operations[0].parameters
+        assert dce.dropped_columns == {}
+        assert dce.live["scored"] == {"REGION", "SCORE", "AMOUNT"}
+
+    def test_recoded_pii_is_tracked_by_taint(self):
+        """
+        Scenario: dob is PII and the band recoded from it is saved to a public file.
+        Expected: band reaching out.sav is a violation (as is dob itself),
+        and lineage derives band from dob.
+        """
+        promoted = _promote(
+            _generic("rec", "RECODE", RECODE_ARGS, inputs=["src"], outputs=["banded"]),
+            Operation(id="save", type=OpType.SAVE_BINARY, inputs=["banded"], outputs=["out.sav"]),
+        )
+        policy = TaintPolicy(sensitive={"pii": ["dob"]}, public_outputs={"out.sav"})
+
+        violations = TaintAnalyzer(promoted, policy).run()
+
+        assert {(v.column, v.dataset) for v in violations} == {("DOB", "out.sav"), ("BAND", "out.sav")}
+        assert LineageIndex(promoted).derives_from("banded", "band", "src", "dob")
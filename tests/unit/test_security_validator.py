@@ -53,4 +53,41 @@ class TestSecurityValidator:
         
         pipeline = Pipeline(datasets=[ds1, ds2], operations=[op])
         validator = SecurityValidator(pipeline)
-        assert len(validator.run()) == 0
\ No newline at end of file
+        assert len(validator.run()) == 0
+
+    def test_literals_functions_and_formats_are_not_ghosts(self):
+        """
+        Scenario: Only real column references count.
+        'F8.0' is a format spec, 'DATE.MDY' a function and 'salary' inside
+        quotes is a string literal - none of them are columns.
+        """
+        ds1 = Dataset(id="ds1", source="file", columns=[Column(name="dob", type=DataType.STRING)])
+        ds2 = Dataset(id="ds2", source="derived", columns=[])
+        op = Operation(
+            id="op1",
+            type=OpType.COMPUTE_COLUMNS,
+            inputs=["ds1"],
+            outputs=["ds2"],
+            parameters={"target": "x", "expression": "DATE.MDY(1, 1, NUMBER(DOB, F8.0)) + 1E3 + (dob = 'salary')"}
+        )
+        
+        validator = SecurityValidator(Pipeline(datasets=[ds1, ds2], operations=[op]))
+        assert validator.run() == []
+
+    def test_unparseable_expression_is_reported(self):
+        """
+        Edge Case: A malformed expression is a validation error, not a crash.
+        """
+        ds1 = Dataset(id="ds1", source="file", columns=[Column(name="age", type=DataType.INTEGER)])
+        op = Operation(
+            id="op1",
+            type=OpType.COMPUTE_COLUMNS,
+            inputs=["ds1"],
+            outputs=["ds1"],
+            parameters={"target": "x", "expression": "age * (12"}
+        )
+        
+        errors = SecurityValidator(Pipeline(datasets=[ds1], operations=[op])).run()
+        
+        assert len(errors) == 1
+        assert "Unparseable Expression" in errors[0]
@@ -70,4 +70,61 @@ class TestSemanticPromoter:
         promoter = SemanticPromoter(pipeline)
         result = promoter.run()
         
-        assert result.operations[0].type == OpType.GENERIC_TRANSFORM
\ No newline at end of file
+        assert result.operations[0].type == OpType.GENERIC_TRANSFORM
+    def test_heals_through_noise_listed_out_of_order(self):
+        """
+        Scenario: load -> DO -> END -> EXECUTE -> save, with the ops listed
+        backwards (readers before the noise that feeds them).
+        Expected: save reads the load's output directly, whatever the order.
+        """
+        ops = [
+            Operation(id="save", type=OpType.SAVE_BINARY, inputs=["ds4"], outputs=["out"]),
+            Operation(id="exec", type=OpType.GENERIC_TRANSFORM, inputs=["ds3"], outputs=["ds4"], parameters={"command": "EXECUTE"}),
+            Operation(id="end", type=OpType.GENERIC_TRANSFORM, inputs=["ds2"], outputs=["ds3"], parameters={"command": "END"}),
+            Operation(id="do", type=OpType.GENERIC_TRANSFORM, inputs=["ds1"], outputs=["ds2"], parameters={"command": "DO"}),
+            Operation(id="load", type=OpType.LOAD_CSV, inputs=[], outputs=["ds1"]),
+        ]
+        pipeline = Pipeline(datasets=[], operations=ops)
+
+        promoter = SemanticPromoter(pipeline)
+        result = promoter.run()
+
+        assert [op.id for op in result.operations] == ["save", "load"]
+        assert result.operations[0].inputs == ["ds1"]
+        assert promoter.alias_map["ds4"] == "ds1"
+
+    def test_heals_multi_input_and_output_noise(self):
+        """
+        Scenario: A noise op passing two datasets through, then one fanning
+        a single input out to two outputs.
+        Expected: Paired outputs map to the input at their position; fanned-out
+        outputs all map to the single input.
+        """
+        ops = [
+            Operation(id="fmt", type=OpType.GENERIC_TRANSFORM, inputs=["a", "b"], outputs=["a2", "b2"], parameters={"command": "FORMATS"}),
+            Operation(id="str", type=OpType.GENERIC_TRANSFORM, inputs=["b2"], outputs=["x", "y"], parameters={"command": "STRING"}),
+            Operation(id="join", type=OpType.JOIN, inputs=["a2", "x"], outputs=["j"]),
+            Operation(id="save", type=OpType.SAVE_BINARY, inputs=["y"], outputs=["out"]),
+        ]
+        pipeline = Pipeline(datasets=[], operations=ops)
+
+        result = SemanticPromoter(pipeline).run()
+
+        assert [op.inputs for op in result.operations] == [["a", "b"], ["b"]]
+
+    def test_keeps_datasets_a_surviving_op_writes(self):
+        """
+        Edge Case: 'ds2' is written by both a dropped noise op and a real compute.
+        Expected: Its readers keep reading 'ds2'; it is not aliased away.
+        """
+        ops = [
+            Operation(id="noise", type=OpType.GENERIC_TRANSFORM, inputs=["ds1"], outputs=["ds2"], parameters={"command": "DO"}),
+            Operation(id="calc", type=OpType.COMPUTE_COLUMNS, inputs=["ds1"], outputs=["ds2"]),
+            Operation(id="save", type=OpType.SAVE_BINARY, inputs=["ds2"], outputs=["out"]),
+        ]
+        pipeline = Pipeline(datasets=[], operations=ops)
+
+        result = SemanticPromoter(pipeline).run()
+
+        assert result.operations[-1].inputs == ["ds2"]
+        assert result.operations[-1] is ops[-1]
@@ -0,0 +1,74 @@
+import json
+import yaml
+from etl_ir.model import Pipeline
+from etl_optimizer.collapser import VerticalCollapser
+from etl_optimizer.loader import StreamingTraceLoader
+from etl_optimizer.promoter import SemanticPromoter
+from etl_optimizer.serializer import PipelineSerializer, write_pipeline
+
+FIXTURE = "tests/fixtures/raw_trace.yaml"
+
+def _legacy_yaml(pipeline) -> str:
+    # What --dump-yaml used to write
+    return yaml.dump(pipeline.model_dump(mode='json', exclude_none=True), sort_keys=False)
+
+class TestPipelineSerializer:
+
+    def test_yaml_is_byte_identical_to_yaml_dump(self, tmp_path):
+        """
+        Scenario: The raw fixture and its optimized IR (batches with nested computes).
+        Expected: Exactly the bytes yaml.dump wrote for the whole dict tree
+        (nothing in a trace hits the scalars libyaml styles differently).
+        """
+        raw = StreamingTraceLoader(FIXTURE).load()
+        optimized = VerticalCollapser(SemanticPromoter(raw).run()).run()
+
+        for pipeline in (raw, optimized):
+            path = write_pipeline(pipeline, tmp_path / "ir.yaml")
+            assert path.read_text() == _legacy_yaml(pipeline)
+
+    def test_yaml_quoting_edge_cases(self, tmp_path):
+        """
+        Edge Case: Strings that would read back as other types, non-ASCII,
+        multi-line and long text, numbers, bools, nulls and empty containers.
+        """
+        raw = StreamingTraceLoader(FIXTURE).load()
+        pipeline = Pipeline(
+            metadata={"count": 3, "ratio": 0.25, "flag": True, "missing": None, "yes": "yes", "number": "123",
+                      "empty": "", "accent": "héllo", "lines": "a\nb", "long": "x " * 60, "list": [], "map": {}},
+            datasets=[],
+            operations=raw.operations[:5],
+        )
+
+        path = write_pipeline(pipeline, tmp_path / "ir.yml")
+
+        assert path.read_text() == _legacy_yaml(pipeline)
+
+    def test_exact_mode_matches_yaml_dump_where_libyaml_differs(self, tmp_path):
+        """
+        Edge Case: An empty-string key and a long non-ASCII string, which
+        libyaml styles differently from the pure-Python emitter.
+        Expected: The default output reads back as the same document;
+        exact=True writes the bytes yaml.dump writes.
+        """
+        raw = StreamingTraceLoader(FIXTURE).load()
+        pipeline = Pipeline(
+            metadata={"": "x", "accents": "é" * 90 + " b" * 40},
+            datasets=[],
+            operations=raw.operations[:2],
+        )
+
+        fast = write_pipeline(pipeline, tmp_path / "fast.yaml")
+        exact = write_pipeline(pipeline, tmp_path / "exact.yaml", exact=True)
+
+        assert yaml.safe_load(fast.read_text()) == pipeline.model_dump(mode='json', exclude_none=True)
+        assert exact.read_text() == _legacy_yaml(pipeline)
+
+    def test_json_by_extension(self, tmp_path):
+        raw = StreamingTraceLoader(FIXTURE).load()
+
+        path = write_pipeline(raw, tmp_path / "ir.json")
+        text = path.read_text()
+
+        assert json.loads(text) == raw.model_dump(mode='json', exclude_none=True)
+        assert text.count("\n") == len(raw.datasets) + len(raw.operations) + 7 # One record per line
@@ -0,0 +1,102 @@
+import pytest
+import yaml
+from pydantic import ValidationError
+from etl_ir.model import Pipeline, Operation, Dataset
+from etl_ir.types import OpType
+from etl_optimizer.loader import StreamingTraceLoader
+from etl_optimizer.promoter import SemanticPromoter
+from etl_optimizer.collapser import VerticalCollapser
+
+FIXTURE = "tests/fixtures/raw_trace.yaml"
+
+class TestStreamingTraceLoader:
+    
+    def test_matches_safe_load(self):
+        """
+        Scenario: The streamed pipeline must be identical to the
+        classic yaml.safe_load + Pipeline(**data) path.
+        """
+        with open(FIXTURE, "r") as f:
+            expected = Pipeline(**yaml.safe_load(f))
+        
+        streamed = StreamingTraceLoader(FIXTURE).load()
+        
+        assert streamed.model_dump() == expected.model_dump()
+
+    def test_yields_records_one_at_a_time(self):
+        """
+        Scenario: Iterating the loader yields Dataset records first,
+        then Operation records, and fills in metadata on the way.
+        """
+        loader = StreamingTraceLoader(FIXTURE)
+        stream = iter(loader)
+        
+        first = next(stream)
+        assert isinstance(first, Dataset)
+        assert loader.metadata["source_type"] == "SPSS"
+        
+        rest = list(stream)
+        assert isinstance(rest[-1], Operation)
+
+    def test_operations_only_skips_datasets(self):
+        """
+        Scenario: Passes that only need operations can skip dataset records.
+        """
+        ops = list(StreamingTraceLoader(FIXTURE).operations())
+        
+        assert len(ops) >= 60
+        assert all(isinstance(op, Operation) for op in ops)
+        op_58 = next(op for op in ops if op.id == "op_058_aggregate")
+        assert op_58.type == OpType.AGGREGATE
+        assert op_58.parameters["break"] == ["benefit_type", "region"]
+
+    def test_passes_consume_stream_directly(self):
+        """
+        Scenario: Promoter and Collapser chained over the raw stream must
+        produce the same operations as the in-memory run() path.
+        """
+        pipeline = StreamingTraceLoader(FIXTURE).load()
+        expected = VerticalCollapser(SemanticPromoter(pipeline).run()).run()
+        
+        empty = Pipeline(datasets=[], operations=[])
+        ops = StreamingTraceLoader(FIXTURE).operations()
+        streamed = list(VerticalCollapser(empty).stream(SemanticPromoter(empty).stream(ops)))
+        
+        assert [op.model_dump() for op in streamed] == [op.model_dump() for op in expected.operations]
+
+    def test_resolves_anchors_and_aliases(self, tmp_path):
+        """
+        Scenario: Hand-written traces may reuse blocks via YAML anchors.
+        """
+        trace = tmp_path / "anchors.yaml"
+        trace.write_text(
+            "metadata: {generator: test}\n"
+            "datasets: []\n"
+            "operations:\n"
+            "- id: op1\n"
+            "  type: compute_columns\n"
+            "  parameters: &params {target: x, expression: '1'}\n"
+            "- id: op2\n"
+            "  type: compute_columns\n"
+            "  parameters: *params\n"
+        )
+        
+        ops = list(StreamingTraceLoader(trace).operations())
+        
+        assert ops[1].parameters == {"target": "x", "expression": "1"}
+
+    def test_fail_on_invalid_op_type(self, tmp_path):
+        """
+        Edge Case: Records are still validated strictly as they stream.
+        """
+        trace = tmp_path / "bad.yaml"
+        trace.write_text(
+            "operations:\n"
+            "- id: op_bad\n"
+            "  type: magic_wand_transform\n"
+        )
+        
+        with pytest.raises(ValidationError) as excinfo:
+            StreamingTraceLoader(trace).load()
+        
+        assert "magic_wand_transform" in str(excinfo.value)
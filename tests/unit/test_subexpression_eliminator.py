@@ -0,0 +1,154 @@
+import pytest
+import numpy as np
+from etl_ir.model import Pipeline, Operation, Dataset, Column
+from etl_ir.types import OpType, DataType
+from etl_optimizer.cse import SubexpressionEliminator
+from etl_optimizer.engine import ExecutionEngine
+from etl_optimizer.fusion import HorizontalFuser
+from etl_optimizer.index import PipelineIndex
+from etl_optimizer.liveness import DeadColumnEliminator
+
+def _pipeline(*computes):
+    datasets = [Dataset(id="ds1", source="file", columns=[]), Dataset(id="ds2", source="derived", columns=[])]
+    batch = Operation(id="batch_op1", type=OpType.BATCH_COMPUTE, inputs=["ds1"], outputs=["ds2"],
+                      parameters={"computes": [{"target": t, "expression": e} for t, e in computes]})
+    return Pipeline(datasets=datasets, operations=[batch])
+
+def _expressions(pipeline):
+    return [(c["target"], c["expression"]) for c in pipeline.operations[0].parameters["computes"]]
+
+class TestSubexpressionEliminator:
+    
+    def test_hoists_repeated_subtree_into_temp(self):
+        """
+        Scenario: NUMBER(dob, F8.0) is used by three computes.
+        Expected: Evaluated once into a temp, defined right before its first use.
+        """
+        pipeline = _pipeline(
+            ("y", "TRUNC(NUMBER(dob, F8.0) / 10000)"),
+            ("m", "MOD(NUMBER(dob, F8.0), 10000)"),
+            ("d", "MOD(NUMBER(dob, F8.0), 100)"),
+        )
+        
+        cse = SubexpressionEliminator(pipeline)
+        result = cse.run()
+        
+        assert _expressions(result) == [
+            ("__cse_0", "NUMBER(dob, F8.0)"),
+            ("y", "TRUNC(__cse_0 / 10000)"),
+            ("m", "MOD(__cse_0, 10000)"),
+            ("d", "MOD(__cse_0, 100)"),
+        ]
+        assert result.operations[0].parameters["computes"][0]["temporary"] is True
+        assert cse.report == {"batch_op1": 2}
+        assert cse.saved_evaluations == 2
+
+    def test_reuses_existing_target_column(self):
+        """
+        Scenario: A later compute repeats an earlier compute's whole expression.
+        Expected: It reads the earlier target instead of re-evaluating.
+        """
+        pipeline = _pipeline(
+            ("dob_num", "NUMBER(dob, F8.0)"),
+            ("dob_year", "TRUNC(NUMBER(dob, F8.0) / 10000)"),
+        )
+        
+        result = SubexpressionEliminator(pipeline).run()
+        
+        assert _expressions(result) == [
+            ("dob_num", "NUMBER(dob, F8.0)"),
+            ("dob_year", "TRUNC(dob_num / 10000)"),
+        ]
+
+    def test_respects_reassignment(self):
+        """
+        Edge Case: 'a' is reassigned between two textually identical
+        expressions, so they are different values and must not be shared.
+        """
+        pipeline = _pipeline(
+            ("x", "(a + 1) * 2"),
+            ("a", "a * 10"),
+            ("y", "(a + 1) * 3"),
+        )
+        
+        cse = SubexpressionEliminator(pipeline)
+        result = cse.run()
+        
+        assert _expressions(result) == [("x", "(a + 1) * 2"), ("a", "a * 10"), ("y", "(a + 1) * 3")]
+        assert cse.report == {}
+
+    def test_nested_repeats_share_one_temp(self):
+        """
+        Scenario: MOD(n, 10000) only ever repeats inside TRUNC(MOD(n, 10000) / 100).
+        Expected: One temp for the outer tree; the inner one is not split out.
+        """
+        pipeline = _pipeline(
+            ("a", "TRUNC(MOD(n, 10000) / 100) + 1"),
+            ("b", "TRUNC(MOD(n, 10000) / 100) * 2"),
+        )
+        
+        result = SubexpressionEliminator(pipeline).run()
+        
+        assert _expressions(result) == [
+            ("__cse_0", "TRUNC(MOD(n, 10000) / 100)"),
+            ("a", "__cse_0 + 1"),
+            ("b", "__cse_0 * 2"),
+        ]
+
+    def test_temps_do_not_leak_and_results_match(self):
+        """
+        Scenario: Executing the batch before and after CSE gives the same
+        output columns and values; temps stay inside the batch.
+        """
+        pipeline = _pipeline(
+            ("dob_num", "NUMBER(dob, F8.0)"),
+            ("dob_date", "DATE.MDY(TRUNC(MOD(dob_num, 10000) / 100), MOD(dob_num, 100), TRUNC(dob_num / 10000))"),
+            ("age", "TRUNC((ref - dob_date) / (365.25 * 86400))"),
+            ("age_m", "TRUNC((ref - dob_date) / (365.25 * 86400)) * 12 + MOD(dob_num, 100)"),
+        )
+        index = PipelineIndex(pipeline)
+        optimized = SubexpressionEliminator(pipeline, index).run()
+        table = {"dob": np.array(["19800115", "20000229"]), "ref": np.array([1.4e10, 1.4e10])}
+        
+        engine = ExecutionEngine()
+        before = engine.run_batch(pipeline.operations[0], table)["ds2"]
+        after = engine.run_batch(optimized.operations[0], table)["ds2"]
+        
+        assert list(after) == list(before)
+        for name in before:
+            np.testing.assert_array_equal(after[name], before[name])
+        assert index.op("batch_op1") is optimized.operations[0]
+
+    def test_fused_branches_do_not_reuse_each_others_targets(self):
+        """
+        Scenario: Sibling computes x -> da and y -> db fused into one batch,
+        y repeating x's whole expression; da's reader never needs x.
+        Expected: After fuse -> cse -> dce, y does not read x (DCE drops x from
+        da's branch); the repeat goes through an untagged temp, and the
+        executed batch gives the same y as the unoptimized pipeline.
+        """
+        cols = [Column(name="a", type=DataType.INTEGER), Column(name="b", type=DataType.INTEGER)]
+        ops = [
+            Operation(id="load", type=OpType.LOAD_CSV, inputs=[], outputs=["ds1"]),
+            Operation(id="cx", type=OpType.COMPUTE_COLUMNS, inputs=["ds1"], outputs=["da"],
+                      parameters={"target": "x", "expression": "TRUNC(a / 2) * 3"}),
+            Operation(id="cy", type=OpType.COMPUTE_COLUMNS, inputs=["ds1"], outputs=["db"],
+                      parameters={"target": "y", "expression": "TRUNC(a / 2) * 3 + 1"}),
+            Operation(id="agg", type=OpType.AGGREGATE, inputs=["da"], outputs=["totals"],
+                      parameters={"break": ["b"], "aggregations": ["s = SUM(a)"]}),
+            Operation(id="save", type=OpType.SAVE_BINARY, inputs=["db"], outputs=["out.sav"]),
+            Operation(id="save_totals", type=OpType.SAVE_BINARY, inputs=["totals"], outputs=["totals.sav"]),
+        ]
+        datasets = [Dataset(id=ds_id, source="derived", columns=cols) for ds_id in ("ds1", "da", "db", "totals")]
+        pipeline = Pipeline(datasets=datasets, operations=ops)
+
+        optimized = DeadColumnEliminator(SubexpressionEliminator(HorizontalFuser(pipeline).run()).run()).run()
+        sources = {"ds1": {"a": np.array([4.0, 6.0]), "b": np.array([1.0, 1.0])}}
+
+        computes = optimized.operations[1].parameters["computes"]
+        assert [c["target"] for c in computes] == ["__cse_0", "y"]
+        assert "output" not in computes[0]
+        before = ExecutionEngine().run_pipeline(pipeline, sources)["db"]
+        after = ExecutionEngine().run_pipeline(optimized, sources)["db"]
+        np.testing.assert_array_equal(after["y"], before["y"])
+        np.testing.assert_array_equal(after["y"], [7, 10])
@@ -0,0 +1,128 @@
+import pytest
+from etl_ir.model import Pipeline, Operation, Dataset, Column
+from etl_ir.types import OpType, DataType
+from etl_optimizer.coordinator import OptimizationCoordinator
+from etl_optimizer.fusion import HorizontalFuser
+from etl_optimizer.taint import TaintAnalyzer, TaintPolicy, Violation
+from etl_optimizer.validator import SecurityValidator
+
+def _pipeline(payment_expression="days * rate", aggregations=("TOTAL = SUM ( payment )",)):
+    """claims(dob, ssn, rate) -> batch(age, days, payment) -> filter -> aggregate -> public save"""
+    datasets = [
+        Dataset(id="claims", source="file", columns=[Column(name=n, type=DataType.INTEGER) for n in ("dob", "ssn", "rate", "region")]),
+        Dataset(id="aged", source="derived"), Dataset(id="adults", source="derived"),
+        Dataset(id="summary", source="derived"), Dataset(id="report.csv", source="file"),
+    ]
+    ops = [
+        Operation(id="load", type=OpType.LOAD_CSV, inputs=[], outputs=["claims"]),
+        Operation(id="batch", type=OpType.BATCH_COMPUTE, inputs=["claims"], outputs=["aged"], parameters={"computes": [
+            {"target": "age", "expression": "TRUNC ( ( 2024 - dob ) / 1 )"},
+            {"target": "days", "expression": "age * 0 + 30"},
+            {"target": "payment", "expression": payment_expression},
+        ]}),
+        Operation(id="keep_adults", type=OpType.FILTER_ROWS, inputs=["aged"], outputs=["adults"], parameters={"condition": "age >= 18"}),
+        Operation(id="agg", type=OpType.AGGREGATE, inputs=["adults"], outputs=["summary"],
+                  parameters={"break": ["region"], "aggregations": list(aggregations)}),
+        Operation(id="save", type=OpType.SAVE_BINARY, inputs=["summary"], outputs=["report.csv"], parameters={"filename": "report.csv"}),
+    ]
+    return Pipeline(datasets=datasets, operations=ops)
+
+POLICY = TaintPolicy.from_dict({
+    "sensitive": {"dob": ["dob"], "ssn": ["ssn"]},
+    "public_outputs": ["report.csv"],
+    "sanitizers": ["mask"],
+})
+
+class TestTaintAnalyzer:
+
+    def test_tags_flow_through_batch_and_aggregate(self):
+        """
+        Scenario: dob -> age -> days -> payment -> SUM(payment) -> public report.
+        Expected: TOTAL carries the dob tag; ssn never reaches the report.
+        """
+        analyzer = TaintAnalyzer(_pipeline(), POLICY)
+
+        violations = analyzer.run()
+
+        assert violations == [Violation(tag="dob", column="TOTAL", dataset="report.csv", sink="save")]
+        assert analyzer.tags_of("aged", "payment") == ["dob"]
+        assert analyzer.tags_of("aged", "ssn") == ["ssn"]
+        assert analyzer.tags_of("summary", "ssn") == [] # Dropped by the aggregate
+
+    def test_explain_walks_one_offending_path(self):
+        analyzer = TaintAnalyzer(_pipeline(), POLICY)
+        violation = analyzer.run()[0]
+
+        path = analyzer.explain(violation)
+
+        assert path == ["claims.DOB", "batch", "aged.PAYMENT", "keep_adults", "adults.PAYMENT",
+                        "agg", "summary.TOTAL", "save", "report.csv.TOTAL"]
+
+    def test_sanitizer_clears_taint(self):
+        analyzer = TaintAnalyzer(_pipeline(payment_expression="MASK ( days ) * rate"), POLICY)
+
+        assert analyzer.run() == []
+
+    def test_aggregation_can_count_as_anonymization(self):
+        policy = TaintPolicy.from_dict({"sensitive": ["dob"], "public_outputs": ["report.csv"], "aggregation_sanitizes": True})
+
+        assert TaintAnalyzer(_pipeline(), policy).run() == []
+
+    def test_hundreds_of_tags(self):
+        """Edge Case: One bit per tag; unrelated tags never leak into each other."""
+        sensitive = {f"tag{i}": [f"col{i}"] for i in range(300)}
+        sensitive["dob"] = ["dob"]
+        analyzer = TaintAnalyzer(_pipeline(), TaintPolicy(sensitive=sensitive, public_outputs={"report.csv"}))
+
+        assert [v.tag for v in analyzer.run()] == ["dob"]
+
+    def test_validator_and_coordinator_report_leaks(self):
+        assert "PII Leakage: Column 'TOTAL' tagged 'dob'" in SecurityValidator(_pipeline(), policy=POLICY).validate_pii()[0]
+        assert SecurityValidator(_pipeline()).validate_pii() == [] # No policy, no check
+
+        with pytest.raises(ValueError, match="PII Leakage"):
+            OptimizationCoordinator(taint_policy=POLICY).optimize(_pipeline())
+
+    def test_fixture_only_claim_dates_reach_the_summary(self):
+        """
+        Scenario: The 60-step trace, with noise GENERICs still in place.
+        Expected: dob only feeds age checks; claim_start flows into TOTAL_PAID.
+        """
+        from etl_optimizer.loader import StreamingTraceLoader
+        pipeline = StreamingTraceLoader("tests/fixtures/raw_trace.yaml").load()
+        policy = TaintPolicy.from_dict({"sensitive": ["dob", "claim_start"], "public_outputs": ["benefit_monthly_summary.csv"]})
+        analyzer = TaintAnalyzer(pipeline, policy)
+
+        violations = analyzer.run()
+
+        assert [(v.tag, v.column) for v in violations] == [("claim_start", "TOTAL_PAID")]
+        path = analyzer.explain(violations[0])
+        assert path[0] == "source_claims_data.csv.CLAIM_START"
+        assert "ds_051_derived.PAYMENT_AMOUNT" in path
+
+    def test_fused_batch_taints_each_output_separately(self):
+        """
+        Scenario: Siblings c1 (h = ssn + 1 -> private) and c2 (k = x * 2 -> pubout),
+        fused by HorizontalFuser into one two-output batch.
+        Expected: H only lands in 'private'; 'pubout' just passes the input's
+        SSN through, and explain() follows c1's branch.
+        """
+        datasets = [
+            Dataset(id="src", source="file", columns=[Column(name=n, type=DataType.INTEGER) for n in ("ssn", "x")]),
+            Dataset(id="private", source="derived"), Dataset(id="pubout", source="derived"),
+        ]
+        ops = [
+            Operation(id="load", type=OpType.LOAD_CSV, inputs=[], outputs=["src"]),
+            Operation(id="c1", type=OpType.COMPUTE_COLUMNS, inputs=["src"], outputs=["private"], parameters={"target": "h", "expression": "ssn + 1"}),
+            Operation(id="c2", type=OpType.COMPUTE_COLUMNS, inputs=["src"], outputs=["pubout"], parameters={"target": "k", "expression": "x * 2"}),
+        ]
+        fused = HorizontalFuser(Pipeline(datasets=datasets, operations=ops)).run()
+        assert fused.operations[1].outputs == ["private", "pubout"]
+        policy = TaintPolicy.from_dict({"sensitive": ["ssn"], "public_outputs": ["pubout", "private"]})
+        analyzer = TaintAnalyzer(fused, policy)
+
+        violations = analyzer.run()
+
+        assert [(v.column, v.dataset) for v in violations] == [("SSN", "private"), ("H", "private"), ("SSN", "pubout")]
+        assert analyzer.tags_of("pubout", "h") == []
+        assert analyzer.explain(violations[1]) == ["src.SSN", "hfuse_c1", "private.H"]
@@ -0,0 +1,76 @@
+import pytest
+import pydantic
+from etl_ir.model import Pipeline, Operation, Dataset
+from etl_ir.types import OpType, DataType
+from etl_optimizer.cache import IRCache
+from etl_optimizer.coordinator import DEFAULT_PASSES
+from etl_optimizer.index import PipelineIndex
+from etl_optimizer.loader import StreamingTraceLoader
+from etl_optimizer.pass_manager import PassManager
+
+FIXTURE = "tests/fixtures/raw_trace.yaml"
+
+def _optimize(pipeline):
+    manager = PassManager(max_iterations=4)
+    for name, factory in DEFAULT_PASSES:
+        manager.register(name, factory)
+    return manager.run(pipeline, PipelineIndex(pipeline))
+
+class TestTrustedIngest:
+
+    def test_trusted_load_matches_validated_load(self):
+        """
+        Expected: The same IR, with enums converted, and the repeated
+        (name, type) columns of derived datasets sharing one instance.
+        """
+        validated = StreamingTraceLoader(FIXTURE).load()
+
+        trusted = StreamingTraceLoader(FIXTURE, trusted=True).load()
+
+        assert trusted.model_dump() == validated.model_dump()
+        assert isinstance(trusted.operations[0].type, OpType)
+        assert isinstance(trusted.datasets[0].columns[0].type, DataType)
+        assert trusted.datasets[1].columns[0] is trusted.datasets[0].columns[0]
+
+    def test_trusted_load_skips_validation(self, tmp_path):
+        """
+        Scenario: A record the schema rejects (an op id that is a list).
+        Expected: The default loader refuses it; trusted mode takes it as parsed.
+        """
+        trace = tmp_path / "trace.yaml"
+        trace.write_text("operations:\n- {id: [not, a, string], type: load_csv, outputs: [ds1]}\n")
+
+        with pytest.raises(pydantic.ValidationError):
+            StreamingTraceLoader(trace).load()
+        pipeline = StreamingTraceLoader(trace, trusted=True).load()
+
+        assert pipeline.operations[0].id == ["not", "a", "string"]
+        assert pipeline.operations[0].inputs == []
+
+    def test_passes_do_not_revalidate(self, monkeypatch):
+        """
+        Scenario: The full default schedule on a trusted load.
+        Expected: Not one Operation/Dataset/Pipeline goes through Pydantic
+        validation, and the result matches the validated path.
+        """
+        expected = _optimize(StreamingTraceLoader(FIXTURE).load())
+        trusted = StreamingTraceLoader(FIXTURE, trusted=True).load()
+
+        def validating(self, **data):
+            raise AssertionError(f"{type(self).__name__} validated inside a pass")
+        for model in (Operation, Dataset, Pipeline):
+            monkeypatch.setattr(model, "__init__", validating)
+
+        result = _optimize(trusted)
+
+        monkeypatch.undo()
+        assert result.model_dump() == expected.model_dump()
+
+    def test_cache_keys_trusted_entries_apart(self, tmp_path):
+        validating = IRCache(tmp_path)
+        trusted = IRCache(tmp_path, trusted=True)
+
+        assert validating.key(FIXTURE) != trusted.key(FIXTURE)
+        trusted.load(FIXTURE)
+        validating.load(FIXTURE)
+        assert validating.misses == 1 # Never served an unvalidated entry
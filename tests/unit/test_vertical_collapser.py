@@ -79,4 +79,47 @@ class TestVerticalCollapser:
         # Note: In our IR, RECODE might come in as COMPUTE or GENERIC depending on earlier stages.
         # If we standardized on OpType.COMPUTE_COLUMNS in Repo 1, it merges automatically.
         # This test ensures we handle 'logic' params mixed with 'expression' params.
-        pass
\ No newline at end of file
+        pass
+
+    def test_dag_mode_fuses_interleaved_branches(self):
+        """
+        Scenario: Two independent compute chains whose steps alternate in the trace.
+        a1 -> a2 -> a3 and b1 -> b2 -> b3, listed as a1, b1, a2, b2, a3, b3.
+        Linear mode breaks every chain; DAG mode must yield exactly two batches.
+        """
+        ops = [
+            Operation(id="a1", type=OpType.COMPUTE_COLUMNS, inputs=["a0"], outputs=["a_1"], parameters={"target": "x", "expression": "1"}),
+            Operation(id="b1", type=OpType.COMPUTE_COLUMNS, inputs=["b0"], outputs=["b_1"], parameters={"target": "p", "expression": "1"}),
+            Operation(id="a2", type=OpType.COMPUTE_COLUMNS, inputs=["a_1"], outputs=["a_2"], parameters={"target": "y", "expression": "x + 1"}),
+            Operation(id="b2", type=OpType.COMPUTE_COLUMNS, inputs=["b_1"], outputs=["b_2"], parameters={"target": "q", "expression": "p + 1"}),
+            Operation(id="a3", type=OpType.COMPUTE_COLUMNS, inputs=["a_2"], outputs=["a_3"], parameters={"target": "z", "expression": "y * 2"}),
+            Operation(id="b3", type=OpType.COMPUTE_COLUMNS, inputs=["b_2"], outputs=["b_3"], parameters={"target": "r", "expression": "q * 2"}),
+        ]
+        pipeline = Pipeline(datasets=[], operations=ops)
+        
+        assert len(VerticalCollapser(pipeline).run().operations) == 6
+        
+        optimized = VerticalCollapser(pipeline, mode="dag").run()
+        
+        assert len(optimized.operations) == 2
+        batch_a, batch_b = optimized.operations
+        assert batch_a.id == "batch_a1"
+        assert batch_a.inputs == ["a0"] and batch_a.outputs == ["a_3"]
+        assert [c["target"] for c in batch_a.parameters["computes"]] == ["x", "y", "z"]
+        assert [c["target"] for c in batch_b.parameters["computes"]] == ["p", "q", "r"]
+
+    def test_dag_mode_keeps_shared_intermediates(self):
+        """
+        Scenario: c1 -> d2 is read by both c2 and a Save.
+        d2 must materialize, so c1 and c2 cannot be fused.
+        """
+        ops = [
+            Operation(id="c1", type=OpType.COMPUTE_COLUMNS, inputs=["d1"], outputs=["d2"]),
+            Operation(id="c2", type=OpType.COMPUTE_COLUMNS, inputs=["d2"], outputs=["d3"]),
+            Operation(id="save", type=OpType.SAVE_BINARY, inputs=["d2"], outputs=["file"]),
+        ]
+        pipeline = Pipeline(datasets=[], operations=ops)
+        
+        optimized = VerticalCollapser(pipeline, mode="dag").run()
+        
+        assert [op.id for op in optimized.operations] == ["c1", "c2", "save"]